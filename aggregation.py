@@ -0,0 +1,503 @@
+import json
+import math
+
+from result_sink import compact_record, read_results
+
+# format version of the saved aggregate shards
+AGGREGATE_VERSION = 1
+
+
+class Histogram:
+    """
+        Exact counts of integer values like game turns or scores
+
+        Memory grows with the number of different values only, which stays
+        small for game turns and scores in steps of 10.
+    """
+
+    def __init__(self):
+        """
+            Initiates an empty histogram
+        """
+        # value: count
+        self.counts = {}
+        self.total = 0
+        self.sum = 0
+
+
+    def add(self, value, count=1):
+        """
+            Counts a value
+
+            Parameters
+            ----------
+            value : int
+                value to count
+            count : int
+                number of times to count it
+                Default: 1
+        """
+        self.counts[value] = self.counts.get(value, 0) + count
+        self.total += count
+        self.sum += value * count
+
+
+    def merge(self, other):
+        """
+            Adds the counts of another histogram
+
+            Parameters
+            ----------
+            other : Histogram
+                histogram of another worker or shard
+
+            Returns
+            ----------
+            Histogram
+                self
+        """
+        for value, count in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + count
+        self.total += other.total
+        self.sum += other.sum
+        return self
+
+
+    def quantile(self, q):
+        """
+            Smallest value with at least a share of q of all counts up to it
+
+            Parameters
+            ----------
+            q : float
+                share between 0 and 1
+
+            Returns
+            ----------
+            int
+                the quantile, None for an empty histogram
+        """
+        if not self.total:
+            return None
+        rank = max(math.ceil(q * self.total), 1)
+        seen = 0
+        for value in sorted(self.counts):
+            seen += self.counts[value]
+            if seen >= rank:
+                return value
+        return max(self.counts)
+
+
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+
+    def to_dict(self):
+        # json keys are strings, the values are sorted for readable shards
+        return {str(value): self.counts[value] for value in sorted(self.counts)}
+
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        for value, count in data.items():
+            histogram.add(int(value), count)
+        return histogram
+
+
+class Quantile_sketch:
+    """
+        Approximate quantiles with a relative accuracy (DDSketch)
+
+        Values are counted in buckets growing geometrically with their
+        distance from 0, each quantile is returned within relative_accuracy
+        of the true value. The number of buckets only grows with the
+        logarithm of the value range and sketches merge without loss.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        """
+            Initiates an empty sketch
+
+            Parameters
+            ----------
+            relative_accuracy : float
+                relative error of the quantiles
+                Default: 0.01
+        """
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        # bucket index: count for positive and negative values
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.total = 0
+        self.sum = 0
+
+
+    def bucket(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+
+
+    def add(self, value, count=1):
+        """
+            Counts a value
+
+            Parameters
+            ----------
+            value : float
+                value to count
+            count : int
+                number of times to count it
+                Default: 1
+        """
+        if value > 0:
+            index = self.bucket(value)
+            self.positive[index] = self.positive.get(index, 0) + count
+        elif value < 0:
+            index = self.bucket(-value)
+            self.negative[index] = self.negative.get(index, 0) + count
+        else:
+            self.zero += count
+        self.total += count
+        self.sum += value * count
+
+
+    def merge(self, other):
+        """
+            Adds the counts of another sketch with the same relative accuracy
+
+            Parameters
+            ----------
+            other : Quantile_sketch
+                sketch of another worker or shard
+
+            Returns
+            ----------
+            Quantile_sketch
+                self
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("sketches with the relative accuracy {} and {} can not be merged".format(self.relative_accuracy, other.relative_accuracy))
+        for own, others in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in others.items():
+                own[index] = own.get(index, 0) + count
+        self.zero += other.zero
+        self.total += other.total
+        self.sum += other.sum
+        return self
+
+
+    def quantile(self, q):
+        """
+            Approximate quantile
+
+            Parameters
+            ----------
+            q : float
+                share between 0 and 1
+
+            Returns
+            ----------
+            float
+                the quantile, None for an empty sketch
+        """
+        if not self.total:
+            return None
+        rank = max(math.ceil(q * self.total), 1)
+        seen = 0
+        # most negative values first
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen >= rank:
+                return -2 * self.gamma ** index / (self.gamma + 1)
+        seen += self.zero
+        if seen >= rank:
+            return 0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen >= rank:
+                return 2 * self.gamma ** index / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.positive) / (self.gamma + 1)
+
+
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "positive": {str(index): count for index, count in sorted(self.positive.items())},
+            "negative": {str(index): count for index, count in sorted(self.negative.items())},
+            "zero": self.zero,
+            "sum": self.sum
+        }
+
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.positive = {int(index): count for index, count in data["positive"].items()}
+        sketch.negative = {int(index): count for index, count in data["negative"].items()}
+        sketch.zero = data["zero"]
+        sketch.sum = data["sum"]
+        sketch.total = sketch.zero + sum(sketch.positive.values()) + sum(sketch.negative.values())
+        return sketch
+
+
+class Game_aggregate:
+    """
+        Fixed size summary of a stream of game results
+
+        Keeps exact histograms of the game turns and the home and guest
+        scores, a quantile sketch of the home - guest score difference,
+        blowout counters and per team result counters. Aggregates of pool
+        workers and saved shards merge into the same summary as one pass
+        over all games.
+    """
+
+    def __init__(self, blowouts=(150, 300), relative_accuracy=0.01):
+        """
+            Initiates an empty aggregate
+
+            Parameters
+            ----------
+            blowouts : tuple
+                score differences from which a game counts as blowout
+                Default: (150, 300)
+            relative_accuracy : float
+                relative error of the score difference quantiles
+                Default: 0.01
+        """
+        self.games = 0
+        self.game_turns = Histogram()
+        self.home_score = Histogram()
+        self.guest_score = Histogram()
+        self.score_difference = Quantile_sketch(relative_accuracy)
+        self.blowouts = {threshold: 0 for threshold in blowouts}
+        # team: [games, wins, draws, losses, snitch catches]
+        self.teams = {}
+
+
+    def add(self, result):
+        """
+            Adds one game
+
+            Parameters
+            ----------
+            result : dict
+                run_game result or compact game record, see result_sink.compact_record
+        """
+        if "home" not in result:
+            result = compact_record(result)
+        home, guest = result["home"], result["guest"]
+        home_score, guest_score = result["home_score"], result["guest_score"]
+        difference = home_score - guest_score
+        self.games += 1
+        self.game_turns.add(result["game_turns"])
+        self.home_score.add(home_score)
+        self.guest_score.add(guest_score)
+        self.score_difference.add(difference)
+        for threshold in self.blowouts:
+            if abs(difference) >= threshold:
+                self.blowouts[threshold] += 1
+        for team, outcome in ((home, difference), (guest, -difference)):
+            counters = self.teams.get(team)
+            if counters is None:
+                counters = self.teams[team] = [0, 0, 0, 0, 0]
+            counters[0] += 1
+            counters[1 if outcome > 0 else 2 if outcome == 0 else 3] += 1
+            if result["ending_team"] == team:
+                counters[4] += 1
+
+
+    def merge(self, other):
+        """
+            Adds another aggregate, e.g. of a pool worker or a saved shard
+
+            Parameters
+            ----------
+            other : Game_aggregate or dict
+                aggregate or its to_dict result
+
+            Returns
+            ----------
+            Game_aggregate
+                self
+        """
+        if isinstance(other, dict):
+            other = Game_aggregate.from_dict(other)
+        if set(other.blowouts) != set(self.blowouts):
+            raise ValueError("aggregates with different blowout thresholds can not be merged")
+        self.games += other.games
+        self.game_turns.merge(other.game_turns)
+        self.home_score.merge(other.home_score)
+        self.guest_score.merge(other.guest_score)
+        self.score_difference.merge(other.score_difference)
+        for threshold, count in other.blowouts.items():
+            self.blowouts[threshold] += count
+        for team, counters in other.teams.items():
+            own = self.teams.setdefault(team, [0, 0, 0, 0, 0])
+            for i, value in enumerate(counters):
+                own[i] += value
+        return self
+
+
+    def summary(self):
+        """
+            Final statistics of all added games
+
+            Returns
+            ----------
+            Dict
+                Dict Parameter:
+                games : int
+                    number of games
+                game_turns : dict
+                    mean, median, p95, p99 and max game turns
+                home_score, guest_score : dict
+                    mean, median, p95 and p99 score
+                score_difference : dict
+                    mean and approximate p1, p5, median, p95 and p99 home - guest score
+                blowouts : dict
+                    share of games per blowout threshold
+                teams : dict
+                    games, wins, draws, losses, snitch catches and their shares per team
+        """
+        def describe(values, quantiles):
+            stats = {"mean": values.mean()}
+            for name, q in quantiles:
+                stats[name] = values.quantile(q)
+            return stats
+
+        games = max(self.games, 1)
+        upper = (("median", 0.5), ("p95", 0.95), ("p99", 0.99))
+        turns = describe(self.game_turns, upper)
+        turns["max"] = max(self.game_turns.counts) if self.game_turns.counts else None
+        teams = {}
+        for team, counters in self.teams.items():
+            record = dict(zip(("games", "wins", "draws", "losses", "snitches"), counters))
+            for field in ("wins", "draws", "losses", "snitches"):
+                record[field + "_rate"] = record[field] / max(record["games"], 1)
+            teams[team] = record
+        return {
+            "games": self.games,
+            "game_turns": turns,
+            "home_score": describe(self.home_score, upper),
+            "guest_score": describe(self.guest_score, upper),
+            "score_difference": describe(self.score_difference, (("p1", 0.01), ("p5", 0.05)) + upper),
+            "blowouts": {threshold: count / games for threshold, count in self.blowouts.items()},
+            "teams": teams
+        }
+
+
+    def to_dict(self):
+        """
+            Converts the aggregate into a json serializable shard
+
+            Returns
+            ----------
+            dict
+                mergeable state, see from_dict
+        """
+        return {
+            "version": AGGREGATE_VERSION,
+            "games": self.games,
+            "game_turns": self.game_turns.to_dict(),
+            "home_score": self.home_score.to_dict(),
+            "guest_score": self.guest_score.to_dict(),
+            "score_difference": self.score_difference.to_dict(),
+            "blowouts": {str(threshold): count for threshold, count in self.blowouts.items()},
+            "teams": self.teams
+        }
+
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+            Rebuilds an aggregate from its to_dict result
+
+            Parameters
+            ----------
+            data : dict
+                to_dict result
+
+            Returns
+            ----------
+            Game_aggregate
+                the aggregate
+        """
+        if data.get("version") != AGGREGATE_VERSION:
+            raise ValueError("unsupported aggregate version {}".format(data.get("version")))
+        aggregate = cls(blowouts=tuple(int(threshold) for threshold in data["blowouts"]),
+                        relative_accuracy=data["score_difference"]["relative_accuracy"])
+        aggregate.games = data["games"]
+        aggregate.game_turns = Histogram.from_dict(data["game_turns"])
+        aggregate.home_score = Histogram.from_dict(data["home_score"])
+        aggregate.guest_score = Histogram.from_dict(data["guest_score"])
+        aggregate.score_difference = Quantile_sketch.from_dict(data["score_difference"])
+        aggregate.blowouts = {int(threshold): count for threshold, count in data["blowouts"].items()}
+        aggregate.teams = {team: list(counters) for team, counters in data["teams"].items()}
+        return aggregate
+
+
+    def save(self, path):
+        """
+            Writes the aggregate as json shard
+
+            Parameters
+            ----------
+            path : str
+                file name
+        """
+        with open(path, mode="w") as shard:
+            json.dump(self.to_dict(), shard)
+
+
+    @classmethod
+    def load(cls, path):
+        """
+            Reads a json shard written by save
+
+            Parameters
+            ----------
+            path : str
+                file name
+
+            Returns
+            ----------
+            Game_aggregate
+                the aggregate
+        """
+        with open(path, mode="r") as shard:
+            return cls.from_dict(json.load(shard))
+
+
+def aggregate_files(paths, where=None, **kwargs):
+    """
+        Aggregates result files and saved aggregate shards in one pass
+
+        Parameters
+        ----------
+        paths : list
+            result files written by Result_sink or .json shards written by Game_aggregate.save
+        where : callable
+            filter called with each record of the result files
+        **kwargs
+            options of a new Game_aggregate
+
+        Returns
+        ----------
+        Game_aggregate
+            merged aggregate of all files
+    """
+    aggregate = Game_aggregate(**kwargs)
+    for path in paths:
+        if path.endswith(".json"):
+            aggregate.merge(Game_aggregate.load(path))
+        else:
+            for record in read_results(path, where):
+                aggregate.add(record)
+    return aggregate
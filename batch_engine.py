@@ -0,0 +1,214 @@
+import numpy as np
+
+
+class Batch_game:
+    """
+        Vectorized quidditch engine running many games of one match at once
+
+        Every game is one row of the state arrays. All rows play the same
+        round at the same time, so the chaser and beater rotation index is
+        shared and only the rolls differ between rows. Rows are dropped from
+        the active set as soon as one of their seekers catches the snitch.
+    """
+
+    def __init__(self, teams, seed=None):
+        """
+            Initiates the batch engine for one match
+
+            Parameters
+            ----------
+            teams : list
+                List of two Team data objects or the compiled Teams from Base_game.load_teams
+                the first team is the home team
+            seed : int
+                Seed for the numpy random generator. leave empty for fresh entropy
+        """
+        # compiled Teams are read through their Team data objects
+        teams = [team.to_dict() if hasattr(team, "to_dict") else team for team in teams]
+        self.teams = teams
+        self.team_names = [teams[0]["Name"], teams[1]["Name"]]
+        self.rng = np.random.default_rng(seed)
+        # long term modifyers per role and team, temp modifyers are never reset
+        # for chasers, beaters and keepers so they count as long term here
+        self.chasers = [self.player_modifyers(team["Chaser"]) for team in teams]
+        self.beaters = [self.player_modifyers(team["Beater"]) for team in teams]
+        self.keepers = np.array([self.player_modifyers([team["Keeper"]])[0] for team in teams])
+        self.seekers = np.array([team["Seeker"]["base"] + team["Seeker"]["mod"] for team in teams])
+        self.seeker_streak = np.array([team["Seeker"]["streak"] for team in teams])
+        self.seeker_temp = np.array([team["Seeker"]["temp"] for team in teams])
+
+
+    @staticmethod
+    def player_modifyers(players):
+        """
+            Sums up base, mod and temp of a list of players
+
+            Parameters
+            ----------
+            players : list
+                List of Player modifyer collection (dict)
+
+            Returns
+            ----------
+            list
+                summed modifyer for each player
+        """
+        return [player["base"] + player["mod"] + player["temp"] for player in players]
+
+
+    def dice_roll(self, shape):
+        """
+            Rolls two six sided dice for every entry of the given shape
+
+            Parameters
+            ----------
+            shape : tuple
+                shape of the resulting roll array
+
+            Returns
+            ----------
+            numpy.ndarray
+                summed rolls without any modifyer
+        """
+        return self.rng.integers(1, 7, size=shape) + self.rng.integers(1, 7, size=shape)
+
+
+    def run_games(self, n, use_weather=False):
+        """
+            Simulates n independent games of the match
+
+            Parameters
+            ----------
+            n : int
+                number of games to run
+            use_weather : boolean
+                Flag if weather modifyer should aplly to the games.
+                Default: False
+
+            Returns
+            ----------
+            Dict
+                Collection of finished game statistics with one entry per game
+                Dict Parameter:
+                ending_team : numpy.ndarray
+                    Name of Team catching the snitch
+                game_turns : numpy.ndarray
+                    number of full rounds the game went on
+                score : dict
+                    team_1 : numpy.ndarray
+                    team_2 : numpy.ndarray
+                start_team : numpy.ndarray
+                    Name of Team starting the match
+                weather : numpy.ndarray
+                    Weather modifyer for the game
+        """
+        names = np.array(self.team_names)
+        # pre game rolls, a tied initiative is rerolled so both teams start half the time
+        weather = np.zeros(n, dtype=np.int64)
+        if use_weather:
+            weather[self.dice_roll(n) <= 7] = -1
+        start = self.rng.integers(0, 2, size=n)
+
+        # final results
+        score = np.zeros((n, 2), dtype=np.int64)
+        game_turns = np.zeros(n, dtype=np.int64)
+        ending = np.zeros(n, dtype=np.int64)
+
+        # state of the games still running
+        active = np.arange(n)
+        a_score = np.zeros((n, 2), dtype=np.int64)
+        a_start = start
+        a_weather = weather[:, None]
+        streak = np.tile(self.seeker_streak, (n, 1))
+        temp = np.tile(self.seeker_temp, (n, 1))
+        turn = 0
+        while active.size:
+            turn += 1
+            m = active.size
+            rows = np.arange(m)
+            chaser = np.array([team[(turn - 1) % len(team)] for team in self.chasers])
+            beater = np.array([team[(turn - 1) % len(team)] for team in self.beaters])
+            rolls = self.dice_roll((m, 3, 2))
+            # Chaser Actions: success +20 own, partial +10 own, fail +10 other
+            roll = rolls[:, 0] + chaser + a_weather
+            own = np.where(roll >= 10, 20, np.where(roll >= 7, 10, 0))
+            delta = own + (roll < 7)[:, ::-1] * 10
+            # Beater Actions: success +10 own -10 other, partial +10 own, fail +10 other
+            roll = rolls[:, 1] + beater + a_weather
+            delta += (roll >= 7) * 10 + (roll < 7)[:, ::-1] * 10 - (roll >= 10)[:, ::-1] * 10
+            # Keeper Actions: success +10 own -10 other, partial -10 other, fail +10 other
+            roll = rolls[:, 2] + self.keepers + a_weather
+            delta += (roll >= 10) * 10 + (roll < 7)[:, ::-1] * 10 - (roll >= 7)[:, ::-1] * 10
+            a_score += delta
+
+            # Seeker Actions, the starting team rolls first
+            first = a_start
+            second = 1 - a_start
+            caught = np.full(m, -1)
+            roll = self.dice_roll(m) + self.seekers[first] + streak[rows, first] + temp[rows, first] + a_weather[:, 0]
+            caught[roll >= 15] = first[roll >= 15]
+            self.update_seeker(streak, temp, rows, first, roll, reset_temp=False)
+            # second seeker only rolls when the snitch is still free
+            free = np.flatnonzero(caught < 0)
+            f_second = second[free]
+            roll = self.dice_roll(free.size) + self.seekers[f_second] + streak[free, f_second] + temp[free, f_second] + a_weather[free, 0]
+            catch = roll >= 15
+            caught[free[catch]] = f_second[catch]
+            self.update_seeker(streak, temp, free, f_second, roll, reset_temp=True)
+            done = np.flatnonzero(caught >= 0)
+            a_score[done, caught[done]] += 150
+            # ensure no team is below 0 points
+            np.maximum(a_score, 0, out=a_score)
+
+            # write finished games back and mask them out
+            finished = active[done]
+            score[finished] = a_score[done]
+            game_turns[finished] = turn
+            ending[finished] = caught[done]
+            keep = caught < 0
+            active = active[keep]
+            a_score = a_score[keep]
+            a_start = a_start[keep]
+            a_weather = a_weather[keep]
+            streak = streak[keep]
+            temp = temp[keep]
+
+        return {
+            "ending_team": names[ending],
+            "game_turns": game_turns,
+            "score": {
+                self.team_names[0]: score[:, 0],
+                self.team_names[1]: score[:, 1]
+            },
+            "start_team": names[start],
+            "weather": weather
+        }
+
+
+    @staticmethod
+    def update_seeker(streak, temp, rows, team, roll, reset_temp):
+        """
+            Applies seeker roll results to the streak and temp state arrays
+
+            Parameters
+            ----------
+            streak : numpy.ndarray
+                seeker streak per game and team
+            temp : numpy.ndarray
+                seeker temp modifyer per game and team
+            rows : numpy.ndarray
+                game rows that rolled
+            team : numpy.ndarray
+                team index of the rolling seeker per row
+            roll : numpy.ndarray
+                seeker roll results per row
+            reset_temp : boolean
+                Flag if the temp modifyer is used up by the roll.
+                Base_game only resets it for the second seeker of a turn
+        """
+        if reset_temp:
+            temp[rows, team] = 0
+        fail = roll < 7
+        streak[rows, team] += np.where(roll >= 10, 2, 1)
+        streak[rows[fail], team[fail]] = 0
+        temp[rows[fail], team[fail]] = -2
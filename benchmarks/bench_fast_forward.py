@@ -0,0 +1,46 @@
+"""
+    Compares the cost per game of Base_game and the fast forward engine
+
+    The seekers of the match are weakened step by step, so the games get
+    longer while the other players stay the same. The lopsided lines also
+    weaken the other guest players, so the guest score stays close to 0
+    points and the fast forward engine has to clamp it round by round.
+
+    python benchmarks/bench_fast_forward.py [match file]
+"""
+import copy
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fast_forward import Fast_game
+from quidditch import match_game
+
+
+def per_game(game, games):
+    seconds = timeit.timeit(lambda: [game.run_game(seed=seed) for seed in range(games)], number=1)
+    return seconds / games * 1e6
+
+
+if __name__ == "__main__":
+    match_file = sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json"
+    with open(match_file, mode="r") as mfile:
+        match = json.load(mfile)
+
+    print("{:>12}{:>12}{:>12}{:>16}{:>16}".format("seeker base", "lopsided", "mean turns", "Base_game us", "Fast_game us"))
+    for lopsided in (False, True):
+        for base in (2, 0, -2, -3):
+            slow = copy.deepcopy(match)
+            for team in slow:
+                team["Seeker"]["base"] = base
+            if lopsided:
+                for player in slow[1]["Chaser"] + slow[1]["Beater"] + [slow[1]["Keeper"]]:
+                    player["base"] -= 8
+            fast = Fast_game(slow)
+            turns = sum(fast.run_game(seed=seed)["game_turns"] for seed in range(2000)) / 2000
+            # keep the Base_game runs short for the long games
+            games = max(20, int(20000 / turns))
+            print("{:>12}{:>12}{:>12.1f}{:>16.0f}{:>16.0f}".format(base, "yes" if lopsided else "no", turns, per_game(match_game(slow), games), per_game(fast, games)))
@@ -0,0 +1,78 @@
+"""
+    Compares the cost per round and per action of house rule combinations
+
+    The direct lines play the four phases with direct method calls like the
+    engine and Modified_Game did before the rounds were compiled. Every other
+    line plays the compiled round steps of match_game with the listed house
+    rules.
+
+    python benchmarks/bench_house_rules.py [match file]
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from house_rules import target_seeker
+from quidditch import Base_game, Game_event, Modified_Game, match_game
+
+RULE_SETS = ((), ("target_seeker",), ("all_chasers",), ("all_beaters",), ("all_chasers", "target_seeker"))
+
+
+class Direct_game(Base_game):
+
+    def play_round(self):
+        self.game_turns += 1
+        self.chaser_turns()
+        self.beater_turns()
+        self.keeper_turns()
+        self.Seeker_turns()
+        self.score = [max(i,0) for i in self.score]
+        if self.listeners:
+            self.emit(Game_event("round", value=(self.game_turns, self.score[0], self.score[1])))
+        return self.snitch
+
+
+class Direct_modified_game(Direct_game):
+
+    # the uncompiled Modified_Game, its beater_turns override played the rule in place
+    house_rules = Modified_Game.house_rules
+    beater_turns = target_seeker
+
+
+def build(game_class, match):
+    game = game_class("bench")
+    game.verbose = False
+    game.set_teams(match)
+    return game
+
+
+def count(game, games):
+    # rounds and player actions of the benchmark games, counted in a separate run
+    actions = []
+    game.subscribe(lambda event: actions.append(1) if event.player is not None else None)
+    turns = sum(game.run_game(seed=seed)["game_turns"] for seed in range(games))
+    game.listeners = []
+    return turns, len(actions)
+
+
+def timed(name, game, games):
+    turns, actions = count(game, games)
+    seconds = min(timeit.repeat(lambda: [game.run_game(seed=seed) for seed in range(games)], number=1, repeat=3))
+    print("{:<28}{:>10.2f}{:>14.2f}{:>14.0f}".format(name, seconds / turns * 1e6, seconds / actions * 1e6, actions / turns))
+
+
+if __name__ == "__main__":
+    match_file = sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json"
+    with open(match_file, mode="r") as mfile:
+        match = json.load(mfile)
+    games = 3000
+
+    print("{:<28}{:>10}{:>14}{:>14}".format("house rules", "us/round", "us/action", "actions/round"))
+    timed("direct calls", build(Direct_game, match), games)
+    timed("direct Modified_Game", build(Direct_modified_game, match), games)
+    timed("Modified_Game", build(Modified_Game, match), games)
+    for rules in RULE_SETS:
+        timed(" + ".join(rules) or "none", match_game(match, rules), games)
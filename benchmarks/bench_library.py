@@ -0,0 +1,49 @@
+"""
+    Measures the import time of quidditch.py and the setup of a match
+
+    Prints the time a fresh interpreter needs to import the module, the
+    time to build a game of a match and whether games played from a thread
+    pool give the same results as the same seeds played one after another.
+
+    python benchmarks/bench_library.py [match file] [threads]
+"""
+import json
+import os
+import subprocess
+import sys
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from quidditch import match_game
+
+
+def import_seconds(statement, number=10):
+    # mean wall time of a fresh interpreter running the statement
+    command = [sys.executable, "-c", statement]
+    return timeit.timeit(lambda: subprocess.run(command, cwd=ROOT, check=True), number=number) / number
+
+
+def play(match, seed):
+    return match_game(match, house_rules=seed % 2 == 1).run_game(use_weather=True, seed=seed)
+
+
+if __name__ == "__main__":
+    match_file = sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json"
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    with open(match_file, mode="r") as mfile:
+        match = json.load(mfile)
+
+    empty = import_seconds("pass")
+    print("import quidditch   {:.1f} ms".format((import_seconds("import quidditch") - empty) * 1000))
+    number = 2000
+    seconds = timeit.timeit(lambda: match_game(match), number=number)
+    print("match setup        {:.1f} us per game".format(seconds / number * 1e6))
+
+    seeds = range(400)
+    expected = [play(match, seed) for seed in seeds]
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(play, [match] * len(seeds), seeds))
+    print("threaded games     {} of {} identical".format(sum(a == b for a, b in zip(expected, results)), len(seeds)))
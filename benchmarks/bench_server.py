@@ -0,0 +1,51 @@
+"""
+    Compares a fresh quidditch.py process per call with requests to a running simulation server
+
+    Prints the mean time of a single game started as command line process,
+    the p50 and p99 latency of concurrent single game requests to the
+    server and how many of them were batched together.
+
+    python benchmarks/bench_server.py [match file] [requests]
+"""
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from server import Simulation_server, query
+
+
+async def requests(match, n):
+    server = Simulation_server(workers=2)
+    await server.start(port=0)
+    host, port = server.address()
+    try:
+        # a warm up request starts the worker processes
+        await query("/match", {"match": match}, host, port)
+        await asyncio.gather(*(query("/match", {"match": match}, host, port) for _ in range(n)))
+        return (await query("/metrics", None, host, port))[1]
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    match_file = os.path.abspath(sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json")
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with open(match_file, mode="r") as mfile:
+        match = json.load(mfile)
+
+    with tempfile.TemporaryDirectory() as directory:
+        command = [sys.executable, os.path.join(ROOT, "quidditch.py"), "--team-file", match_file]
+        seconds = timeit.timeit(lambda: subprocess.run(command, cwd=directory, check=True, capture_output=True), number=10)
+    print("process per call     {:.1f} ms per game".format(seconds / 10 * 1000))
+    metrics = asyncio.run(requests(match, n))
+    latency = metrics["latency"]["/match"]
+    counters = metrics["counters"]
+    print("server               p50 {:.1f} ms, p99 {:.1f} ms for {} concurrent requests".format(latency["p50_ms"], latency["p99_ms"], n))
+    print("batches              {} batches for {} requests".format(counters["batches"], counters["batched_requests"]))
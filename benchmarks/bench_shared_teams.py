@@ -0,0 +1,42 @@
+"""
+    Compares the tasks of run_many with the shared memory team tables
+
+    Prints the pickled size of one task, the time of a run split into many
+    small tasks and the peak memory of the worker processes.
+
+    python benchmarks/bench_shared_teams.py [match file] [workers]
+"""
+import json
+import os
+import pickle
+import resource
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quidditch import run_many
+from shared_teams import Shared_teams
+
+
+def children_rss():
+    # peak resident memory of the finished worker processes in MB
+    return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    match_file = sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    with open(match_file, mode="r") as mfile:
+        match = json.load(mfile)
+    games = 20000
+
+    with Shared_teams(match) as shared:
+        match_task = (match, 0, 100, 42, False, False, False, False, "dice", False, "game", None, None)
+        shared_task = (shared.name, 0, 1, 0, 100, 42, False, False, False, "dice")
+        print("task size   run_many: {} bytes, shared: {} bytes".format(len(pickle.dumps(match_task)), len(pickle.dumps(shared_task))))
+        seconds = timeit.timeit(lambda: run_many(match, games, workers=workers, seed=42), number=1)
+        print("run_many    {:.1f} us per game".format(seconds / games * 1e6))
+        seconds = timeit.timeit(lambda: shared.run_many(0, 1, games, workers=workers, seed=42), number=1)
+        print("shared      {:.1f} us per game".format(seconds / games * 1e6))
+        print("worker peak memory {:.1f} MB".format(children_rss()))
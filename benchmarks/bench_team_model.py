@@ -0,0 +1,70 @@
+"""
+    Compares the compiled Player/Team model against the raw Team data objects
+
+    Measures the cost of reading the roll modifyer and name of a player in
+    every action and the memory of a loaded match.
+
+    python benchmarks/bench_team_model.py [match file]
+"""
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quidditch import Base_game, Team
+
+
+def dict_lookup(chasers, active, weather):
+    # modifyer and name lookup as done on the Team data objects
+    stats = chasers[active]
+    roll = stats["base"] + stats["mod"] + stats["temp"] + weather
+    name = chasers[active].get("Name", "Chaser" + str(active))
+    return roll, name
+
+
+def compiled_lookup(chasers, active, weather):
+    # modifyer and name lookup on the compiled Players, weather is already summed in
+    player = chasers[active]
+    roll = player.modifier + player.temp
+    name = player.name
+    return roll, name
+
+
+def measure_memory(build, copies=1000):
+    # keep many copies alive so shared strings and small ints do not dominate
+    tracemalloc.start()
+    values = [build() for _ in range(copies)]
+    size = tracemalloc.get_traced_memory()[0] // copies
+    tracemalloc.stop()
+    return values, size
+
+
+if __name__ == "__main__":
+    match_file = sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json"
+    with open(match_file, mode="r") as mfile:
+        raw = mfile.read()
+    match = json.loads(raw)
+    teams = [Team(team) for team in match]
+    number = 1000000
+
+    dict_time = timeit.timeit(lambda: dict_lookup(match[0]["Chaser"], 1, -1), number=number)
+    compiled_time = timeit.timeit(lambda: compiled_lookup(teams[0].chasers, 1, -1), number=number)
+    print("modifyer and name lookup per action")
+    print("  Team data objects: {:.0f} ns".format(dict_time / number * 1e9))
+    print("  compiled Players:  {:.0f} ns".format(compiled_time / number * 1e9))
+
+    game = Base_game("bench")
+    game.verbose = False
+    game.set_teams(match)
+    game.pre_game(False, seed=1)
+    action_time = timeit.timeit(lambda: game.chaser_action(game.teams[0].chasers, 1), number=number // 10)
+    print("full chaser_action: {:.0f} ns".format(action_time / (number // 10) * 1e9))
+
+    _, dict_size = measure_memory(lambda: json.loads(raw))
+    _, compiled_size = measure_memory(lambda: [Team(team) for team in json.loads(raw)])
+    print("memory per loaded match")
+    print("  Team data objects: {} bytes".format(dict_size))
+    print("  compiled Teams:    {} bytes".format(compiled_size))
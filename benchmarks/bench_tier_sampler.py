@@ -0,0 +1,62 @@
+"""
+    Compares the roll samplers of Base_game and Modified_Game
+
+    Times whole games and single rolls with the dice, table and buffer
+    sampler and checks the drawn tier frequencies against the exact
+    probabilities of TIER_TABLE.
+
+    python benchmarks/bench_tier_sampler.py [match file]
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quidditch import Base_game, Modified_Game, SAMPLERS, tier_probabilities
+
+
+def play_games(game_class, match, sampler, games):
+    for seed in range(games):
+        game = game_class("bench", sampler=sampler)
+        game.verbose = False
+        game.set_teams(match)
+        game.run_game(seed=seed)
+
+
+def tier_frequencies(sampler, modifier, rolls):
+    game = Base_game("bench", sampler=sampler)
+    game.rng.seed(1)
+    counts = [0, 0, 0, 0]
+    for _ in range(rolls):
+        counts[game.draw_tier(modifier)[1]] += 1
+    return [count / rolls for count in counts]
+
+
+if __name__ == "__main__":
+    match_file = sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json"
+    with open(match_file, mode="r") as mfile:
+        match = json.load(mfile)
+    games = 2000
+    rolls = 1000000
+
+    for game_class in (Base_game, Modified_Game):
+        print("{} games".format(game_class.__name__))
+        for sampler in SAMPLERS:
+            seconds = timeit.timeit(lambda: play_games(game_class, match, sampler, games), number=1)
+            print("  {:<6}: {:.1f} us per game".format(sampler, seconds / games * 1e6))
+
+    print("single roll")
+    for sampler in SAMPLERS:
+        game = Base_game("bench", sampler=sampler)
+        seconds = timeit.timeit(lambda: game.draw_tier(3), number=rolls)
+        print("  {:<6}: {:.0f} ns".format(sampler, seconds / rolls * 1e9))
+
+    modifier = 3
+    exact = [float(p) for p in tier_probabilities(modifier)]
+    print("tier frequencies at modifyer {} (fail, partial, success, snitch)".format(modifier))
+    print("  exact : " + " ".join("{:.4f}".format(p) for p in exact))
+    for sampler in SAMPLERS:
+        drawn = tier_frequencies(sampler, modifier, rolls)
+        print("  {:<6}: ".format(sampler) + " ".join("{:.4f}".format(p) for p in drawn))
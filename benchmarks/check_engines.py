@@ -0,0 +1,98 @@
+"""
+    Checks that the batch, exact and fast forward engines play the Base_game distribution
+
+    Every engine plays the match (and a copy with weak seekers, so the fast
+    forward engine skips through long games) with fixed seeds. Its rates and
+    means are compared against seeded Base_game games, a check fails when the
+    difference is more than 4 standard errors. The exact solver has no
+    sampling error of its own.
+
+    python benchmarks/check_engines.py [match file] [games]
+"""
+import copy
+import json
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_engine import Batch_game
+from exact_solver import Exact_game
+from fast_forward import Fast_game
+from quidditch import match_game
+
+STATISTICS = ("home win", "draw", "home snitch", "turns", "home score", "guest score")
+# standard errors a sampled statistic may differ by
+LIMIT = 4
+
+
+def summary(home, guest, ending, turns, home_name):
+    # rates and means with their variances, in the order of STATISTICS
+    n = len(turns)
+    columns = (
+        [int(h > g) for h, g in zip(home, guest)],
+        [int(h == g) for h, g in zip(home, guest)],
+        [int(name == home_name) for name in ending],
+        list(turns),
+        list(home),
+        list(guest)
+    )
+    stats = []
+    for column in columns:
+        mean = sum(column) / n
+        stats.append((mean, sum((value - mean) ** 2 for value in column) / (n - 1) / n))
+    return stats
+
+
+def scalar_summary(game, match, games, use_weather):
+    results = [game.run_game(use_weather=use_weather, seed=seed) for seed in range(games)]
+    home, guest = match[0]["Name"], match[1]["Name"]
+    return summary([r["score"][home] for r in results], [r["score"][guest] for r in results], [r["ending_team"] for r in results], [r["game_turns"] for r in results], home)
+
+
+def batch_summary(match, games, use_weather):
+    home, guest = match[0]["Name"], match[1]["Name"]
+    results = Batch_game(match, seed=1).run_games(games, use_weather=use_weather)
+    return summary(results["score"][home].tolist(), results["score"][guest].tolist(), results["ending_team"].tolist(), results["game_turns"].tolist(), home)
+
+
+def exact_summary(match, use_weather):
+    home, guest = match[0]["Name"], match[1]["Name"]
+    solved = Exact_game(match).solve(use_weather=use_weather)
+    values = (solved["win_probability"][home], solved["draw_probability"], solved["snitch_probability"][home],
+              solved["expected_turns"], solved["expected_score"][home], solved["expected_score"][guest])
+    return [(value, 0.0) for value in values]
+
+
+def compare(name, stats, reference):
+    failed = 0
+    for statistic, (value, variance), (expected, reference_variance) in zip(STATISTICS, stats, reference):
+        error = math.sqrt(variance + reference_variance)
+        z = (value - expected) / error if error else 0.0
+        ok = abs(z) <= LIMIT
+        failed += not ok
+        print("{:<14}{:<14}{:>12.4f}{:>12.4f}{:>8.2f}  {}".format(name, statistic, value, expected, z, "ok" if ok else "FAIL"))
+    return failed
+
+
+if __name__ == "__main__":
+    match_file = sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json"
+    games = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    with open(match_file, mode="r") as mfile:
+        match = json.load(mfile)
+    weak = copy.deepcopy(match)
+    for team in weak:
+        team["Seeker"]["base"] = -2
+
+    failed = 0
+    for label, teams in (("match", match), ("weak seekers", weak)):
+        for use_weather in (False, True):
+            print("\n{}{}, {} games".format(label, " with weather" if use_weather else "", games))
+            print("{:<14}{:<14}{:>12}{:>12}{:>8}".format("engine", "statistic", "value", "Base_game", "z"))
+            reference = scalar_summary(match_game(teams), teams, games, use_weather)
+            failed += compare("Batch_game", batch_summary(teams, games, use_weather), reference)
+            failed += compare("Exact_game", exact_summary(teams, use_weather), reference)
+            failed += compare("Fast_game", scalar_summary(Fast_game(teams), teams, games, use_weather), reference)
+    print("\n{} checks failed".format(failed))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,123 @@
+"""
+    Checks invariants of the seeded runs that the engine benchmarks do not cover
+
+    Every check raises an AssertionError with the broken invariant.
+
+    python benchmarks/check_invariants.py [match file]
+"""
+import copy
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from league import League
+from paired import Crn_sampler, Slot_streams
+from quidditch import Team, match_game
+from team_registry import team_id
+
+
+def check_slot_streams():
+    # an extra draw in one turn must not shift the draws of later turns
+    once, twice = Slot_streams(5), Slot_streams(5)
+    once.combination(0, "beater", 1)
+    twice.combination(0, "beater", 1)
+    twice.combination(0, "beater", 1)
+    later = [[streams.combination(0, "beater", turn) for turn in range(2, 8)] for streams in (once, twice)]
+    assert later[0] == later[1], "slot streams shifted by an extra draw: {} vs {}".format(*later)
+
+
+def crn_game(match, seed, blocked=None):
+    # plays a target_seeker game with slot streams, blocked = (turn, team) skips the target attack on that team's seeker
+    game = match_game(match, ("target_seeker",))
+    sampler = Crn_sampler(game)
+    streams = Slot_streams(seed)
+    sampler.start(streams)
+    draws = {}
+    combination = streams.combination
+
+    def logged(team, role, turn):
+        value = combination(team, role, turn)
+        draws[(team, role, turn, streams.ordinals[(team, role)])] = value
+        return value
+    streams.combination = logged
+    targeted = game.sum_modifyer
+
+    def sum_modifyer(player, weather=None):
+        value = targeted(player, weather)
+        if blocked and game.game_turns == blocked[0] and player is game.teams[blocked[1]].seeker:
+            return -10
+        return value
+    game.sum_modifyer = sum_modifyer
+    attacks = []
+    game.subscribe(lambda event: attacks.append((game.game_turns, event.value[2])) if event.action == "target_seeker" else None)
+    result = game.run_game(seed=seed)
+    return result, draws, attacks
+
+
+def check_target_attack_streams(match):
+    # two games differing only in one target attack roll the same combinations in every later slot
+    names = [team["Name"] for team in match]
+    for seed in range(200):
+        result, draws, attacks = crn_game(match, seed)
+        # first turn with a single attack, followed by at least two more turns
+        turns = [turn for turn, _ in attacks]
+        single = [(turn, acting) for turn, acting in attacks if turns.count(turn) == 1 and turn + 2 < result["game_turns"]]
+        if single:
+            break
+    else:
+        raise AssertionError("no game with a single target attack found")
+    turn, acting = single[0]
+    blocked_result, blocked_draws, blocked_attacks = crn_game(match, seed, (turn, 1 - names.index(acting)))
+    assert (turn, acting) not in blocked_attacks, "the target attack was not blocked"
+    later = [key for key in draws if key[2] > turn and key in blocked_draws]
+    assert later, "no common slots after the blocked attack"
+    differing = [key for key in later if draws[key] != blocked_draws[key]]
+    assert not differing, "slots after the blocked attack rolled differently: {}".format(differing[:5])
+
+
+def check_season_replay(match):
+    # play_season with the seed and index of a season replays that season of simulate
+    teams = copy.deepcopy(match)
+    for number, team in enumerate([copy.deepcopy(team) for team in match * 2]):
+        team["Name"] = "{} {}".format(team["Name"], number)
+        for player in team["Chaser"]:
+            player["base"] += number - 2
+        teams.append(team)
+    league = League(teams)
+    for season in (0, 3):
+        for _, standings in league.play_season(seed=42, season=season):
+            pass
+        played = [row["Name"] for row in standings]
+        counted = league.run_seasons(season, season + 1, 42)["positions"]
+        simulated = [league.team_names[i] for i in sorted(range(len(teams)), key=lambda i: counted[i].index(1))]
+        assert played == simulated, "season {} replayed as {} instead of {}".format(season, played, simulated)
+    result = league.simulate(1, seed=42)
+    simulated = [team["Name"] for team in sorted(result["teams"], key=lambda team: team["positions"].index(1.0))]
+    for _, standings in league.play_season(seed=42):
+        pass
+    assert [row["Name"] for row in standings] == simulated, "simulate season 0 differs from play_season"
+
+
+def check_team_ids(match):
+    # extra keys of a Team data object do not change its ID, so the server batches it with its compiled team
+    team = copy.deepcopy(match[0])
+    team["Coach"] = "somebody"
+    team["Seeker"]["nickname"] = "the seeker"
+    assert team_id(team) == team_id(Team(team)) == team_id(match[0]), "extra keys changed the team ID"
+
+
+if __name__ == "__main__":
+    match_file = sys.argv[1] if len(sys.argv) > 1 else "examples/Gryffindor_vs_Slytherin/Gryffindor_vs_Slytherin.json"
+    with open(match_file, mode="r") as mfile:
+        match = json.load(mfile)
+    checks = (
+        ("slot streams", check_slot_streams, ()),
+        ("target attack streams", check_target_attack_streams, (match,)),
+        ("season replay", check_season_replay, (match,)),
+        ("team ids", check_team_ids, (match,))
+    )
+    for name, check, args in checks:
+        check(*args)
+        print("{:<28}ok".format(name))
@@ -0,0 +1,227 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+from quidditch import match_game, match_seed
+
+
+def estimate_range(match, start, stop, seed, use_weather=False, house_rules=False, sampler="dice", engine="game"):
+    """
+        Plays the games start to stop of an estimate and sums up the moments of the results
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects, first team is the home team
+        start : int
+            Index of the first game
+        stop : int
+            Index after the last game
+        seed : int
+            Seed of the estimate
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+        house_rules : boolean
+            Flag if the games use the house rules
+        sampler : str
+            roll sampler, see Base_game.set_sampler
+        engine : str
+            game engine, see match_game
+
+        Returns
+        ----------
+        list
+            games, home wins (higher final score), sum and squared sum of the home - guest score difference,
+            sum and squared sum of the game turns, draws and home snitch catches
+    """
+    game = match_game(match, house_rules, sampler, engine=engine)
+    home, guest = match[0]["Name"], match[1]["Name"]
+    moments = [0, 0, 0, 0, 0, 0, 0, 0]
+    for index in range(start, stop):
+        result = game.run_game(use_weather=use_weather, seed=match_seed(seed, index))
+        difference = result["score"][home] - result["score"][guest]
+        moments[0] += 1
+        moments[1] += difference > 0
+        moments[2] += difference
+        moments[3] += difference * difference
+        moments[4] += result["game_turns"]
+        moments[5] += result["game_turns"] * result["game_turns"]
+        moments[6] += difference == 0
+        moments[7] += result["ending_team"] == home
+    return moments
+
+
+def wilson_interval(successes, n, z):
+    """
+        Wilson score interval of a probability, stays inside 0 to 1 for lopsided matches
+
+        Parameters
+        ----------
+        successes : int
+            number of successes
+        n : int
+            number of trials
+        z : float
+            standard normal quantile of the confidence
+
+        Returns
+        ----------
+        tuple
+            lower and upper bound
+    """
+    p = successes / n
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    halfwidth = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return max(center - halfwidth, 0.0), min(center + halfwidth, 1.0)
+
+
+def mean_interval(total, squares, n, z):
+    """
+        Normal approximation interval of a mean
+
+        Parameters
+        ----------
+        total : float
+            sum of the values
+        squares : float
+            sum of the squared values
+        n : int
+            number of values
+        z : float
+            standard normal quantile of the confidence
+
+        Returns
+        ----------
+        tuple
+            mean, lower and upper bound
+    """
+    mean = total / n
+    variance = max(squares / n - mean * mean, 0.0) * n / max(n - 1, 1)
+    halfwidth = z * math.sqrt(variance / n)
+    return mean, mean - halfwidth, mean + halfwidth
+
+
+def estimate(match, target_halfwidth=0.005, confidence=0.99, max_games=1000000, score_halfwidth=5.0, turns_halfwidth=0.1,
+             batch_size=1000, workers=1, seed=None, use_weather=False, house_rules=False, sampler="dice", engine="game"):
+    """
+        Plays batches of games until the win probability, score difference and game length are precise enough
+
+        Games are seeded like run_many, so an estimate that used n games
+        saw the same games as run_many(match, n, seed=seed). The intervals
+        are checked after every batch, which makes them slightly optimistic
+        compared to a fixed number of games.
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects or compiled Teams, first team is the home team
+        target_halfwidth : float
+            wanted half width of the home win probability interval
+            Default: 0.005
+        confidence : float
+            confidence level of the intervals
+            Default: 0.99
+        max_games : int
+            number of games after which the estimate stops in any case
+            Default: 1000000
+        score_halfwidth : float
+            wanted half width of the mean score difference interval in points. None to ignore it
+            Default: 5.0
+        turns_halfwidth : float
+            wanted half width of the mean game turns interval. None to ignore it
+            Default: 0.1
+        batch_size : int
+            number of games between two checks
+            Default: 1000
+        workers : int
+            number of worker processes per batch. None uses all cpu cores
+            Default: 1
+        seed : int
+            Seed of the estimate. leave empty to draw a new one
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+        house_rules : boolean
+            Flag if the games use the house rules
+        sampler : str
+            roll sampler, see Base_game.set_sampler
+        engine : str
+            game engine, see match_game
+
+        Returns
+        ----------
+        Dict
+            Dict Parameter:
+            games : int
+                number of games used
+            seed : int
+                Seed of the estimate
+            confidence : float
+                confidence level of the intervals
+            converged : boolean
+                False if max_games was reached before the wanted precision
+            win_probability : dict
+                team : str
+                    Name of the home team
+                estimate : float
+                    share of games the home team ended with the higher score
+                interval : list
+            draw_probability : dict
+                share of games ending with the same score, estimate and interval
+            snitch_probability : dict
+                share of games the home team caught the snitch, team, estimate and interval
+            score_difference : dict
+                mean home - guest score, estimate and interval
+            game_turns : dict
+                mean number of game turns, estimate and interval
+    """
+    if max_games < 1:
+        raise ValueError("max_games has to be at least 1")
+    if batch_size < 1:
+        raise ValueError("batch_size has to be at least 1")
+    match = [team.to_dict() if hasattr(team, "to_dict") else team for team in match]
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    workers = workers or os.cpu_count()
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    options = (use_weather, house_rules, sampler, engine)
+    moments = [0, 0, 0, 0, 0, 0, 0, 0]
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            start = moments[0]
+            stop = min(start + batch_size, max_games)
+            if pool:
+                bounds = [start + (stop - start) * i // workers for i in range(workers + 1)]
+                tasks = [(match, bounds[i], bounds[i + 1], seed) + options for i in range(workers)]
+                parts = list(pool.map(estimate_range, *zip(*tasks)))
+            else:
+                parts = [estimate_range(match, start, stop, seed, *options)]
+            for part in parts:
+                moments = [total + value for total, value in zip(moments, part)]
+            n = moments[0]
+            low, high = wilson_interval(moments[1], n, z)
+            difference = mean_interval(moments[2], moments[3], n, z)
+            turns = mean_interval(moments[4], moments[5], n, z)
+            converged = (high - low) / 2 <= target_halfwidth
+            if score_halfwidth is not None:
+                converged = converged and (difference[2] - difference[1]) / 2 <= score_halfwidth
+            if turns_halfwidth is not None:
+                converged = converged and (turns[2] - turns[1]) / 2 <= turns_halfwidth
+            if converged or n >= max_games:
+                break
+    finally:
+        if pool:
+            pool.shutdown()
+    return {
+        "games": n,
+        "seed": seed,
+        "confidence": confidence,
+        "converged": converged,
+        "win_probability": {"team": match[0]["Name"], "estimate": moments[1] / n, "interval": [low, high]},
+        "draw_probability": {"estimate": moments[6] / n, "interval": list(wilson_interval(moments[6], n, z))},
+        "snitch_probability": {"team": match[0]["Name"], "estimate": moments[7] / n, "interval": list(wilson_interval(moments[7], n, z))},
+        "score_difference": {"estimate": difference[0], "interval": [difference[1], difference[2]]},
+        "game_turns": {"estimate": turns[0], "interval": [turns[1], turns[2]]}
+    }
@@ -0,0 +1,459 @@
+import functools
+
+import numpy as np
+
+# probability of every two six sided dice total from 2 to 12
+DICE_PMF = {total: (6 - abs(total - 7)) / 36 for total in range(2, 13)}
+
+
+def roll_at_least(modifier, threshold):
+    """
+        Probability that a two dice roll plus modifyer reaches a threshold
+
+        Parameters
+        ----------
+        modifier : int
+            Summary of all bonuses and penalties applied to the roll
+        threshold : int
+            Minimal roll result
+
+        Returns
+        ----------
+        float
+            Probability of rolling threshold or more
+    """
+    return sum(p for total, p in DICE_PMF.items() if total + modifier >= threshold)
+
+
+@functools.lru_cache(maxsize=None)
+def tier_probabilities(modifier):
+    """
+        Probabilities of the roll result tiers for a given modifyer
+
+        Parameters
+        ----------
+        modifier : int
+            Summary of all bonuses and penalties applied to the roll
+
+        Returns
+        ----------
+        tuple
+            Probability of fail (< 7), partial success (7 - 9), success (10 - 14) and snitch (15+)
+    """
+    partial = roll_at_least(modifier, 7)
+    success = roll_at_least(modifier, 10)
+    snitch = roll_at_least(modifier, 15)
+    return (1 - partial, partial - success, success - snitch, snitch)
+
+
+class Exact_game:
+    """
+        Exact outcome distribution of a Base_game match without sampling
+
+        The seekers are the only players that decide the end of a game and
+        neither of them is affected by the other players, so each seeker is
+        a small Markov chain over its streak and temp modifyer. The score of
+        each team is a clamped random walk over the chaser, beater and keeper
+        results, which is independent from the seekers once the weather is
+        known. Both are propagated round by round until the remaining
+        probability of a running game drops below the tolerance. A team wins
+        with the higher final score, catching the snitch is reported
+        separately as snitch probability.
+    """
+
+    def __init__(self, teams):
+        """
+            Initiates the exact solver for one match
+
+            Parameters
+            ----------
+            teams : list
+                List of two Team data objects or the compiled Teams from Base_game.load_teams
+                the first team is the home team
+        """
+        # compiled Teams are read through their Team data objects
+        teams = [team.to_dict() if hasattr(team, "to_dict") else team for team in teams]
+        self.teams = teams
+        self.team_names = [teams[0]["Name"], teams[1]["Name"]]
+
+
+    def seeker_chain(self, team, weather, reset_temp):
+        """
+            Generates the probability of a seeker catching the snitch in each round
+
+            Parameters
+            ----------
+            team : int
+                index of the seekers team
+            weather : int
+                Weather modifyer for the game
+            reset_temp : boolean
+                Flag if the temp modifyer is used up by each roll.
+                Base_game only resets it for the seeker of the second team
+
+            Yields
+            ----------
+            float
+                Probability of catching the snitch in round 1, 2, ...
+                (not taking into account the other seeker)
+        """
+        seeker = self.teams[team]["Seeker"]
+        base = seeker["base"] + seeker["mod"] + weather
+        # enumerate all reachable (streak, temp) states and their transitions
+        start = (seeker["streak"], seeker["temp"])
+        index = {start: 0}
+        transitions = []
+        while len(transitions) < len(index):
+            streak, temp = list(index)[len(transitions)]
+            fail, partial, success, snitch = tier_probabilities(base + streak + temp)
+            temp = 0 if reset_temp else temp
+            moves = []
+            for key, q in (((0, -2), fail), ((streak + 1, temp), partial), ((streak + 2, temp), success)):
+                if q:
+                    moves.append((index.setdefault(key, len(index)), q))
+            transitions.append((moves, snitch))
+        moves = np.zeros((len(index), len(index)))
+        caught = np.zeros(len(index))
+        for state, (targets, snitch) in enumerate(transitions):
+            caught[state] = snitch
+            for target, q in targets:
+                moves[state, target] += q
+        states = np.zeros(len(index))
+        states[0] = 1.0
+        while True:
+            yield states @ caught
+            states = states @ moves
+
+
+    def score_delta(self, team, turn, weather):
+        """
+            Distribution of the score change of one team in one round before the clamp
+
+            Parameters
+            ----------
+            team : int
+                index of the team
+            turn : int
+                number of the round starting with 1
+            weather : int
+                Weather modifyer for the game
+
+            Returns
+            ----------
+            numpy.ndarray
+                Probability of each score change in steps of 10 from -20 to +70
+        """
+        own = self.teams[team]
+        other = self.teams[(team + 1) % 2]
+        # point changes in steps of 10 for own and other rolls by tier (fail, partial, success)
+        actions = [
+            (own["Chaser"][(turn - 1) % len(own["Chaser"])], (0, 1, 2)),
+            (other["Chaser"][(turn - 1) % len(other["Chaser"])], (1, 0, 0)),
+            (own["Beater"][(turn - 1) % len(own["Beater"])], (0, 1, 1)),
+            (other["Beater"][(turn - 1) % len(other["Beater"])], (1, 0, -1)),
+            (own["Keeper"], (0, 0, 1)),
+            (other["Keeper"], (1, -1, -1))
+        ]
+        pmf = np.zeros(10)
+        pmf[2] = 1.0
+        for player, points in actions:
+            fail, partial, success, snitch = tier_probabilities(player["base"] + player["mod"] + player["temp"] + weather)
+            step = np.zeros(10)
+            for p, change in zip((fail, partial, success + snitch), points):
+                step[2 + change] += p
+            pmf = np.convolve(pmf, step)[2:12]
+        return pmf
+
+
+    def joint_delta(self, turn, weather):
+        """
+            Joint distribution of the score changes of both teams in one round before the clamp
+
+            Parameters
+            ----------
+            turn : int
+                number of the round starting with 1
+            weather : int
+                Weather modifyer for the game
+
+            Returns
+            ----------
+            numpy.ndarray
+                Probability of each pair of score changes in steps of 10 from -20 to +70,
+                rows are the changes of the first team, columns the ones of the second team
+        """
+        home, guest = self.teams
+        # (first, second) point changes in steps of 10 by tier (fail, partial, success)
+        actions = [
+            (home["Chaser"][(turn - 1) % len(home["Chaser"])], ((0, 1), (1, 0), (2, 0))),
+            (guest["Chaser"][(turn - 1) % len(guest["Chaser"])], ((1, 0), (0, 1), (0, 2))),
+            (home["Beater"][(turn - 1) % len(home["Beater"])], ((0, 1), (1, 0), (1, -1))),
+            (guest["Beater"][(turn - 1) % len(guest["Beater"])], ((1, 0), (0, 1), (-1, 1))),
+            (home["Keeper"], ((0, 1), (0, -1), (1, -1))),
+            (guest["Keeper"], ((1, 0), (-1, 0), (-1, 1)))
+        ]
+        pmf = np.zeros((10, 10))
+        pmf[2, 2] = 1.0
+        for player, points in actions:
+            fail, partial, success, snitch = tier_probabilities(player["base"] + player["mod"] + player["temp"] + weather)
+            step = np.zeros((10, 10))
+            for p, (first, second) in zip((fail, partial, success + snitch), points):
+                # changes never leave the -20 to +70 range, the roll does not wrap around
+                step += p * np.roll(pmf, (first, second), axis=(0, 1))
+            pmf = step
+        return pmf
+
+
+    def score_outcomes(self, weather, catches, tolerance):
+        """
+            Probability of each team winning on the final score and of a draw
+
+            The scores of both teams change through the same rolls, so they
+            are propagated as one joint distribution clamped at 0 after every
+            round. Once a further clamp is negligible (weighted by the games
+            still running) only the score difference is propagated on, which
+            keeps long games cheap.
+
+            Parameters
+            ----------
+            weather : int
+                Weather modifyer for the game
+            catches : tuple
+                two numpy arrays with the probability of the first and the second team
+                catching the snitch in round 1, 2, ...
+            tolerance : float
+                Probability scale of the results
+
+            Returns
+            ----------
+            tuple
+                probability of a first team win, a draw and a second team win
+        """
+        turns = catches[0].size
+        cycle = np.lcm.reduce([len(t[role]) for t in self.teams for role in ("Chaser", "Beater")])
+        kernels = [self.joint_delta(turn, weather) for turn in range(1, cycle + 1)]
+        # probability of a game still running in round 1, 2, ...
+        running = np.cumsum((catches[0] + catches[1])[::-1])[::-1]
+        # running weighted probability of any later clamp, from the exact single team score walks
+        clamps = np.zeros(turns)
+        for axis in (1, 0):
+            scores = np.ones(1)
+            for turn in range(turns):
+                scores = np.convolve(scores, kernels[turn % cycle].sum(axis=axis))
+                clamps[turn] += running[turn] * scores[:2].sum()
+                scores = np.concatenate(([scores[:3].sum()], scores[3:]))
+                scores = scores[:np.searchsorted(np.cumsum(scores), 1 - tolerance / 1000) + 1]
+        later = np.cumsum(clamps[::-1])[::-1]
+        outcomes = np.zeros(3)
+        # joint score distribution in steps of 10 starting at the scores (low_1, low_2)
+        scores = np.ones((1, 1))
+        low = [0, 0]
+        differences = None
+        for turn in range(turns):
+            kernel = kernels[turn % cycle]
+            if differences is None:
+                rows, columns = scores.shape
+                grown = np.zeros((rows + 9, columns + 9))
+                for (i, j), p in np.ndenumerate(kernel):
+                    if p:
+                        grown[i:i + rows, j:j + columns] += p * scores
+                scores = grown
+                low = [low[0] - 2, low[1] - 2]
+                # distribution of first - second score, starting at the difference low
+                rows, columns = scores.shape
+                start = low[0] - low[1] - columns + 1
+                pre_clamp = np.bincount((np.arange(rows)[:, None] - np.arange(columns)[None, :] + columns - 1).ravel(), scores.ravel())
+            else:
+                step = np.bincount((np.arange(10)[:, None] - np.arange(10)[None, :] + 9).ravel(), kernel.ravel())
+                differences = np.convolve(differences, step)
+                start -= 9
+                pre_clamp = differences
+            # the catching team adds 15 to its score, the other score is clamped at 0 which never changes the winner
+            for team, limit in ((0, -15), (1, 15)):
+                p_catch = catches[team][turn]
+                index = limit - start
+                below = pre_clamp[:max(min(index, pre_clamp.size), 0)].sum()
+                draw = pre_clamp[index] if 0 <= index < pre_clamp.size else 0.0
+                outcomes += p_catch * np.array([pre_clamp.sum() - below - draw, draw, below])
+            if turn + 1 == turns:
+                break
+            cutoff = tolerance / 1000 / max(running[turn + 1], tolerance)
+            if differences is None:
+                # ensure no team is below 0 points
+                for axis in (0, 1):
+                    if low[axis] < 0:
+                        scores = np.moveaxis(scores, axis, 0)
+                        scores[-low[axis]] += scores[:-low[axis]].sum(axis=0)
+                        scores = np.moveaxis(scores[-low[axis]:], 0, axis)
+                        low[axis] = 0
+                # drop negligible tails of both scores
+                for axis in (0, 1):
+                    total = np.cumsum(scores.sum(axis=1 - axis))
+                    first = np.searchsorted(total, cutoff)
+                    last = np.searchsorted(total, total[-1] - cutoff)
+                    scores = np.take(scores, np.arange(first, last + 1), axis=axis)
+                    low[axis] += first
+                if later[turn + 1] < tolerance / 1000:
+                    rows, columns = scores.shape
+                    start = low[0] - low[1] - columns + 1
+                    differences = np.bincount((np.arange(rows)[:, None] - np.arange(columns)[None, :] + columns - 1).ravel(), scores.ravel())
+            elif turn % 16 == 0:
+                total = np.cumsum(differences)
+                first = np.searchsorted(total, cutoff)
+                last = np.searchsorted(total, total[-1] - cutoff)
+                differences = differences[first:last + 1]
+                start += first
+        return tuple(outcomes)
+
+
+    def score_expectations(self, team, weather, turns, tolerance):
+        """
+            Expected final score of a team depending on the ending round
+
+            The mean score only changes through the drift of each round and
+            the end of round clamp, so the distribution only has to be exact
+            close to 0. Tails with less than tolerance / 1000 probability are
+            dropped from it, which keeps the arrays short for very long games.
+
+            Parameters
+            ----------
+            team : int
+                index of the team
+            weather : int
+                Weather modifyer for the game
+            turns : int
+                number of rounds to propagate
+            tolerance : float
+                Probability scale of the results
+
+            Returns
+            ----------
+            tuple
+                two numpy arrays with the expected final score for a game ending
+                in round 1, 2, ... when the team caught the snitch and when the
+                other team caught it
+        """
+        cycle = np.lcm.reduce([len(t[role]) for t in self.teams for role in ("Chaser", "Beater")])
+        deltas = [self.score_delta(team, turn, weather) for turn in range(1, cycle + 1)]
+        drifts = [delta @ np.arange(-2, 8) for delta in deltas]
+        won = np.zeros(turns)
+        lost = np.zeros(turns)
+        cutoff = tolerance / 1000
+        # score distribution in steps of 10 starting at the score low
+        scores = np.ones(1)
+        low = 0
+        mean = 0.0
+        for turn in range(turns):
+            # scores before the end of round clamp
+            scores = np.convolve(scores, deltas[turn % cycle])
+            low -= 2
+            mean += drifts[turn % cycle]
+            won[turn] = mean + 15
+            # ensure no team is below 0 points
+            if low < 0:
+                clamped = scores[:-low]
+                mean -= clamped @ np.arange(low, 0)
+                scores[-low] += clamped.sum()
+                scores = scores[-low:]
+                low = 0
+            lost[turn] = mean
+            # drop negligible tails, the mean is tracked separately
+            if turn % 16 == 0:
+                total = np.cumsum(scores)
+                first = np.searchsorted(total, cutoff)
+                last = np.searchsorted(total, total[-1] - cutoff)
+                scores = scores[first:last + 1]
+                low += first
+        return won * 10, lost * 10
+
+
+    def solve(self, use_weather=False, tolerance=1e-12, max_turns=100000):
+        """
+            Computes the exact outcome distribution of the match
+
+            Parameters
+            ----------
+            use_weather : boolean
+                Flag if weather modifyer should aplly to the game.
+                Default: False
+            tolerance : float
+                Probability of a still running game at which the propagation stops
+                Default: 1e-12
+            max_turns : int
+                maximum number of rounds to propagate
+                Default: 100000
+
+            Returns
+            ----------
+            Dict
+                Collection of match statistics
+                Dict Parameter:
+                win_probability : dict
+                    probability of team_1 and team_2 ending with the higher score
+                draw_probability : float
+                    probability of both teams ending with the same score
+                snitch_probability : dict
+                    probability of team_1 and team_2 catching the snitch
+                game_turns : numpy.ndarray
+                    Probability of the game ending in round 0, 1, 2, ...
+                expected_turns : float
+                    mean number of rounds
+                expected_score : dict
+                    team_1 : float
+                    team_2 : float
+                unresolved : float
+                    Probability of games still running after the last propagated round
+        """
+        conditions = [(0, 1.0)]
+        if use_weather:
+            bad = sum(p for total, p in DICE_PMF.items() if total <= 7)
+            conditions = [(-1, bad), (0, 1 - bad)]
+        snitches = [0.0, 0.0]
+        outcomes = np.zeros(3)
+        scores = [0.0, 0.0]
+        turns = np.zeros(1)
+        for weather, p_weather in conditions:
+            ending = []
+            for start in (0, 1):
+                first = self.seeker_chain(start, weather, False)
+                second = self.seeker_chain(1 - start, weather, True)
+                first_free = 1.0
+                second_free = 1.0
+                p_first = []
+                p_second = []
+                # both seekers search independently until one of them catches the snitch
+                while first_free * second_free > tolerance and len(p_first) < max_turns:
+                    catch = next(first)
+                    p_first.append(catch * second_free)
+                    first_free -= catch
+                    # the second seeker only gets a chance when the first one missed
+                    catch = next(second)
+                    p_second.append(first_free * catch)
+                    second_free -= catch
+                ending.append((start, 0.5 * p_weather * np.array(p_first), 0.5 * p_weather * np.array(p_second)))
+            length = max(p.size for _, p, _ in ending)
+            expectations = [self.score_expectations(team, weather, length, tolerance) for team in (0, 1)]
+            # probability of each team catching the snitch in round 1, 2, ... over both starting teams
+            catches = (np.zeros(length), np.zeros(length))
+            for start, p_first, p_second in ending:
+                p_team = {start: p_first, 1 - start: p_second}
+                n = p_first.size
+                for team in (0, 1):
+                    won, lost = expectations[team]
+                    catches[team][:n] += p_team[team]
+                    snitches[team] += p_team[team].sum()
+                    scores[team] += p_team[team] @ won[:n] + p_team[1 - team] @ lost[:n]
+                if turns.size < n + 1:
+                    turns = np.pad(turns, (0, n + 1 - turns.size))
+                turns[1:n + 1] += p_first + p_second
+            outcomes += self.score_outcomes(weather, catches, tolerance)
+        resolved = snitches[0] + snitches[1]
+        return {
+            "win_probability": {self.team_names[0]: float(outcomes[0]), self.team_names[1]: float(outcomes[2])},
+            "draw_probability": float(outcomes[1]),
+            "snitch_probability": dict(zip(self.team_names, snitches)),
+            "game_turns": turns,
+            "expected_turns": float(turns @ np.arange(turns.size)),
+            "expected_score": dict(zip(self.team_names, scores)),
+            "unresolved": max(1 - resolved, 0.0)
+        }
@@ -0,0 +1,283 @@
+import random
+
+import numpy as np
+
+from exact_solver import DICE_PMF, Exact_game, tier_probabilities
+
+# score changes in steps of 10 for the own and the other team by tier (fail, partial, success)
+ROLE_POINTS = {
+    "Chaser": ((0, 1), (1, 0), (2, 0)),
+    "Beater": ((0, 1), (1, 0), (1, -1)),
+    "Keeper": ((0, 1), (0, -1), (1, -1))
+}
+# lowest score change of a team in one round, a score of 20 * L can not reach 0 within L rounds
+MIN_ROUND_DELTA = -20
+# rounds played at once while a team is close to 0 points
+PATH_ROUNDS = 1024
+
+
+class Fast_game:
+    """
+        Base_game engine whose cost barely grows with the game length
+
+        The seekers alone decide when and by whom a game ends, so the ending
+        round and the snitch catching team are drawn at once from the exact
+        seeker distribution of Exact_game. The score is then moved forward in
+        blocks of rounds: as long as both scores are at least 20 points per
+        round of the block, the end of round clamp can not trigger, so the
+        number of fails, partial successes and successes of every player in
+        the block is drawn from one multinomial each. While a team is close to
+        0 points, the rolls of up to PATH_ROUNDS rounds are drawn at once and
+        both scores are clamped along their running sums, so the clamp is
+        exact and a team stuck near 0 points does not slow the game down.
+        The final round is played on its own.
+
+        The ending distribution is propagated until the probability of a still
+        running game drops below the tolerance, longer games are never drawn.
+        The results differ from Base_game by at most that probability (in total
+        variation). Only the Base_game rules are supported.
+    """
+
+    def __init__(self, teams, tolerance=1e-12, max_turns=100000):
+        """
+            Initiates the fast forward engine for one match
+
+            Parameters
+            ----------
+            teams : list
+                List of two Team data objects or the compiled Teams from Base_game.load_teams
+                the first team is the home team
+            tolerance : float
+                Probability of a still running game at which the ending distribution is cut
+                Default: 1e-12
+            max_turns : int
+                maximum number of rounds of the ending distribution
+                Default: 100000
+        """
+        self.exact = Exact_game(teams)
+        self.teams = self.exact.teams
+        self.team_names = self.exact.team_names
+        self.tolerance = tolerance
+        self.max_turns = max_turns
+        self.bad_weather = sum(p for total, p in DICE_PMF.items() if total <= 7)
+        # acting players of both teams, rows of the tier probability and points tables
+        self.rows = []
+        for team, data in enumerate(self.teams):
+            for role in ("Chaser", "Beater"):
+                for index, player in enumerate(data[role]):
+                    self.rows.append((team, role, index, len(data[role]), player))
+            self.rows.append((team, "Keeper", 0, 1, data["Keeper"]))
+        # points of each row and tier for the home and the guest team
+        self.points = np.zeros((2, len(self.rows), 3), dtype=np.int64)
+        for row, (team, role, _, _, _) in enumerate(self.rows):
+            for tier, (own, other) in enumerate(ROLE_POINTS[role]):
+                self.points[team, row, tier] = own * 10
+                self.points[1 - team, row, tier] = other * 10
+        # rotation of the rows, a row acts in the rounds where (turn - 1) % players == index
+        self.indices = np.array([index for _, _, index, _, _ in self.rows])
+        self.players = np.array([players for _, _, _, players, _ in self.rows])
+        self.tiers = {}
+        self.endings = {}
+        self.rng = np.random.default_rng()
+
+
+    def tier_table(self, weather):
+        """
+            Tier probabilities of every acting player
+
+            Parameters
+            ----------
+            weather : int
+                Weather modifyer for the game
+
+            Returns
+            ----------
+            numpy.ndarray
+                Probability of fail, partial success and success (including snitch) per row
+        """
+        table = self.tiers.get(weather)
+        if table is None:
+            table = np.zeros((len(self.rows), 3))
+            for row, (_, _, _, _, player) in enumerate(self.rows):
+                fail, partial, success, snitch = tier_probabilities(player["base"] + player["mod"] + player["temp"] + weather)
+                table[row] = (fail, partial, success + snitch)
+            # cumulative thresholds for single rounds
+            self.tiers[weather] = table = (table, np.cumsum(table, axis=1).tolist())
+        return table
+
+
+    def ending_table(self, weather, start):
+        """
+            Cumulative probability of every ending round and snitch catching seeker
+
+            Parameters
+            ----------
+            weather : int
+                Weather modifyer for the game
+            start : int
+                index of the starting team
+
+            Returns
+            ----------
+            numpy.ndarray
+                cumulative probabilities, entry 2 * (turn - 1) is the starting team
+                catching the snitch in turn, the following entry the other team
+        """
+        key = (weather, start)
+        table = self.endings.get(key)
+        if table is None:
+            first = self.exact.seeker_chain(start, weather, False)
+            second = self.exact.seeker_chain(1 - start, weather, True)
+            first_free = 1.0
+            second_free = 1.0
+            endings = []
+            # same propagation as Exact_game.solve
+            while first_free * second_free > self.tolerance and len(endings) < 2 * self.max_turns:
+                catch = next(first)
+                endings.append(catch * second_free)
+                first_free -= catch
+                catch = next(second)
+                endings.append(first_free * catch)
+                second_free -= catch
+            table = self.endings[key] = np.cumsum(endings)
+        return table
+
+
+    def block_delta(self, turn, rounds, weather):
+        """
+            Draws the summed up score changes of chasers, beaters and keepers over some rounds
+
+            No clamp is applied, the caller has to make sure it can not trigger
+
+            Parameters
+            ----------
+            turn : int
+                number of the first round of the block starting with 1
+            rounds : int
+                number of rounds in the block
+            weather : int
+                Weather modifyer for the game
+
+            Returns
+            ----------
+            list
+                score change of the home and guest team
+        """
+        table, cumulative = self.tier_table(weather)
+        if rounds == 1:
+            # one uniform draw per acting player is cheaper than multinomials
+            draws = self.rng.random(len(self.rows)).tolist()
+            delta = [0, 0]
+            for row, (team, role, index, players, _) in enumerate(self.rows):
+                if (turn - 1) % players != index:
+                    continue
+                partial, success, _ = cumulative[row]
+                tier = 0 if draws[row] < partial else 1 if draws[row] < success else 2
+                own, other = ROLE_POINTS[role][tier]
+                delta[team] += own * 10
+                delta[1 - team] += other * 10
+            return delta
+        # number of actions of every player, players of a role take turns
+        actions = [rounds // players + (1 if (index - turn + 1) % players < rounds % players else 0) for _, _, index, players, _ in self.rows]
+        counts = self.rng.multinomial(actions, table)
+        return [int((counts * self.points[0]).sum()), int((counts * self.points[1]).sum())]
+
+
+    def path_block(self, turn, rounds, weather, score):
+        """
+            Plays some rounds with the end of round clamp of both teams
+
+            The rolls of all rounds are drawn at once. A clamped score ends at
+            the summed changes minus their lowest running sum, or plus the start
+            score when the running sum never reached it, so every round is
+            clamped without playing it on its own.
+
+            Parameters
+            ----------
+            turn : int
+                number of the first round of the block starting with 1
+            rounds : int
+                number of rounds in the block
+            weather : int
+                Weather modifyer for the game
+            score : list
+                score of the home and guest team before the block
+
+            Returns
+            ----------
+            list
+                clamped score of the home and guest team after the block
+        """
+        _, cumulative = self.tier_table(weather)
+        thresholds = np.array(cumulative)
+        draws = self.rng.random((rounds, len(self.rows)))
+        tiers = (draws >= thresholds[:, 0]).astype(np.int64) + (draws >= thresholds[:, 1])
+        acting = (np.arange(turn - 1, turn - 1 + rounds)[:, None] % self.players) == self.indices
+        rows = np.arange(len(self.rows))
+        result = []
+        for team in (0, 1):
+            running = np.cumsum(np.where(acting, self.points[team][rows, tiers], 0).sum(axis=1))
+            result.append(int(running[-1] - min(-score[team], running.min())))
+        return result
+
+
+    def run_game(self, single_roles=False, use_weather=False, seed=None):
+        """
+            Plays a game without simulating every round
+
+            Parameters
+            ----------
+            single_roles : boolean
+                unused, Base_game always rotates its chasers and beaters
+            use_weather : boolean
+                Flag if weather modifyer should aplly to the game.
+                Default: False
+            seed : int
+                Seed of the game. leave empty for a new game
+
+            Returns
+            ----------
+            Dict
+                Collection of finished game statistics, see Base_game.run_game
+                (a seed replays the game with Fast_game, not with Base_game)
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.rng = rng = np.random.default_rng(seed)
+        weather = -1 if use_weather and rng.random() < self.bad_weather else 0
+        start = int(rng.integers(2))
+        endings = self.ending_table(weather, start)
+        # the game is cut at the tolerance, draw among the propagated endings
+        ending = int(np.searchsorted(endings, rng.random() * endings[-1], side="right"))
+        ending = min(ending, endings.size - 1)
+        turns = ending // 2 + 1
+        winner = start if ending % 2 == 0 else 1 - start
+
+        score = [0, 0]
+        turn = 1
+        while turn < turns:
+            # largest block the clamp can not reach
+            rounds = min(turns - turn, min(score) // -MIN_ROUND_DELTA)
+            if rounds:
+                delta = self.block_delta(turn, rounds, weather)
+                score = [max(score[0] + delta[0], 0), max(score[1] + delta[1], 0)]
+            else:
+                # a team is close to 0 points, clamp the rounds one by one
+                rounds = min(turns - turn, PATH_ROUNDS)
+                score = self.path_block(turn, rounds, weather, score)
+            turn += rounds
+        # the final round adds the snitch before the clamp
+        delta = self.block_delta(turn, 1, weather)
+        delta[winner] += 150
+        score = [max(score[0] + delta[0], 0), max(score[1] + delta[1], 0)]
+        return {
+            "ending_team": self.team_names[winner],
+            "game_turns": turns,
+            "score": {
+                self.team_names[0]: score[0],
+                self.team_names[1]: score[1]
+            },
+            "start_team": self.team_names[start],
+            "weather": weather,
+            "seed": seed
+        }
@@ -0,0 +1,232 @@
+import sys
+import time
+
+# game methods timed by a profile, phases of a round and the single player actions
+PHASES = ("run_game", "pre_game", "chaser_turns", "beater_turns", "keeper_turns", "Seeker_turns", "emit", "log_event", "add_track_record")
+ACTIONS = ("chaser_action", "beater_action", "keeper_action", "seeker_action", "beater_target_seeker")
+# raw random number generator calls, every other rng method is built on them
+RNG_METHODS = ("getrandbits", "random")
+
+
+class Game_profile:
+    """
+        Call counts and cumulative wall and cpu time of the game phases and actions
+
+        A profile is attached to a game instance by shadowing the timed methods
+        with wrappers on the instance, a game without a profile runs the plain
+        class methods and pays nothing. Times are inclusive, so a phase contains
+        the actions and event listeners called from it.
+    """
+
+    def __init__(self):
+        """
+            Initiates an empty profile
+        """
+        self.games = 0
+        self.calls = {}
+        self.wall = {}
+        self.cpu = {}
+        self.rng_draws = 0
+        self.allocated_blocks = 0
+
+
+    def timed(self, name, function):
+        """
+            Wraps a function to count its calls and sum up its run time
+
+            Parameters
+            ----------
+            name : str
+                key of the function in the profile
+            function : callable
+                function to time
+
+            Returns
+            ----------
+            callable
+                timed function
+        """
+        calls = self.calls
+        wall = self.wall
+        cpu = self.cpu
+        calls.setdefault(name, 0)
+        wall.setdefault(name, 0.0)
+        cpu.setdefault(name, 0.0)
+        perf_counter = time.perf_counter
+        process_time = time.process_time
+
+        def wrapper(*args, **kwargs):
+            start_wall = perf_counter()
+            start_cpu = process_time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                cpu[name] += process_time() - start_cpu
+                wall[name] += perf_counter() - start_wall
+                calls[name] += 1
+        wrapper.__wrapped__ = function
+        return wrapper
+
+
+    def counted(self, function):
+        """
+            Wraps a random number generator method to count its calls
+
+            Parameters
+            ----------
+            function : callable
+                rng method
+
+            Returns
+            ----------
+            callable
+                counted function
+        """
+        def wrapper(*args):
+            self.rng_draws += 1
+            return function(*args)
+        wrapper.__wrapped__ = function
+        return wrapper
+
+
+    def attach(self, game):
+        """
+            Starts profiling a game instance
+
+            Parameters
+            ----------
+            game : Base_game
+                game to profile, subscribe listeners like log_event after attaching
+                so their calls are timed too
+        """
+        for name in PHASES + ACTIONS:
+            if name == "run_game" or not hasattr(game, name):
+                continue
+            setattr(game, name, self.timed(name, getattr(game, name)))
+        run_game = self.timed("run_game", getattr(game, "run_game"))
+
+        def profiled_game(*args, **kwargs):
+            blocks = sys.getallocatedblocks()
+            try:
+                return run_game(*args, **kwargs)
+            finally:
+                self.allocated_blocks += sys.getallocatedblocks() - blocks
+                self.games += 1
+        profiled_game.__wrapped__ = run_game.__wrapped__
+        game.run_game = profiled_game
+        for name in RNG_METHODS:
+            setattr(game.rng, name, self.counted(getattr(game.rng, name)))
+        game.profile = self
+
+
+    def detach(self, game):
+        """
+            Stops profiling a game instance
+
+            Parameters
+            ----------
+            game : Base_game
+                profiled game
+        """
+        for name in PHASES + ACTIONS:
+            game.__dict__.pop(name, None)
+        for name in RNG_METHODS:
+            game.rng.__dict__.pop(name, None)
+        game.profile = None
+
+
+    def merge(self, other):
+        """
+            Adds the counters of another profile, e.g. of a pool worker
+
+            Parameters
+            ----------
+            other : Game_profile or dict
+                profile or its to_dict result
+
+            Returns
+            ----------
+            Game_profile
+                self
+        """
+        if isinstance(other, dict):
+            other = Game_profile.from_dict(other)
+        self.games += other.games
+        self.rng_draws += other.rng_draws
+        self.allocated_blocks += other.allocated_blocks
+        for name in other.calls:
+            self.calls[name] = self.calls.get(name, 0) + other.calls[name]
+            self.wall[name] = self.wall.get(name, 0.0) + other.wall[name]
+            self.cpu[name] = self.cpu.get(name, 0.0) + other.cpu[name]
+        return self
+
+
+    def to_dict(self):
+        """
+            Converts the profile into json serializable counters
+
+            Returns
+            ----------
+            Dict
+                Dict Parameter:
+                games : int
+                    number of profiled games
+                rng_draws : int
+                    raw random number generator calls
+                allocated_blocks : int
+                    memory blocks still allocated after the games (sys.getallocatedblocks)
+                timings : dict
+                    per phase and action: calls, wall and cpu seconds
+        """
+        return {
+            "games": self.games,
+            "rng_draws": self.rng_draws,
+            "allocated_blocks": self.allocated_blocks,
+            "timings": {name: {"calls": self.calls[name], "wall": self.wall[name], "cpu": self.cpu[name]} for name in self.calls}
+        }
+
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+            Rebuilds a profile from its to_dict result
+
+            Parameters
+            ----------
+            data : dict
+                to_dict result
+
+            Returns
+            ----------
+            Game_profile
+                the profile
+        """
+        profile = cls()
+        profile.games = data["games"]
+        profile.rng_draws = data["rng_draws"]
+        profile.allocated_blocks = data["allocated_blocks"]
+        for name, timing in data["timings"].items():
+            profile.calls[name] = timing["calls"]
+            profile.wall[name] = timing["wall"]
+            profile.cpu[name] = timing["cpu"]
+        return profile
+
+
+    def report(self):
+        """
+            Renders the profile as text table
+
+            Returns
+            ----------
+            list
+                report lines
+        """
+        games = max(self.games, 1)
+        lines = [
+            "{} games, {:.1f} rng draws and {:+.1f} allocated blocks per game".format(self.games, self.rng_draws / games, self.allocated_blocks / games),
+            "{:<22}{:>12}{:>14}{:>14}{:>12}".format("", "calls", "wall ms", "cpu ms", "us/call")
+        ]
+        for name in PHASES + ACTIONS:
+            if self.calls.get(name):
+                lines.append("{:<22}{:>12}{:>14.1f}{:>14.1f}{:>12.2f}".format(name, self.calls[name], self.wall[name] * 1e3, self.cpu[name] * 1e3, self.wall[name] / self.calls[name] * 1e6))
+        return lines
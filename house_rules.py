@@ -0,0 +1,288 @@
+import copy
+import functools
+
+# phases of a round in playing order, named after the Base_game methods playing them
+ROUND_PHASES = ("chaser_turns", "beater_turns", "keeper_turns", "Seeker_turns")
+# rules of --house-rules without names and of house_rules=True
+DEFAULT_RULES = ("target_seeker",)
+
+HOUSE_RULES = {}
+
+
+class House_rule:
+    """
+        A house rule hooking one phase of a round
+
+        The step of a rule is a function getting the game, it either replaces
+        the phase or runs before or after it. The state of a rule are game
+        attributes with their start value, they are set on every reset and
+        kept in snapshots.
+    """
+
+    def __init__(self, name, phase, step, mode="replace", state=None, description=""):
+        """
+            Initiates a house rule
+
+            Parameters
+            ----------
+            name : str
+                Name of the rule for --house-rules
+            phase : str
+                hooked phase, one of ROUND_PHASES
+            step : callable
+                step(game) playing the rule for one round
+            mode : str
+                replace, before or after the phase
+                Default: replace
+            state : dict
+                game attribute: start value
+            description : str
+                short help text
+        """
+        if phase not in ROUND_PHASES:
+            raise ValueError("unknown round phase {}".format(phase))
+        if mode not in ("replace", "before", "after"):
+            raise ValueError("unknown house rule mode {}".format(mode))
+        self.name = name
+        self.phase = phase
+        self.step = step
+        self.mode = mode
+        self.state = state or {}
+        self.description = description
+
+
+def house_rule(name, phase, mode="replace", state=None, description=""):
+    """
+        Decorator registering a step function as house rule
+
+        Parameters
+        ----------
+        name : str
+            Name of the rule for --house-rules
+        phase : str
+            hooked phase, one of ROUND_PHASES
+        mode : str
+            replace, before or after the phase
+        state : dict
+            game attribute: start value
+        description : str
+            short help text
+
+        Returns
+        ----------
+        callable
+            decorator returning the unchanged step
+    """
+    def register(step):
+        HOUSE_RULES[name] = House_rule(name, phase, step, mode, state, description)
+        return step
+    return register
+
+
+def rule_names(house_rules):
+    """
+        Normalizes the house_rules argument of the run functions
+
+        Parameters
+        ----------
+        house_rules : boolean, str or list
+            False for no rules, True for DEFAULT_RULES or the names of the rules
+
+        Returns
+        ----------
+        tuple
+            names of the enabled rules
+    """
+    if not house_rules:
+        return ()
+    if house_rules is True:
+        return DEFAULT_RULES
+    if isinstance(house_rules, str):
+        house_rules = (house_rules,)
+    unknown = [name for name in house_rules if name not in HOUSE_RULES]
+    if unknown:
+        raise ValueError("unknown house rules {}, known are {}".format(", ".join(unknown), ", ".join(HOUSE_RULES)))
+    return tuple(house_rules)
+
+
+def rule_state(house_rules):
+    """
+        Start values of the state of enabled house rules
+
+        Parameters
+        ----------
+        house_rules : tuple
+            names of the enabled rules
+
+        Returns
+        ----------
+        dict
+            game attribute: fresh start value
+    """
+    state = {}
+    for name in house_rules:
+        for key, value in HOUSE_RULES[name].state.items():
+            state[key] = copy.deepcopy(value)
+    return state
+
+
+def compile_round(game, house_rules):
+    """
+        Combines the phases of a game and its house rules into one flat list of round steps
+
+        The phases are looked up on the game instance once, so wrappers like
+        Game_profile are part of the steps. A replacing rule is timed under the
+        name of the phase it replaces.
+
+        Parameters
+        ----------
+        game : Base_game
+            game to play the steps on
+        house_rules : tuple
+            names of the enabled rules
+
+        Returns
+        ----------
+        list
+            callables without arguments, played in order each round
+    """
+    phases = {phase: [[], getattr(game, phase), []] for phase in ROUND_PHASES}
+    replaced = {}
+    for name in house_rules:
+        rule = HOUSE_RULES[name]
+        if rule.mode == "replace":
+            if rule.phase in replaced:
+                raise ValueError("house rules {} and {} both replace {}".format(replaced[rule.phase], name, rule.phase))
+            replaced[rule.phase] = name
+        step = functools.partial(rule.step, game)
+        if game.profile is not None:
+            step = game.profile.timed(rule.phase if rule.mode == "replace" else name, step)
+        if rule.mode == "replace":
+            phases[rule.phase][1] = step
+        else:
+            phases[rule.phase][0 if rule.mode == "before" else 2].append(step)
+    steps = []
+    for phase in ROUND_PHASES:
+        before, step, after = phases[phase]
+        steps.extend(before)
+        steps.append(step)
+        steps.extend(after)
+    return steps
+
+
+@house_rule("target_seeker", "beater_turns", state={"seeker_target": [0, 0]},
+            description="beaters may target the other seeker instead of the chasers when the seeker is doing well")
+def target_seeker(game, single_roles=False):
+    """
+        Performes all Beater actions for one turn with the target seeker house rule
+
+        Parameters
+        ----------
+        game : Base_game
+            game to play
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+            Default: False
+
+        Returns
+        ----------
+        list
+            List with relative score changes ordered start team -> second team
+    """
+    target_mod = 3
+    start_i, last_i = game.start_i, game.last_i
+    teams = game.teams
+    # first team Beater
+    # check if beater targets seeker instead of normal action
+    if game.sum_modifyer(teams[last_i].seeker) >= target_mod and game.dice_roll(stats=-game.seeker_target[last_i]) > 6:
+        result_1 = game.beater_target_seeker(teams[start_i].beaters, game.next_beater[start_i], team=game.team_1_name)
+        teams[start_i].seeker.temp += result_1["own"]
+        teams[last_i].seeker.temp += result_1["other"]
+        result_1["own"] = 0
+        result_1["other"] = result_1["other_points"]
+        # reduce chance to target seeker again
+        game.seeker_target[last_i] += 2
+    else:
+        result_1 = game.beater_action(teams[start_i].beaters, game.next_beater[start_i], team=game.team_1_name)
+        # increase chance to target seeker toward base value
+        if game.seeker_target[last_i] > 0:
+            game.seeker_target[last_i] -= 1
+    if not single_roles:
+        game.next_beater[start_i] = (game.next_beater[start_i] + 1) % len(teams[start_i].beaters)
+    # second team Beater
+    # check if beater targets seeker instead of normal action
+    if game.sum_modifyer(teams[start_i].seeker) >= target_mod and game.dice_roll(stats=-game.seeker_target[start_i]) > 6:
+        # the original rule rolls with the beaters of the first team, kept so seeds replay the same games
+        result_2 = game.beater_target_seeker(teams[start_i].beaters, game.next_beater[start_i], team=game.team_1_name, acting=game.team_2_name)
+        teams[last_i].seeker.temp += result_2["own"]
+        teams[start_i].seeker.temp += result_2["other"]
+        result_2["own"] = 0
+        result_2["other"] = result_2["other_points"]
+        # reduce chance to target seeker again
+        game.seeker_target[start_i] += 2
+    else:
+        result_2 = game.beater_action(teams[last_i].beaters, game.next_beater[last_i], team=game.team_2_name)
+        # increase chance to target seeker toward base value
+        if game.seeker_target[start_i] > 0:
+            game.seeker_target[start_i] -= 1
+    if not single_roles:
+        game.next_beater[last_i] = (game.next_beater[last_i] + 1) % len(teams[last_i].beaters)
+    score_change = [result_1["own"] + result_2["other"], result_1["other"] + result_2["own"]]
+    game.score[start_i] += score_change[0]
+    game.score[last_i] += score_change[1]
+    return [score_change]
+
+
+def all_players(game, role, action):
+    # every player of the role acts, alternating between the teams
+    start_players = getattr(game.teams[game.start_i], role)
+    last_players = getattr(game.teams[game.last_i], role)
+    score_change = [0, 0]
+    for index in range(max(len(start_players), len(last_players))):
+        if index < len(start_players):
+            result = action(start_players, index, team=game.team_1_name)
+            score_change[0] += result["own"]
+            score_change[1] += result["other"]
+        if index < len(last_players):
+            result = action(last_players, index, team=game.team_2_name)
+            score_change[0] += result["other"]
+            score_change[1] += result["own"]
+    game.score[game.start_i] += score_change[0]
+    game.score[game.last_i] += score_change[1]
+    return [score_change]
+
+
+@house_rule("all_chasers", "chaser_turns", description="every chaser acts each round instead of one chaser per team")
+def all_chasers(game):
+    """
+        Performes a chaser action of every chaser for one turn
+
+        Parameters
+        ----------
+        game : Base_game
+            game to play
+
+        Returns
+        ----------
+        list
+            List with relative score changes ordered start team -> second team
+    """
+    return all_players(game, "chasers", game.chaser_action)
+
+
+@house_rule("all_beaters", "beater_turns", description="every beater acts each round instead of one beater per team")
+def all_beaters(game):
+    """
+        Performes a beater action of every beater for one turn
+
+        Parameters
+        ----------
+        game : Base_game
+            game to play
+
+        Returns
+        ----------
+        list
+            List with relative score changes ordered start team -> second team
+    """
+    return all_players(game, "beaters", game.beater_action)
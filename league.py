@@ -0,0 +1,449 @@
+import argparse
+import json
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from quidditch import match_game, match_seed, play_match
+
+logger = logging.getLogger(__name__)
+
+# points for a won, drawn and lost game
+POINTS = (3, 1, 0)
+
+
+def load_league_teams(source):
+    """
+        Loads the teams of a league
+
+        Parameters
+        ----------
+        source : str or list
+            Directory containing one team json file per team (see Example_team.json),
+            or a list of team file paths or Team data objects
+
+        Returns
+        ----------
+        list
+            List of Team data objects
+    """
+    if isinstance(source, str):
+        source = sorted(os.path.join(source, f) for f in os.listdir(source) if f.endswith(".json"))
+    teams = []
+    for team in source:
+        if isinstance(team, str):
+            with open(team, mode="r") as tfile:
+                team = json.load(tfile)
+        # skip match and result files lying in the same directory
+        if isinstance(team, dict) and "Seeker" in team:
+            teams.append(team)
+    return teams
+
+
+def round_robin(count):
+    """
+        Builds a home and away round robin schedule with the circle method
+
+        Parameters
+        ----------
+        count : int
+            number of teams
+
+        Returns
+        ----------
+        list
+            List of match days, each a list of (home index, guest index) fixtures.
+            Every team plays every other team once at home and once away
+    """
+    slots = list(range(count))
+    if count % 2:
+        # the team paired with None has a free match day
+        slots.append(None)
+    first_half = []
+    for day in range(len(slots) - 1):
+        fixtures = []
+        for i in range(len(slots) // 2):
+            home, guest = slots[i], slots[-1 - i]
+            if home is None or guest is None:
+                continue
+            # alternate home rights of the fixed team
+            if i == 0 and day % 2:
+                home, guest = guest, home
+            fixtures.append((home, guest))
+        first_half.append(fixtures)
+        slots = [slots[0]] + [slots[-1]] + slots[1:-1]
+    second_half = [[(guest, home) for home, guest in fixtures] for fixtures in first_half]
+    return first_half + second_half
+
+
+def play_fixture(home, guest, seed, single_roles=False, use_weather=False, house_rules=False):
+    """
+        Plays one league game and reduces it to the standings relevant values
+
+        Parameters
+        ----------
+        home : dict
+            Team data object of the home team
+        guest : dict
+            Team data object of the guest team
+        seed : int
+            Seed of the game
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the game
+        house_rules : boolean
+            Flag if the game uses the house rules
+
+        Returns
+        ----------
+        tuple
+            home score, guest score and 0 if the home seeker caught the snitch else 1
+    """
+    return fixture_result(play_match([home, guest], seed, single_roles, use_weather, house_rules), home["Name"], guest["Name"])
+
+
+def fixture_result(result, home, guest):
+    """
+        Reduces a game result to the standings relevant values
+
+        Parameters
+        ----------
+        result : dict
+            run_game result
+        home : str
+            Name of the home team
+        guest : str
+            Name of the guest team
+
+        Returns
+        ----------
+        tuple
+            home score, guest score and 0 if the home seeker caught the snitch else 1
+    """
+    snitch = 0 if result["ending_team"] == home else 1
+    return result["score"][home], result["score"][guest], snitch
+
+
+class League:
+    """
+        Round robin league of quidditch teams
+
+        Fixtures are played with seeds derived from the season seed and the
+        fixture number, so a season is reproducible for any number of workers.
+        Season k of a run with seed S plays with the season seed
+        match_seed(S, k), for play_season as for simulate.
+    """
+
+    def __init__(self, teams, name="League", single_roles=False, use_weather=False, house_rules=False):
+        """
+            Initiates a league
+
+            Parameters
+            ----------
+            teams : str or list
+                Team directory, team file paths or Team data objects, see load_league_teams
+            name : str
+                Name of the league
+            single_roles : boolean
+                Flag if only one beater and chaser of a team should roll
+            use_weather : boolean
+                Flag if weather modifyer should aplly to the games
+            house_rules : boolean
+                Flag if the games use the house rules
+        """
+        self.name = name
+        self.teams = load_league_teams(teams)
+        self.team_names = [team["Name"] for team in self.teams]
+        if len(set(self.team_names)) != len(self.team_names):
+            raise ValueError("league team names have to be unique")
+        self.options = (single_roles, use_weather, house_rules)
+        self.schedule = round_robin(len(self.teams))
+
+
+    def new_table(self):
+        """
+            Creates empty standings counters
+
+            Returns
+            ----------
+            list
+                per team counters [played, won, drawn, lost, points, score for, score against, snitch]
+        """
+        return [[0] * 8 for _ in self.teams]
+
+
+    def add_result(self, table, home, guest, result):
+        """
+            Adds a played fixture to the standings counters
+
+            Parameters
+            ----------
+            table : list
+                standings counters, see new_table
+            home : int
+                index of the home team
+            guest : int
+                index of the guest team
+            result : tuple
+                fixture result, see play_fixture
+        """
+        home_score, guest_score, snitch = result
+        for team, own, other in ((home, home_score, guest_score), (guest, guest_score, home_score)):
+            row = table[team]
+            outcome = 0 if own > other else 1 if own == other else 2
+            row[0] += 1
+            row[1 + outcome] += 1
+            row[4] += POINTS[outcome]
+            row[5] += own
+            row[6] += other
+        table[(home, guest)[snitch]][7] += 1
+
+
+    def ranking(self, table):
+        """
+            Orders the teams by points, score difference, score and snitch catches
+
+            Parameters
+            ----------
+            table : list
+                standings counters, see new_table
+
+            Returns
+            ----------
+            list
+                team indices from first to last place
+        """
+        return sorted(range(len(self.teams)), key=lambda i: (-table[i][4], table[i][6] - table[i][5], -table[i][5], -table[i][7], self.team_names[i]))
+
+
+    def standings(self, table):
+        """
+            Builds the readable standings table
+
+            Parameters
+            ----------
+            table : list
+                standings counters, see new_table
+
+            Returns
+            ----------
+            list
+                one Dict per team from first to last place
+        """
+        rows = []
+        for position, i in enumerate(self.ranking(table), start=1):
+            played, won, drawn, lost, points, score_for, score_against, snitch = table[i]
+            rows.append({
+                "position": position,
+                "Name": self.team_names[i],
+                "played": played,
+                "won": won,
+                "drawn": drawn,
+                "lost": lost,
+                "points": points,
+                "score_for": score_for,
+                "score_against": score_against,
+                "score_difference": score_for - score_against,
+                "snitch": snitch
+            })
+        return rows
+
+
+    def fixture_tasks(self, seed):
+        """
+            Lists all fixtures of a season with their seeds
+
+            Parameters
+            ----------
+            seed : int
+                Seed of the season
+
+            Returns
+            ----------
+            list
+                one list per match day of (home index, guest index, game seed)
+        """
+        days = []
+        number = 0
+        for fixtures in self.schedule:
+            day = []
+            for home, guest in fixtures:
+                day.append((home, guest, match_seed(seed, number)))
+                number += 1
+            days.append(day)
+        return days
+
+
+    def play_season(self, seed=None, workers=1, season=0):
+        """
+            Plays one season and streams the standings after every match day
+
+            Parameters
+            ----------
+            seed : int
+                Seed of the run. leave empty to draw a new one
+            workers : int
+                number of worker processes for the fixtures of a match day. None uses all cpu cores
+                Default: 1
+            season : int
+                Index of the season of the run, replays that season of simulate with the same seed
+                Default: 0
+
+            Yields
+            ----------
+            tuple
+                match day number and standings table, see standings
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        workers = workers or os.cpu_count()
+        table = self.new_table()
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for day, fixtures in enumerate(self.fixture_tasks(match_seed(seed, season)), start=1):
+                args = [(self.teams[home], self.teams[guest], game_seed) + self.options for home, guest, game_seed in fixtures]
+                if pool:
+                    results = pool.map(play_fixture, *zip(*args))
+                else:
+                    results = [play_fixture(*arg) for arg in args]
+                for (home, guest, _), result in zip(fixtures, results):
+                    self.add_result(table, home, guest, result)
+                yield day, self.standings(table)
+        finally:
+            if pool:
+                pool.shutdown()
+
+
+    def run_seasons(self, start, stop, seed):
+        """
+            Plays the seasons start to stop and counts the final positions
+
+            Parameters
+            ----------
+            start : int
+                Index of the first season
+            stop : int
+                Index after the last season
+            seed : int
+                Seed of the whole run
+
+            Returns
+            ----------
+            Dict
+                Dict Parameter:
+                positions : list
+                    per team count of each final position
+                points : list
+                    per team sum of final points
+        """
+        positions = [[0] * len(self.teams) for _ in self.teams]
+        points = [0] * len(self.teams)
+        single_roles, use_weather, house_rules = self.options
+        # one game per fixture is compiled once and reset for every season
+        games = {}
+        for season in range(start, stop):
+            table = self.new_table()
+            for fixtures in self.fixture_tasks(match_seed(seed, season)):
+                for home, guest, game_seed in fixtures:
+                    game = games.get((home, guest))
+                    if game is None:
+                        game = games[(home, guest)] = match_game([self.teams[home], self.teams[guest]], house_rules)
+                    result = game.run_game(single_roles=single_roles, use_weather=use_weather, seed=game_seed)
+                    self.add_result(table, home, guest, fixture_result(result, self.team_names[home], self.team_names[guest]))
+            for position, i in enumerate(self.ranking(table)):
+                positions[i][position] += 1
+                points[i] += table[i][4]
+        return {"positions": positions, "points": points}
+
+
+    def simulate(self, seasons, workers=1, seed=None, relegation=3):
+        """
+            Replays the whole season many times to get title and relegation probabilities
+
+            Only the final position counts of every season are kept, so memory
+            does not grow with the number of seasons.
+
+            Parameters
+            ----------
+            seasons : int
+                number of seasons
+            workers : int
+                number of worker processes. None uses all cpu cores
+                Default: 1
+            seed : int
+                Seed of the whole run. leave empty to draw a new one
+            relegation : int
+                number of relegation places
+                Default: 3
+
+            Returns
+            ----------
+            Dict
+                Dict Parameter:
+                seasons : int
+                    number of seasons
+                seed : int
+                    Seed of the run
+                teams : list
+                    one Dict per team with Name, title, relegation, mean_points and positions
+                    (probability of each final position)
+        """
+        if not 0 <= relegation <= len(self.teams):
+            raise ValueError("relegation places have to be between 0 and the {} league teams".format(len(self.teams)))
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        workers = workers or os.cpu_count()
+        chunks = min(seasons, workers * 4) or 1
+        bounds = [seasons * i // chunks for i in range(chunks + 1)]
+        tasks = [(bounds[i], bounds[i + 1], seed) for i in range(chunks)]
+        if workers == 1:
+            parts = [self.run_seasons(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(self.run_seasons, *zip(*tasks)))
+        n = len(self.teams)
+        positions = [[sum(part["positions"][i][p] for part in parts) for p in range(n)] for i in range(n)]
+        points = [sum(part["points"][i] for part in parts) for i in range(n)]
+        total = max(seasons, 1)
+        teams = []
+        for i, name in enumerate(self.team_names):
+            teams.append({
+                "Name": name,
+                "title": positions[i][0] / total,
+                "relegation": sum(positions[i][n - relegation:]) / total if relegation else 0.0,
+                "mean_points": points[i] / total,
+                "positions": [count / total for count in positions[i]]
+            })
+        teams.sort(key=lambda team: -team["mean_points"])
+        return {"seasons": seasons, "seed": seed, "teams": teams}
+
+
+if __name__ == "__main__":
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+    parser = argparse.ArgumentParser(description="Simulate a quidditch league season,")
+    parser.add_argument("--team-dir", required=True, type=str, help="Directory containing one team json file per team")
+    parser.add_argument("--name", default="League", type=str, help="Name of the league, used for the result file")
+    parser.add_argument("--seasons", default=1, type=int, help="number of seasons, more than one writes title and relegation probabilities")
+    parser.add_argument("--relegation", default=3, type=int, help="number of relegation places")
+    parser.add_argument("--season", default=0, type=int, help="index of the season of a --seasons run with the same seed to replay")
+    parser.add_argument("--workers", default=1, type=int, help="number of worker processes")
+    parser.add_argument("--seed", default=None, type=int, help="seed to reproduce the season or all seasons of a run")
+    parser.add_argument("--single-roles", action="store_true", help="set only use 1 player per roll of the teams.")
+    parser.add_argument("--use-weather", action="store_true", help="set to include Weather modifyer for the game")
+    parser.add_argument("--house-rules", action="store_true", help="set to use house rules")
+    args = parser.parse_args()
+    league = League(args.team_dir, args.name, args.single_roles, args.use_weather, args.house_rules)
+    if args.seasons > 1:
+        result = league.simulate(args.seasons, workers=args.workers, seed=args.seed, relegation=args.relegation)
+        for team in result["teams"]:
+            logger.info("{}: title {:.1%} - relegation {:.1%} - {:.1f} points".format(team["Name"], team["title"], team["relegation"], team["mean_points"]))
+    else:
+        for day, result in league.play_season(seed=args.seed, workers=args.workers, season=args.season):
+            logger.info("\nMatch day {}".format(day))
+            for row in result:
+                logger.info("{position:>2}. {Name}: {points} points, {score_difference:+} score, {snitch} snitches".format(**row))
+    with open("{}_standings.json".format(args.name), mode="w") as result_file:
+        json.dump(result, result_file, sort_keys=True, indent=4)
@@ -0,0 +1,73 @@
+import asyncio
+
+
+async def aiter_game(game, pace=None, single_roles=False, use_weather=False, seed=None):
+    """
+        Plays a game inside an event loop and yields its events, see Base_game.iter_game
+
+        The game only goes on when the consumer asks for the next event, so a
+        slow consumer slows the game down instead of piling up events. After
+        every round the loop is given to the other tasks, so one loop can
+        stream hundreds of games without threads.
+
+        Parameters
+        ----------
+        game : Base_game
+            game with loaded teams
+        pace : float
+            wall clock seconds per round. leave empty to play as fast as the consumer reads
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the game
+        seed : int
+            Seed to replay a game. leave empty for a new game
+
+        Yields
+        ----------
+        Game_event
+            events of the game in playing order
+    """
+    loop = asyncio.get_running_loop()
+    due = loop.time()
+    for event in game.iter_game(single_roles, use_weather, seed):
+        yield event
+        if event.action == "round":
+            if pace:
+                # keep the pace to the start of the game, late rounds catch up
+                due += pace
+                await asyncio.sleep(max(due - loop.time(), 0))
+            else:
+                await asyncio.sleep(0)
+
+
+async def stream_game(game, queue, pace=None, single_roles=False, use_weather=False, seed=None):
+    """
+        Puts the events of a game into a bounded queue shared by many games
+
+        Putting waits while the queue is full, which pauses the game until
+        the consumer caught up.
+
+        Parameters
+        ----------
+        game : Base_game
+            game with loaded teams
+        queue : asyncio.Queue
+            queue receiving (game name, Game_event) tuples, give it a maxsize to bound the memory
+        pace : float
+            wall clock seconds per round. leave empty to play as fast as the queue is read
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the game
+        seed : int
+            Seed to replay a game. leave empty for a new game
+
+        Returns
+        ----------
+        Dict
+            Collection of finished game statistics, see Base_game.run_game
+    """
+    async for event in aiter_game(game, pace, single_roles, use_weather, seed):
+        await queue.put((game.name, event))
+    return game.game_results
@@ -0,0 +1,377 @@
+import argparse
+import heapq
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from statistics import NormalDist
+
+from estimation import estimate_range, wilson_interval
+from exact_solver import Exact_game
+from league import load_league_teams
+from quidditch import match_seed
+from team_registry import team_id
+
+logger = logging.getLogger(__name__)
+
+# format version of the matrix cache file
+CACHE_VERSION = 2
+
+
+def solve_pair(match, use_weather=False):
+    """
+        Exact win and draw probability of the first team of a Base_game match in the moments of estimate_range
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+
+        Returns
+        ----------
+        list
+            estimate moments with the probabilities as share of wins, draws and snitch catches of a single "game"
+    """
+    solved = Exact_game(match).solve(use_weather)
+    name = match[0]["Name"]
+    return [1, solved["win_probability"][name], 0, 0, 0, 0, solved["draw_probability"], float(solved["snitch_probability"][name])]
+
+
+class Matchup_matrix:
+    """
+        Head to head win probabilities of every pair of teams
+
+        Each pair is cached under the content hashes of both teams (see
+        team_registry.team_id), so a changed team only leaves its own row and
+        column out of date and a team changed back finds its old estimates.
+        Base_game pairs are solved exactly, house rule pairs are estimated in
+        batches of games, always giving the next batch to the pair with the
+        widest interval. The games of a pair are seeded like estimate with the
+        pair seed, so more batches continue the same estimate.
+    """
+
+    def __init__(self, teams=(), house_rules=False, use_weather=False, sampler="dice", target_halfwidth=0.02,
+                 confidence=0.99, batch_size=500, max_games=100000, seed=0, cache_file=None):
+        """
+            Initiates the matrix
+
+            Parameters
+            ----------
+            teams : list
+                Team data objects, team Names have to be unique
+            house_rules : boolean or list
+                Flag if the games use the default house rules or the names of the rules.
+                Without house rules the pairs are solved exactly
+            use_weather : boolean
+                Flag if weather modifyer should aplly to the games
+            sampler : str
+                roll sampler, see Base_game.set_sampler
+            target_halfwidth : float
+                wanted half width of the win probability intervals
+                Default: 0.02
+            confidence : float
+                confidence level of the intervals
+                Default: 0.99
+            batch_size : int
+                number of games per scheduled task
+                Default: 500
+            max_games : int
+                number of games after which a pair counts as done in any case
+                Default: 100000
+            seed : int
+                Seed the pair seeds are derived from
+                Default: 0
+            cache_file : str
+                json file keeping the estimates between runs. leave empty to only keep them in memory
+        """
+        self.options = {"house_rules": house_rules, "use_weather": use_weather, "sampler": sampler, "seed": seed}
+        self.target_halfwidth = target_halfwidth
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.batch_size = batch_size
+        self.max_games = max_games
+        self.cache_file = cache_file
+        # Name: team id
+        self.ids = {}
+        # team id: Team data object
+        self.teams = {}
+        # "id:id" with the smaller id first: estimate_range moments of the first team
+        self.pairs = {}
+        if cache_file and os.path.exists(cache_file):
+            self.load(cache_file)
+        for team in teams:
+            self.set_team(team)
+
+
+    def set_team(self, team):
+        """
+            Adds a team or replaces the team with the same Name, e.g. after an injury update
+
+            Parameters
+            ----------
+            team : dict
+                Team data object
+
+            Returns
+            ----------
+            str
+                team id
+        """
+        team = team.to_dict() if hasattr(team, "to_dict") else team
+        tid = team_id(team)
+        self.ids[team["Name"]] = tid
+        self.teams[tid] = team
+        return tid
+
+
+    def remove_team(self, name):
+        """
+            Removes a team from the matrix, its cached pairs are dropped by prune
+
+            Parameters
+            ----------
+            name : str
+                Name of the team
+        """
+        self.ids.pop(name)
+
+
+    def pair_key(self, first, second):
+        return "{}:{}".format(*sorted((first, second)))
+
+
+    def current_pairs(self):
+        # keys of all pairs of the current teams
+        ids = sorted(self.ids.values())
+        return [self.pair_key(first, second) for i, first in enumerate(ids) for second in ids[i + 1:]]
+
+
+    def halfwidth(self, key):
+        moments = self.pairs.get(key)
+        if moments is None:
+            return float("inf")
+        if not self.options["house_rules"]:
+            return 0.0
+        low, high = wilson_interval(moments[1], moments[0], self.z)
+        return (high - low) / 2
+
+
+    def stale_pairs(self):
+        """
+            Pairs of the current teams without a precise enough estimate
+
+            Returns
+            ----------
+            list
+                pair keys
+        """
+        return [key for key in self.current_pairs()
+                if self.halfwidth(key) > self.target_halfwidth and self.pairs.get(key, [0])[0] < self.max_games]
+
+
+    def prune(self):
+        """
+            Drops the cached pairs of teams no longer in the matrix
+
+            Returns
+            ----------
+            int
+                number of dropped pairs
+        """
+        current = set(self.current_pairs())
+        stale = [key for key in self.pairs if key not in current]
+        for key in stale:
+            del self.pairs[key]
+        return len(stale)
+
+
+    def task(self, key):
+        # next batch of a pair, the function and its arguments
+        first, second = key.split(":")
+        match = [self.teams[first], self.teams[second]]
+        if not self.options["house_rules"]:
+            return solve_pair, (match, self.options["use_weather"])
+        start = self.pairs.get(key, [0])[0]
+        stop = min(start + self.batch_size, self.max_games)
+        seed = match_seed(self.options["seed"], key)
+        return estimate_range, (match, start, stop, seed, self.options["use_weather"], self.options["house_rules"], self.options["sampler"])
+
+
+    def refresh(self, workers=1):
+        """
+            Computes the stale pairs, the most uncertain pair gets the next batch
+
+            Parameters
+            ----------
+            workers : int
+                number of worker processes. None uses all cpu cores
+                Default: 1
+
+            Returns
+            ----------
+            int
+                number of computed batches
+        """
+        workers = workers or os.cpu_count()
+        # most uncertain first, pairs without any estimate have an infinite half width
+        queue = [(-self.halfwidth(key), key) for key in self.stale_pairs()]
+        heapq.heapify(queue)
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        running = {}
+        batches = 0
+        try:
+            while queue or running:
+                # one batch per pair at a time keeps the game indices of a pair in order
+                while queue and len(running) < workers * 2:
+                    _, key = heapq.heappop(queue)
+                    function, arguments = self.task(key)
+                    if pool:
+                        running[pool.submit(function, *arguments)] = key
+                    else:
+                        self.add_moments(key, function(*arguments))
+                        batches += 1
+                        self.requeue(queue, key)
+                if running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key = running.pop(future)
+                        self.add_moments(key, future.result())
+                        batches += 1
+                        self.requeue(queue, key)
+        finally:
+            if pool:
+                pool.shutdown()
+        if self.cache_file:
+            self.save(self.cache_file)
+        return batches
+
+
+    def add_moments(self, key, moments):
+        if not self.options["house_rules"]:
+            self.pairs[key] = moments
+            return
+        own = self.pairs.setdefault(key, [0, 0, 0, 0, 0, 0, 0, 0])
+        for i, value in enumerate(moments):
+            own[i] += value
+
+
+    def requeue(self, queue, key):
+        halfwidth = self.halfwidth(key)
+        if halfwidth > self.target_halfwidth and self.pairs[key][0] < self.max_games:
+            heapq.heappush(queue, (-halfwidth, key))
+
+
+    def probability(self, team, other):
+        """
+            Win probability of a team against another one
+
+            Parameters
+            ----------
+            team : str
+                Name of the team
+            other : str
+                Name of the other team
+
+            Returns
+            ----------
+            Dict
+                Dict Parameter:
+                estimate : float
+                    probability of team ending with the higher score, None before refresh
+                interval : list
+                    confidence interval, a point for exact pairs
+                draw : float
+                    probability of both teams ending with the same score
+                games : int
+                    number of games of the estimate, 0 for exact pairs
+        """
+        first, second = self.ids[team], self.ids[other]
+        key = self.pair_key(first, second)
+        moments = self.pairs.get(key)
+        if moments is None:
+            return {"estimate": None, "interval": None, "draw": None, "games": 0}
+        # the moments count the wins of the first team of the pair, the other team wins the games neither won nor drawn
+        wins = moments[1] if first < second else moments[0] - moments[1] - moments[6]
+        estimate = wins / moments[0]
+        if self.options["house_rules"]:
+            interval = list(wilson_interval(wins, moments[0], self.z))
+            games = moments[0]
+        else:
+            interval = [estimate, estimate]
+            games = 0
+        return {"estimate": estimate, "interval": interval, "draw": moments[6] / moments[0], "games": games}
+
+
+    def matrix(self):
+        """
+            Win probabilities of all current teams
+
+            Returns
+            ----------
+            Dict
+                Dict Parameter:
+                teams : list
+                    team Names in row and column order
+                win_probability : list
+                    rows of the probability of the row team beating the column team, None on the diagonal
+        """
+        names = sorted(self.ids)
+        rows = [[None if team == other else self.probability(team, other)["estimate"] for other in names] for team in names]
+        return {"teams": names, "win_probability": rows}
+
+
+    def save(self, path):
+        """
+            Writes the cached pairs and their teams to a json file
+
+            Parameters
+            ----------
+            path : str
+                file name
+        """
+        used = {tid for key in self.pairs for tid in key.split(":")}
+        temp_path = path + ".tmp"
+        with open(temp_path, mode="w") as cfile:
+            json.dump({"version": CACHE_VERSION, "options": self.options, "pairs": self.pairs,
+                       "teams": {tid: team for tid, team in self.teams.items() if tid in used}}, cfile, separators=(",", ":"))
+        os.replace(temp_path, path)
+
+
+    def load(self, path):
+        """
+            Reads the cached pairs of a json file written with the same options
+
+            Parameters
+            ----------
+            path : str
+                file name
+        """
+        with open(path, mode="r") as cfile:
+            data = json.load(cfile)
+        if data.get("version") != CACHE_VERSION or data["options"] != json.loads(json.dumps(self.options)):
+            logger.warning("ignoring the matrix cache {}, it was written with other options".format(path))
+            return
+        self.pairs.update(data["pairs"])
+        self.teams.update(data["teams"])
+
+
+if __name__ == "__main__":
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+    parser = argparse.ArgumentParser(description="Compute the head to head win probabilities of a league,")
+    parser.add_argument("--team-dir", required=True, type=str, help="Directory containing one team json file per team")
+    parser.add_argument("--cache", default="matchup_matrix.json", type=str, help="cache file, only changed teams are computed again")
+    parser.add_argument("--workers", default=1, type=int, help="number of worker processes")
+    parser.add_argument("--target-halfwidth", default=0.02, type=float, help="wanted half width of the win probability intervals of house rule games")
+    parser.add_argument("--use-weather", action="store_true", help="set to include Weather modifyer for the game")
+    parser.add_argument("--house-rules", action="store_true", help="set to use house rules")
+    args = parser.parse_args()
+    matrix = Matchup_matrix(load_league_teams(args.team_dir), house_rules=args.house_rules, use_weather=args.use_weather,
+                            target_halfwidth=args.target_halfwidth, cache_file=args.cache)
+    logger.info("{} of {} pairs out of date".format(len(matrix.stale_pairs()), len(matrix.current_pairs())))
+    matrix.prune()
+    matrix.refresh(workers=args.workers)
+    result = matrix.matrix()
+    for name, row in zip(result["teams"], result["win_probability"]):
+        logger.info("{:>20} ".format(name) + " ".join("  -  " if p is None else "{:.2f}".format(p) for p in row))
@@ -0,0 +1,334 @@
+import hashlib
+import math
+import random
+from statistics import NormalDist
+
+from quidditch import BYTE_COMBINATION, DICE_TOTALS, match_game, match_seed, roll_tier
+
+# dice totals ordered from low to high, so a higher modifyer never lowers the tier of a draw
+SORTED_TOTALS = tuple(sorted(DICE_TOTALS))
+# player actions and the role keying their draws
+ACTION_ROLES = {
+    "chaser_action": "chaser",
+    "beater_action": "beater",
+    "keeper_action": "keeper",
+    "seeker_action": "seeker",
+    "beater_target_seeker": "beater"
+}
+
+
+class Slot_streams:
+    """
+        Dice combinations keyed by action slot (team, role, turn, draw of the turn)
+
+        Every draw is hashed from the seed and its slot, so it does not depend
+        on how many draws came before. The k-th draw of a team and role in a
+        turn is always the same, even when other turns or other draws of the
+        turn did not roll. Two games with the same seed therefore roll the same
+        combination in every slot, no matter how differently they went.
+        Combinations are ordered by their total, antithetic streams use the
+        mirrored one.
+    """
+
+    def __init__(self, seed, antithetic=False):
+        """
+            Initiates the streams of one game
+
+            Parameters
+            ----------
+            seed : int
+                Seed of the game
+            antithetic : boolean
+                Flag if every draw should be mirrored (35 - combination)
+        """
+        self.seed = seed
+        self.antithetic = antithetic
+        # (team, role): draws of the current turn
+        self.ordinals = {}
+        self.turn = 0
+
+
+    def combination(self, team, role, turn):
+        """
+            Draws the dice combination of a slot
+
+            Parameters
+            ----------
+            team : int
+                index of the acting team, -1 for pre game rolls
+            role : str
+                chaser, beater, keeper, seeker, target or pre_game
+            turn : int
+                game turn, draws of the same team and role in a turn are counted
+
+            Returns
+            ----------
+            int
+                index into SORTED_TOTALS
+        """
+        if turn != self.turn:
+            self.ordinals = {}
+            self.turn = turn
+        ordinal = self.ordinals.get((team, role), 0)
+        self.ordinals[(team, role)] = ordinal + 1
+        combination = self.draw("{}:{}:{}:{}:{}".format(self.seed, team, role, turn, ordinal))
+        return 35 - combination if self.antithetic else combination
+
+
+    @staticmethod
+    def draw(key):
+        # bytes above 251 would favour the first combinations, rehash when all are
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        for byte in digest:
+            if byte < 252:
+                return BYTE_COMBINATION[byte]
+        return Slot_streams.draw(key + ":")
+
+
+class Crn_sampler:
+    """
+        Routes all rolls of a game through Slot_streams
+
+        Shadows the roll and action methods of one game instance like
+        Game_profile does. The acting team of an action is found by the
+        players it gets or by the acting team name of a target seeker attack,
+        whose beaters list can belong to the other team. Target checks are
+        keyed by the team of the targeted seeker (the player sum_modifyer is
+        called with).
+    """
+
+    def __init__(self, game):
+        """
+            Attaches the sampler to a game
+
+            Parameters
+            ----------
+            game : Base_game
+                game to route the rolls of
+        """
+        self.game = game
+        self.streams = None
+        self.slot = None
+        for name, role in ACTION_ROLES.items():
+            if hasattr(game, name):
+                setattr(game, name, self.keyed(role, getattr(game, name)))
+        if hasattr(game, "sum_modifyer"):
+            sum_modifyer = game.sum_modifyer
+
+            def targeted(player, weather=None):
+                self.slot = (self.team_of(player), "target")
+                return sum_modifyer(player, weather)
+            game.sum_modifyer = targeted
+        game.dice_roll = self.dice_roll
+        game.draw_tier = self.draw_tier
+
+
+    def team_of(self, players):
+        # the players lists and objects are owned by exactly one team
+        for index, team in enumerate(self.game.teams):
+            if players is team.chasers or players is team.beaters or players is team.keeper or players is team.seeker:
+                return index
+        return -1
+
+
+    def team_named(self, name):
+        for index, team in enumerate(self.game.teams):
+            if team.name == name:
+                return index
+        return -1
+
+
+    def keyed(self, role, action):
+        def wrapper(players, *args, **kwargs):
+            acting = kwargs.get("acting")
+            self.slot = (self.team_named(acting) if acting else self.team_of(players), role)
+            try:
+                return action(players, *args, **kwargs)
+            finally:
+                self.slot = None
+        return wrapper
+
+
+    def start(self, streams):
+        """
+            Uses new streams for the next game
+
+            Parameters
+            ----------
+            streams : Slot_streams
+                streams of the game
+        """
+        self.streams = streams
+        self.slot = None
+
+
+    def combination(self):
+        team, role = self.slot or (-1, "pre_game")
+        return self.streams.combination(team, role, self.game.game_turns)
+
+
+    def dice_roll(self, stats=0):
+        return SORTED_TOTALS[self.combination()] + stats
+
+
+    def draw_tier(self, stats=0):
+        roll = SORTED_TOTALS[self.combination()] + stats
+        return roll, roll_tier(roll)
+
+
+def crn_results(match, games, seed, antithetic=False, use_weather=False, house_rules=False):
+    """
+        Plays the games of a match with the slot streams of a paired comparison
+
+        Every game runs with the seed of its slot streams, a game is replayed
+        by starting a Crn_sampler with Slot_streams(seed, mirrored) and
+        running it with that seed.
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects, first team is the home team
+        games : int
+            number of games
+        seed : int
+            Seed of the comparison
+        antithetic : boolean
+            Flag if every second game mirrors the streams of the game before
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+        house_rules : boolean or list
+            Flag if the games use the default house rules or the names of the rules
+
+        Returns
+        ----------
+        list
+            home win (higher final score) and home - guest score difference of every game
+    """
+    match = [team.to_dict() if hasattr(team, "to_dict") else team for team in match]
+    home, guest = match[0]["Name"], match[1]["Name"]
+    game = match_game(match, house_rules)
+    sampler = Crn_sampler(game)
+    results = []
+    for index in range(games):
+        pair = index // 2 if antithetic else index
+        pair_seed = match_seed(seed, pair)
+        sampler.start(Slot_streams(pair_seed, antithetic and index % 2 == 1))
+        result = game.run_game(use_weather=use_weather, seed=pair_seed)
+        difference = result["score"][home] - result["score"][guest]
+        results.append((difference > 0, difference))
+    return results
+
+
+def paired_difference(baseline, variant, antithetic=False, confidence=0.99):
+    """
+        Summarizes the paired results of two versions of a match
+
+        Parameters
+        ----------
+        baseline : list
+            crn_results of the baseline
+        variant : list
+            crn_results of the variant with the same seed
+        antithetic : boolean
+            Flag if the results were played with antithetic pairs
+        confidence : float
+            confidence level of the intervals
+
+        Returns
+        ----------
+        tuple
+            win probability dict, score difference dict and the variance reduction, see compare
+    """
+    # per game (or antithetic pair): baseline win, variant win, baseline score difference, variant score difference
+    units = [(b[0], v[0], b[1], v[1]) for b, v in zip(baseline, variant)]
+    if antithetic:
+        units = [tuple((a + b) / 2 for a, b in zip(units[i], units[i + 1])) for i in range(0, len(units) - 1, 2)]
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    games = len(baseline)
+    n = len(units)
+
+    def paired(first, second):
+        mean_first = sum(unit[first] for unit in units) / n
+        mean_second = sum(unit[second] for unit in units) / n
+        difference = mean_second - mean_first
+        variance = sum((unit[second] - unit[first] - difference) ** 2 for unit in units) / max(n - 1, 1)
+        halfwidth = z * math.sqrt(variance / n)
+        return {
+            "baseline": mean_first,
+            "variant": mean_second,
+            "difference": difference,
+            "interval": [difference - halfwidth, difference + halfwidth]
+        }, variance
+
+    wins, paired_variance = paired(0, 1)
+    scores, _ = paired(2, 3)
+    # two independent runs of the same number of games
+    independent = wins["baseline"] * (1 - wins["baseline"]) + wins["variant"] * (1 - wins["variant"])
+    paired_variance *= games / n
+    return wins, scores, independent / paired_variance if paired_variance else float("inf")
+
+
+def compare(baseline, variant, games=10000, seed=None, antithetic=False, confidence=0.99, use_weather=False, house_rules=False):
+    """
+        Compares two versions of a match with common random numbers
+
+        Both versions play every game with the same slot streams, so the
+        difference of their results only comes from the changed teams and
+        its interval is much narrower than for two independent runs. With
+        antithetic set, games are played in pairs with mirrored streams.
+
+        Parameters
+        ----------
+        baseline : list
+            List of two Team data objects, first team is the home team
+        variant : list
+            changed List of two Team data objects, team Names have to stay the same
+        games : int
+            number of games per version
+            Default: 10000
+        seed : int
+            Seed of the comparison. leave empty to draw a new one
+        antithetic : boolean
+            Flag if every second game mirrors the streams of the game before
+            Default: False
+        confidence : float
+            confidence level of the intervals
+            Default: 0.99
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+        house_rules : boolean or list
+            Flag if the games use the default house rules or the names of the rules
+
+        Returns
+        ----------
+        Dict
+            Dict Parameter:
+            games : int
+                number of games per version
+            seed : int
+                Seed of the comparison
+            team : str
+                Name of the home team
+            win_probability : dict
+                probability of the home team ending with the higher score in baseline and variant, difference and its interval
+            score_difference : dict
+                mean home - guest score of baseline and variant, difference and its interval
+            variance_reduction : float
+                variance of the win probability difference of two independent runs divided by the paired one
+    """
+    baseline = [team.to_dict() if hasattr(team, "to_dict") else team for team in baseline]
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    options = (antithetic, use_weather, house_rules)
+    wins, scores, reduction = paired_difference(crn_results(baseline, games, seed, *options),
+                                                crn_results(variant, games, seed, *options), antithetic, confidence)
+    return {
+        "games": games,
+        "seed": seed,
+        "team": baseline[0]["Name"],
+        "antithetic": antithetic,
+        "confidence": confidence,
+        "win_probability": wins,
+        "score_difference": scores,
+        "variance_reduction": reduction
+    }
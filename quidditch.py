@@ -1,45 +1,363 @@
 import logging
-import argparse
 import json
 import random
+from collections import namedtuple
+from fractions import Fraction
+import hashlib
+import copy
+import os
+
+from aggregation import Game_aggregate
+from game_profile import Game_profile
+from house_rules import DEFAULT_RULES, HOUSE_RULES, all_beaters, all_chasers, compile_round, rule_names, rule_state, target_seeker
+from result_sink import Result_sink
+from track_records import Track_records
 
 logger = logging.getLogger(__name__)
-sh = logging.StreamHandler()
-logger.addHandler(sh)
-logger.setLevel(logging.INFO)
 
-# argument parser
-parser = argparse.ArgumentParser(description="Run a game of quidditch,")
-parser.add_argument('--team-file', required=True, type=str, help="File location and name containing a 2 element list of team collections")
-parser.add_argument("--single-roles", action="store_true", help="set only use 1 player per roll of the teams.")
-parser.add_argument("--use-weather", action="store_true", help="set to include Weather modifyer for the game")
-parser.add_argument("--collect-metadata", action="store_true", help="set to collect Game Metadata")
-parser.add_argument("--house-rules", action="store_true", help="set to use house rules")
+# log level of the gamesteps written by Base_game.log_event
+GAMESTEP = 15
 
 
-def gamestep(self, message, *args, **kws):
+def add_game_logging():
+    """
+        Names the gamestep loglevel GAMESTEP in formatted log records
+
+        Only the name of the level is registered, the GameLogger has to be set to
+        GAMESTEP (or lower) by the application to receive the gamesteps.
+    """
+    logging.addLevelName(GAMESTEP, "GAMESTEP")
+
+
+# One structured step of a game
+# action : str
+#     weather, start, chaser, beater, keeper, seeker, target_seeker, round or end
+# team : str
+#     Name of the acting team (starting team for start, ending team for end)
+# player : str
+#     Name of the acting player
+# roll : int
+#     roll result including all modifyers
+# tier : int
+#     recorded status of the action 0 = Fail, 1 = Partial Success, 2 = Success, 3 = Cought Snitch
+# own, other : int
+#     score changes of the acting and the other team
+# value
+#     action specific details: weather modifyer, seeker streak, (own, other, acting team) seeker temp
+#     changes and beating team of target_seeker, (turn, home score, guest score) of round and (home score, guest score) of end
+Game_event = namedtuple("Game_event", ("action", "team", "player", "roll", "tier", "own", "other", "value"), defaults=(None, None, None, None, 0, 0, None))
+
+# text of the action tiers in the game log
+TIER_TEXT = {
+    "chaser": ("Fail", "Partial Success", "Success"),
+    "beater": ("Fail ", "Partial Success", "Success "),
+    "keeper": ("Fail", "Partial Success", "Success"),
+    "seeker": ("Fail", "Partial Success", "Success")
+}
+
+
+def render_event(event, team_names):
+    """
+        Renders a game event into the lines of the text game log
+
+        Parameters
+        ----------
+        event : Game_event
+            event to render
+        team_names : list
+            Names of the home and guest team
+
+        Returns
+        ----------
+        list
+            log lines of the event
+    """
+    action = event.action
+    if action in TIER_TEXT:
+        lines = ["{} {}".format(event.team, action.capitalize())]
+        if event.tier == 3:
+            lines.append("{} cought the Snitch!".format(event.player))
+        else:
+            lines.append("{}: {}".format(event.player, TIER_TEXT[action][event.tier]))
+            if action == "seeker" and event.tier:
+                lines.append("current streak bonus {}".format(event.value))
+        return lines
+    if action == "target_seeker":
+        lines = ["{} Beater".format(event.value[2]), "{} targets enemy Seeker".format(event.player), "A enemy chaser slip through and scores!"]
+        if event.value[1] == -2:
+            lines += ["{}: Success.".format(event.player), "A Nasty Hit"]
+        return lines
+    if action == "weather":
+        return ["Bad weather conditions" if event.value < 0 else "Good weather conditions"]
+    if action == "start":
+        return ["the {} Team {} Starts\n".format("Guest" if event.value else "Home", event.team)]
+    if action == "round":
+        turn, home, guest = event.value
+        return ["\nRound {} Score Summary".format(turn), "{}: {} - {}: {}\n".format(team_names[0], home, team_names[1], guest)]
+    if action == "end":
+        home, guest = event.value
+        return ["\n{} ended the Game!".format(event.team), "Final Score:", "{} {} - {} {}".format(team_names[0], home, team_names[1], guest)]
+    return []
+
+
+# dice total of each of the 36 equally likely two dice combinations
+DICE_TOTALS = tuple(first + second for first in range(1, 7) for second in range(1, 7))
+# dice combination of a random byte, bytes from 252 on are dropped so every combination is equally likely
+BYTE_COMBINATION = tuple(byte % 36 for byte in range(252))
+# maximal number of random bytes drawn at once by the buffer sampler
+BUFFER_BYTES = 4096
+SAMPLERS = ("dice", "table", "buffer")
+# version of the Base_game.snapshot format
+SNAPSHOT_VERSION = 1
+
+
+def roll_tier(roll):
+    """
+        Tier of a roll result including all modifyers
+
+        Parameters
+        ----------
+        roll : int
+            roll result
+
+        Returns
+        ----------
+        int
+            0 = Fail (< 7), 1 = Partial Success (7 - 9), 2 = Success (10 - 14), 3 = Snitch (15+)
+            chasers, beaters and keepers count a snitch tier as success
+    """
+    if roll >= 15:
+        return 3
+    if roll >= 10:
+        return 2
+    if roll >= 7:
+        return 1
+    return 0
+
+
+class Tier_table(dict):
+    """
+        Tier of every dice combination for every total modifyer
+
+        Rows are built on first use of a modifyer, so any modifyer can be
+        looked up. Each row holds the tier of the 36 dice combinations in
+        the order of DICE_TOTALS.
+    """
+
+    def __missing__(self, modifier):
+        row = tuple(roll_tier(total + modifier) for total in DICE_TOTALS)
+        self[modifier] = row
+        return row
+
+
+TIER_TABLE = Tier_table()
+
+
+def tier_probabilities(modifier):
+    """
+        Exact probabilities of the roll result tiers for a given modifyer
+
+        Parameters
+        ----------
+        modifier : int
+            Summary of all bonuses and penalties applied to the roll
+
+        Returns
+        ----------
+        tuple
+            Probability of fail, partial success, success and snitch as Fractions
+    """
+    row = TIER_TABLE[modifier]
+    return tuple(Fraction(row.count(tier), 36) for tier in range(4))
+
+
+class Player:
+    """
+        Compiled player with its summed up modifyer
+
+        modifier always holds base + mod + weather and is updated whenever
+        mod or weather change, so an action only adds the one time temp
+        modifyer (and the streak for seekers). temp and streak change during
+        a match, start_temp and start_streak keep the loaded values to reset them.
+    """
+
+    __slots__ = ("name", "label", "base", "_mod", "temp", "streak", "start_temp", "start_streak", "_weather", "modifier")
+
+    def __init__(self, data, default_name):
         """
-            enables logging for gamestep level
-            
+            Compiles a Player data object
+
             Parameters
             ----------
-            self
-            message: string
-                Message sent at log level
-            *args
-            **kws
+            data : dict
+                Player modifyer collection, see examples/Readme.md
+            default_name : str
+                Name used when the player has no Name attribute
         """
-        if self.isEnabledFor(15):
-            # Yes, logger takes its '*args' as 'args'.
-            self._log(15, message, args, **kws)
+        self.label = data.get("Name", None)
+        self.name = self.label or default_name
+        self.base = data["base"]
+        self._mod = data["mod"]
+        self.temp = self.start_temp = data["temp"]
+        # only seekers carry a streak
+        self.streak = self.start_streak = data.get("streak", None)
+        self._weather = 0
+        self.modifier = self.base + self._mod
+
+
+    def reset(self):
+        """
+            Restores the loaded temp modifyer and streak
+        """
+        self.temp = self.start_temp
+        self.streak = self.start_streak
 
 
-def add_game_logging():
+    def copy(self):
+        """
+            Copies the player in its loaded state without compiling it again
+
+            Returns
+            ----------
+            Player
+                new Player
+        """
+        player = Player.__new__(Player)
+        for slot in Player.__slots__:
+            setattr(player, slot, getattr(self, slot))
+        player.reset()
+        return player
+
+
+    @property
+    def mod(self):
+        return self._mod
+
+
+    @mod.setter
+    def mod(self, value):
+        self._mod = value
+        self.modifier = self.base + value + self._weather
+
+
+    @property
+    def weather(self):
+        return self._weather
+
+
+    @weather.setter
+    def weather(self, value):
+        self._weather = value
+        self.modifier = self.base + self._mod + value
+
+
+    def to_dict(self):
+        """
+            Converts the player back into a Player data object
+
+            Returns
+            ----------
+            dict
+                Player modifyer collection with the loaded temp modifyer and streak
+        """
+        data = {"base": self.base, "mod": self._mod, "temp": self.start_temp}
+        if self.label is not None:
+            data["Name"] = self.label
+        if self.start_streak is not None:
+            data["streak"] = self.start_streak
+        return data
+
+
+class Team:
     """
-        Adds Custom gamestep loglevel and attaches logfunction to logging facility
+        Compiled team built once from a Team data object
     """
-    logging.addLevelName(15, "GAMESTEP")
-    logging.Logger.gamestep = gamestep
+
+    __slots__ = ("name", "chasers", "beaters", "keeper", "seeker")
+
+    def __init__(self, data):
+        """
+            Compiles a Team data object
+
+            Parameters
+            ----------
+            data : dict
+                Team data object, see examples/Readme.md
+        """
+        self.name = data["Name"]
+        self.chasers = [Player(player, "Chaser" + str(i)) for i, player in enumerate(data["Chaser"])]
+        self.beaters = [Player(player, "Beater" + str(i)) for i, player in enumerate(data["Beater"])]
+        self.keeper = Player(data["Keeper"], "Keeper")
+        self.seeker = Player(data["Seeker"], "Seeker")
+
+
+    def players(self):
+        """
+            Lists all players of the team
+
+            Returns
+            ----------
+            list
+                chasers, beaters, keeper and seeker
+        """
+        return self.chasers + self.beaters + [self.keeper, self.seeker]
+
+
+    def set_weather(self, weather):
+        """
+            Applies a weather modifyer to all players
+
+            Parameters
+            ----------
+            weather : int
+                Weather modifyer for the game
+        """
+        for player in self.players():
+            player.weather = weather
+
+
+    def reset(self):
+        """
+            Restores the loaded temp modifyers and streaks of all players
+        """
+        for player in self.players():
+            player.reset()
+
+
+    def copy(self):
+        """
+            Copies the team in its loaded state without compiling it again
+
+            Returns
+            ----------
+            Team
+                new Team
+        """
+        team = Team.__new__(Team)
+        team.name = self.name
+        team.chasers = [player.copy() for player in self.chasers]
+        team.beaters = [player.copy() for player in self.beaters]
+        team.keeper = self.keeper.copy()
+        team.seeker = self.seeker.copy()
+        return team
+
+
+    def to_dict(self):
+        """
+            Converts the team back into a Team data object
+
+            Returns
+            ----------
+            dict
+                Team data object
+        """
+        return {
+            "Name": self.name,
+            "Beater": [player.to_dict() for player in self.beaters],
+            "Chaser": [player.to_dict() for player in self.chasers],
+            "Keeper": self.keeper.to_dict(),
+            "Seeker": self.seeker.to_dict()
+        }
 
 
 class Base_game:
@@ -49,8 +367,9 @@ class Base_game:
     get_metadata = None
     use_weather = None
     single_roles = None
-    # start conditions
-    teams = {}
+    verbose = True
+    # start conditions, the mutable state is created per instance in __init__ and reset
+    teams = ()
     snitch = None
     weather = 0
 
@@ -59,21 +378,38 @@ class Base_game:
     last_i = None
     team_1_name = ""
     team_2_name = ""
-    next_chaser = [0,0]
-    next_beater = [0,0]
+    next_chaser = None
+    next_beater = None
+
+    # random number generator and seed of the current game
+    rng = None
+    seed = None
+    # roll sampler, see SAMPLERS
+    sampler = "dice"
+    random_buffer = ()
+    buffer_bytes = 32
 
     # results
-    game_results = {}
+    game_results = None
     game_turns = 0
-    score = [0,0]
+    score = None
     ending_team = None
-    player_results = {}
+    player_results = None
+    # player track records: list (one status per roll), counters or sequence (counters and packed rolls)
+    track_records = "list"
+    records = None
 
     # logging
     gamelogger = None
     gamehandler = None
-
-    def __init__(self, name, team_file=None):
+    listeners = ()
+    # Game_profile timing the game, see Game_profile.attach
+    profile = None
+    # names of the enabled house rules and the compiled steps of a round, see house_rules.compile_round
+    house_rules = ()
+    round_steps = ()
+
+    def __init__(self, name, team_file=None, sampler="dice"):
         """
             Initiates Base Game quidditch class
 
@@ -83,16 +419,25 @@ class Base_game:
                 Name of the Game
             team_file : str
                 Path and name of team file
+            sampler : str
+                how rolls are drawn, see set_sampler
+                Default: dice
         """
         self.name = name
-        add_game_logging()
+        self.rng = random.Random()
+        self.set_sampler(sampler)
+        self.teams = []
+        # per game state, not shared with other game instances
+        self.reset()
+        # game event subscribers, nothing is built while this is empty
+        self.listeners = []
+        # the shared GameLogger is only configured by the application, see main
         self.gamelogger = logging.getLogger("GameLogger")
-        self.gamelogger.setLevel(15)
         if team_file:
             self.load_teams(team_file)
 
 
-    def load_teams(self, filename):
+    def load_teams(self, filename, registry=None):
         """
             Loads a Match json file containing two teams
             
@@ -100,16 +445,129 @@ class Base_game:
             ----------
             filename : str
                 Filepath and name to location
+            registry : Team_registry
+                registry to look up teams given by their ID instead of the Team data object
             
             Returns
             ----------
             List
-                List of two Team data objects
+                List of two compiled Teams
         """
-        teams = {}
         with open(filename,mode="r") as lfile:
-                self.teams = json.load(lfile)
-        return teams
+                match = json.load(lfile)
+        if registry is not None:
+            match = registry.resolve(match)
+        return self.set_teams(match)
+
+
+    def set_teams(self, match):
+        """
+            Compiles the two teams of a match for the game
+
+            Parameters
+            ----------
+            match : list
+                List of two Team data objects or compiled Teams, first team is the home team
+            
+            Returns
+            ----------
+            List
+                List of two compiled Teams
+        """
+        # compiled Teams may be shared (e.g. by a Team_registry), the game plays with its own copy
+        self.teams = [Team(team) if isinstance(team, dict) else team.copy() for team in match]
+        return self.teams
+
+
+    def reset(self):
+        """
+            Restores the start state of the match so the loaded teams can play again
+
+            Only the per match state is touched, the teams are not loaded or
+            compiled again.
+        """
+        self.snitch = False
+        self.weather = 0
+        self.game_turns = 0
+        self.ending_team = None
+        self.next_chaser = [0,0]
+        self.next_beater = [0,0]
+        self.score = [0,0]
+        self.player_results = {}
+        self.records = Track_records(self.track_records == "sequence") if self.track_records != "list" else None
+        self.game_results = {}
+        for team in self.teams:
+            team.reset()
+        for key, value in rule_state(self.house_rules).items():
+            setattr(self, key, value)
+
+
+    def subscribe(self, listener):
+        """
+            Attaches a listener to the game event stream
+
+            Parameters
+            ----------
+            listener : callable
+                called with every Game_event of the game
+        """
+        if listener not in self.listeners:
+            self.listeners.append(listener)
+
+
+    def unsubscribe(self, listener):
+        """
+            Detaches a listener from the game event stream
+
+            Parameters
+            ----------
+            listener : callable
+                previously subscribed listener
+        """
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+
+    def emit(self, event):
+        """
+            Sends a game event to all listeners
+
+            Parameters
+            ----------
+            event : Game_event
+                event to send
+        """
+        for listener in self.listeners:
+            listener(event)
+
+
+    def log_event(self, event):
+        """
+            Listener writing the events as text lines to the game logger
+
+            Parameters
+            ----------
+            event : Game_event
+                event to log
+        """
+        for line in render_event(event, [team.name for team in self.teams]):
+            self.gamelogger.log(GAMESTEP, line)
+
+
+    def record_event(self, event):
+        """
+            Listener adding player actions to the player track records
+
+            Parameters
+            ----------
+            event : Game_event
+                event to record
+        """
+        if event.player is not None:
+            if self.records is not None:
+                self.records.add(event.team, event.player, event.tier, event.own, event.other)
+            else:
+                self.add_track_record(event.player, event.tier, event.team)
 
 
     def add_track_record(self, name, status, team=None):
@@ -124,11 +582,70 @@ class Base_game:
                 Status of the player
         """
         tn = self.player_results.get(team,None)
-        if not tn:
-            self.player_results.update({team: {}})
-        record = list(self.player_results[team].get(name,[]))
+        if tn is None:
+            tn = self.player_results[team] = {}
+        record = tn.get(name,None)
+        if record is None:
+            record = tn[name] = []
         record.append(status)
-        self.player_results[team][name] = record
+
+
+    def set_sampler(self, sampler):
+        """
+            Chooses how the rolls of the game are drawn
+
+            All samplers give exactly the same roll distribution, but only the
+            dice sampler replays the seeds of games played before samplers existed.
+
+            Parameters
+            ----------
+            sampler : str
+                dice : two rng.randint calls per roll
+                table : one draw of a dice combination per roll, the tier is read from TIER_TABLE
+                buffer : like table, but the combinations are cut from a block of random bytes
+        """
+        if sampler not in SAMPLERS:
+            raise ValueError("unknown sampler {}, use one of {}".format(sampler, ", ".join(SAMPLERS)))
+        self.sampler = sampler
+        self.random_buffer = []
+        self.buffer_bytes = 32
+        if sampler == "table":
+            self.draw_combination = self.table_combination
+        elif sampler == "buffer":
+            self.draw_combination = self.buffer_combination
+
+
+    def table_combination(self):
+        """
+            Draws one of the 36 two dice combinations from a single random byte
+
+            Returns
+            ----------
+            int
+                index into DICE_TOTALS
+        """
+        byte = self.rng.getrandbits(8)
+        # redraw the 4 bytes that would favour some combinations
+        while byte >= 252:
+            byte = self.rng.getrandbits(8)
+        return BYTE_COMBINATION[byte]
+
+
+    def buffer_combination(self):
+        """
+            Takes the next two dice combination from the random buffer and refills it when empty
+
+            Returns
+            ----------
+            int
+                index into DICE_TOTALS
+        """
+        if not self.random_buffer:
+            # short games only use a few rolls, so the buffer grows from 64 bytes with every refill
+            size = self.buffer_bytes = min(self.buffer_bytes * 2, BUFFER_BYTES)
+            data = self.rng.getrandbits(8 * size).to_bytes(size, "little")
+            self.random_buffer = [BYTE_COMBINATION[byte] for byte in data if byte < 252]
+        return self.random_buffer.pop()
 
 
     def dice_roll(self, stats=0):
@@ -145,10 +662,33 @@ class Base_game:
             int
                 Returns Result of the roll
         """
-        roll = random.randint(1,6) + random.randint(1,6) + stats
+        if self.sampler != "dice":
+            return DICE_TOTALS[self.draw_combination()] + stats
+        roll = self.rng.randint(1,6) + self.rng.randint(1,6) + stats
         return roll
 
 
+    def draw_tier(self, stats=0):
+        """
+            Rolls for an action and returns the roll together with its tier
+
+            Parameters
+            ----------
+            stats : int
+                Summary of all bonuses and penalties to applied to the roll
+
+            Returns
+            ----------
+            tuple
+                Result of the roll and its tier, see roll_tier
+        """
+        if self.sampler == "dice":
+            roll = self.dice_roll(stats)
+            return roll, roll_tier(roll)
+        combination = self.draw_combination()
+        return DICE_TOTALS[combination] + stats, TIER_TABLE[stats][combination]
+
+
     def beater_action(self, beaters, active=0, team=None):
         """
             Performs a standard beater action
@@ -156,14 +696,7 @@ class Base_game:
             Parameters
             ----------
             beaters : list
-                List of Beater modifyer collection (dict)
-                Dict Parameter:
-                base : int
-                    relevant Player attribute for the role
-                mod : int
-                    long term non weather modifyer (Conditions)
-                temp : int
-                    one time use modifyer
+                List of Beater Players
             active : int
                 Index of Beater taking the turn. leave empty when you only use one beater    
             Team : str
@@ -179,33 +712,30 @@ class Base_game:
                 other : int
                     changes to other teams points
         """
-        # chooses the modifyer of the active player alternating between beaters
-        stats = beaters[active]
-        # roll with player stats + long term modifyers and one time temporary ones and weather if applied
-        roll = self.dice_roll(stats["base"] + stats["mod"] + stats["temp"] + self.weather) 
+        # chooses the active player alternating between beaters
+        player = beaters[active]
+        # roll with the summed up long term modifyers and one time temporary ones
+        roll, tier = self.draw_tier(player.modifier + player.temp)
         # get player name
-        name = beaters[active].get("Name", "Beater" + str(active))
+        name = player.name
         # relative score changes
         game = {"own": 0, "other": 0}
         status = None
-        if roll >= 10:
+        if tier >= 2:
             # on success
             game["own"] += 10
             game["other"] -= 10
-            self.gamelogger.gamestep("{}: Success ".format(name))
             status = 2
-        elif roll >= 7:
+        elif tier == 1:
             # on partial success
             game["own"] += 10
-            self.gamelogger.gamestep("{}: Partial Success".format(name))
             status = 1
         else:
             # on fail
             game["other"]  += 10
-            self.gamelogger.gamestep("{}: Fail ".format(name))
             status = 0
-        if self.get_metadata:
-            self.add_track_record(name,status, team)
+        if self.listeners:
+            self.emit(Game_event("beater", team, name, roll, status, game["own"], game["other"]))
         return game
 
 
@@ -216,14 +746,7 @@ class Base_game:
             Parameters:
             ----------
             chasers : list
-                List of Chaser modifyer collection (dict)
-                Dict Parameter:
-                base : int
-                    relevant Player attribute for the role
-                mod : int
-                    long term non weather modifyer (Conditions)
-                temp : int
-                    one time use modifyer
+                List of Chaser Players
             active : int
                 Index of Chaser taking the turn. leave empty when you only use one beater
 
@@ -238,32 +761,29 @@ class Base_game:
                 other : int
                     changes to other teams points
         """
-        # choose modifyer of active player
-        stats = chasers[active]
-        # roll with player stats + long term modifyers and one time temporary ones and weather if applied
-        roll = self.dice_roll(stats["base"] + stats["mod"] + stats["temp"] + self.weather) 
+        # choose active player
+        player = chasers[active]
+        # roll with the summed up long term modifyers and one time temporary ones
+        roll, tier = self.draw_tier(player.modifier + player.temp)
         # get player name
-        name = chasers[active].get("Name", "Chaser" + str(active))
+        name = player.name
         # relative score changes
         game = {"own": 0, "other": 0}
         status = None
-        if roll >= 10:
+        if tier >= 2:
             # on success
             game["own"] +=20
-            self.gamelogger.gamestep("{}: Success".format(chasers[active].get("Name", "Chaser" + str(active))))
             status = 2
-        elif roll >= 7:
+        elif tier == 1:
             # on partial success
             game["own"] += 10
-            self.gamelogger.gamestep("{}: Partial Success".format(chasers[active].get("Name", "Chaser" + str(active))))
             status = 1
         else:
             # on fail
             game["other"] += 10
-            self.gamelogger.gamestep("{}: Fail".format(chasers[active].get("Name", "Chaser" + str(active))))
             status = 0
-        if self.get_metadata:
-            self.add_track_record(name, status, team)
+        if self.listeners:
+            self.emit(Game_event("chaser", team, name, roll, status, game["own"], game["other"]))
         return game
 
 
@@ -273,15 +793,8 @@ class Base_game:
 
             Parameters
             ----------
-            keeper : dict
-                Keeper modifyer collection
-                Dict Parameter:
-                base : int
-                    relevant Player attribute for the role
-                mod : int
-                    long term non weather modifyer (Conditions)
-                temp : int
-                    one time use modifyer  
+            keeper : Player
+                Keeper Player
             
             Returns
             ----------
@@ -293,28 +806,25 @@ class Base_game:
                 other : int
                     changes to other teams points
         """
-        # roll with player stats + long term modifyers and one time temporary ones and weather if applied
-        roll = self.dice_roll(keeper["base"] + keeper["mod"] + keeper["temp"] + self.weather) 
+        # roll with the summed up long term modifyers and one time temporary ones
+        roll, tier = self.draw_tier(keeper.modifier + keeper.temp)
         # get player name
-        name = keeper.get("Name","Keeper")
+        name = keeper.name
         # relative score changes
         game = {"own": 0, "other": 0}
         status = None
-        if roll >= 10:
+        if tier >= 2:
             game["own"] += 10
             game["other"] -= 10
-            self.gamelogger.gamestep("{}: Success".format(name))
             status = 2
-        elif roll >= 7:
+        elif tier == 1:
             game["other"] -= 10
-            self.gamelogger.gamestep("{}: Partial Success".format(keeper.get("Name","Keeper")))
             status = 1
         else:
             game["other"] += 10
-            self.gamelogger.gamestep("{}: Fail".format(keeper.get("Name","Keeper")))
             status = 0
-        if self.get_metadata:
-            self.add_track_record(name, status, team)
+        if self.listeners:
+            self.emit(Game_event("keeper", team, name, roll, status, game["own"], game["other"]))
         return game
 
 
@@ -324,17 +834,8 @@ class Base_game:
 
             Parameters
             ----------
-            Seeker : dict
-                Seeker modifyer collection
-                Dict Parameter:
-                base : int
-                    relevant Player attribute for the role
-                mod : int
-                    long term non weather modifyer (Conditions)
-                streak : int
-                    Sum of all previous (partial) success modifyer
-                temp : int
-                    one time use modifyer
+            Seeker : Player
+                Seeker Player, streak holds the sum of all previous (partial) success modifyer
 
             Returns
             ----------
@@ -346,39 +847,106 @@ class Base_game:
                 snitch : boolean
                     Flag if the snitch is cought to end the game
         """
-        # get modifyer for seeker
-        stats = seeker
         # get player name
-        name = seeker.get("Name","Seeker")
-        # roll with player stats + long term modifyers and one time temporary ones and weather if applied
-        roll = self.dice_roll(stats["base"] + stats["mod"] + stats["streak"] + stats["temp"] + self.weather) 
+        name = seeker.name
+        # roll with the summed up long term modifyers, the streak and one time temporary ones
+        roll, tier = self.draw_tier(seeker.modifier + seeker.streak + seeker.temp)
         # seeker modifyer tracker
-        game = {"streak": stats["streak"], "snitch": False}
+        game = {"streak": seeker.streak, "snitch": False}
         status = None
-        if roll >= 15:
+        if tier == 3:
             game["snitch"] = True
-            self.gamelogger.gamestep("{} cought the Snitch!".format(seeker.get("Name","Seeker")))
             status = 3
-        elif roll >= 10:
+        elif tier == 2:
             game["streak"] += 2
-            self.gamelogger.gamestep("{}: Success".format(seeker.get("Name","Seeker")))
-            self.gamelogger.gamestep("current streak bonus {}".format(game["streak"]))
             status = 2
-        elif roll >= 7:
+        elif tier == 1:
             game["streak"] += 1
-            self.gamelogger.gamestep("{}: Partial Success".format(seeker.get("Name","Seeker")))
-            self.gamelogger.gamestep("current streak bonus {}".format(game["streak"]))
             status = 1
         else:
             game["streak"] = -2
-            self.gamelogger.gamestep("{}: Fail".format(name))
             status = 0
-        if self.get_metadata:
-            self.add_track_record(name, status, team)
+        if self.listeners:
+            self.emit(Game_event("seeker", team, name, roll, status, 150 if game["snitch"] else 0, 0, game["streak"]))
         return game
 
 
-    def pre_game(self, use_weather):
+    def sum_modifyer(self, player, weather=None):
+        """
+            Sums up all modifyer aplying to a player
+
+            Parameters
+            ----------
+            player : Player
+                Player to sum up
+            weather : int
+                Weather modifyer. leave empty to use default game weather modifyer
+
+            Returns
+            ---------- 
+            int
+                sum of all modifyer
+        """
+        mods = player.base + player.mod + player.temp
+        if weather:
+            mods += weather
+        if player.streak:
+            mods += player.streak
+        else:
+            mods += self.weather
+        return  mods
+
+
+    def beater_target_seeker(self, beaters, active=0, team=None, acting=None):
+        """
+            Performs the Beater House Rule action target Seeker
+            
+            Parameters
+            ----------
+            beaters : list
+                List of Beater Players
+            active : int
+                index of Beater taking the turn. leave empty when you only use one
+            team : str
+                Name of team for player stat tracking
+            acting : str
+                Name of the team taking the turn for the game log. leave empty when it is team
+
+            Returns
+            ----------
+            dict
+                Collection of temporary seeker modifyer.
+                Dict Parameter: 
+                own : int
+                    temp modifyer for own seeker player
+                other : int
+                    temp modifyer for other seeker player
+                other_points : relative change of other points
+        """
+        # chooses the active player alternating between beaters
+        player = beaters[active]
+        # roll with the summed up long term modifyers and one time temporary ones
+        roll, tier = self.draw_tier(player.modifier + player.temp)
+        # get player name
+        name = player.name
+        # relative score changes
+        game = {"own": 0, "other": 0, "other_points": 10}
+        status = None
+        if tier >= 2:
+            game["other"] = -2
+            status = 2
+        elif tier == 1:
+            game["other"] = -1
+            status = 1
+        else:
+            game["own"] = -1
+            status = 1
+        if self.listeners:
+            self.emit(Game_event("target_seeker", team, name, roll, status, 0, game["other_points"], (game["own"], game["other"], acting or team)))
+        return game
+
+
+    def pre_game(self, use_weather, seed=None):
         """
             Handles Pre game loop calculations for weather and start team
             
@@ -386,6 +954,8 @@ class Base_game:
             ----------
             use_weather : boolean
                 Flag if weather should affect the game
+            seed : int
+                Seed for all rolls of the game. leave empty to draw a new one
 
             Returns
             ----------
@@ -399,14 +969,22 @@ class Base_game:
                 last_i : int
                     index of second team
         """
+        # every game gets its own seed so it can be replayed
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self.rng.seed(seed)
+        self.random_buffer = []
+        self.buffer_bytes = 32
         if use_weather:
             conditions = self.dice_roll()
             if conditions <= 7:
                 self.weather = -1
-                self.gamelogger.gamestep("Bad weather conditions")
-            else:
-                self.gamelogger.gamestep("Good weather conditions")
-        random.seed()
+            if self.listeners:
+                self.emit(Game_event("weather", value=self.weather))
+        # sum the weather into the player modifyers once for the whole game
+        for team in self.teams:
+            team.set_weather(self.weather)
         self.game_results = {}
         self.score = [0,0]
         # decide witch team starts the match
@@ -417,15 +995,15 @@ class Base_game:
             team2 = self.dice_roll()
         if team1 > team2:
             self.start_i = 0
-            self.gamelogger.gamestep("the Home Team {} Starts\n".format(self.teams[0]["Name"]))
         else:
             self.start_i = 1
-            self.gamelogger.gamestep("the Guest Team {} Starts\n".format(self.teams[1]["Name"]))
+        if self.listeners:
+            self.emit(Game_event("start", self.teams[self.start_i].name, value=self.start_i))
         # calculate index of second team
         self.last_i = (self.start_i + 1) % 2
         # fetch team Names for quick access
-        self.team_1_name = self.teams[self.start_i]["Name"]
-        self.team_2_name = self.teams[self.last_i]["Name"]
+        self.team_1_name = self.teams[self.start_i].name
+        self.team_2_name = self.teams[self.last_i].name
         return {
             "weather": self.weather,
             "start_i": self.start_i,
@@ -443,7 +1021,7 @@ class Base_game:
                 Flag if only one beater and chaser of a team should roll
                 Default: False
             use_all : boolean
-                Flag if all chasers are allowed to make a action (for house rules)
+                Flag if all chasers are allowed to make a action, see the all_chasers house rule
                 Default: False
 
             Returns
@@ -453,27 +1031,20 @@ class Base_game:
 
         """
         score_change = [0,0]
-        # when all player should be used invoke function recurively
         if use_all:
-            for index in self.teams[self.start_i]["Chaser"]:
-                changes = self.chaser_turns(single_roles=True)
-                score_change[0] += changes[0]
-                score_change[1] += changes[1]
-                index = (index + 1) %len(self.teams[self.start_i]["chaser"])
+            return all_chasers(self)
         else:
             # temp result variables
             result_1 = {}
             result_2 = {}
             # first team Chaser
-            self.gamelogger.gamestep("{} Chaser".format(self.team_1_name))
-            result_1 = self.chaser_action(self.teams[self.start_i]["Chaser"], self.next_chaser[self.start_i], team=self.team_1_name)
+            result_1 = self.chaser_action(self.teams[self.start_i].chasers, self.next_chaser[self.start_i], team=self.team_1_name)
             if not single_roles:
-                self.next_chaser[self.start_i] = (self.next_chaser[self.start_i] + 1) % len(self.teams[self.start_i]["Chaser"])
+                self.next_chaser[self.start_i] = (self.next_chaser[self.start_i] + 1) % len(self.teams[self.start_i].chasers)
             # second team Chaser
-            self.gamelogger.gamestep("{} Chaser".format(self.team_2_name))
-            result_2 = self.chaser_action(self.teams[self.last_i]["Chaser"], self.next_chaser[self.last_i], team=self.team_2_name) 
+            result_2 = self.chaser_action(self.teams[self.last_i].chasers, self.next_chaser[self.last_i], team=self.team_2_name) 
             if not single_roles:
-                self.next_chaser[self.last_i] = (self.next_chaser[self.last_i] + 1) % len(self.teams[self.last_i]["Chaser"])
+                self.next_chaser[self.last_i] = (self.next_chaser[self.last_i] + 1) % len(self.teams[self.last_i].chasers)
             score_change = [result_1["own"] + result_2["other"], result_1["other"] + result_2["own"]]
             self.score[self.start_i] += score_change[0]
             self.score[self.last_i	] += score_change[1]
@@ -490,7 +1061,7 @@ class Base_game:
                 Flag if only one beater and chaser of a team should roll
                 Default: False
             use_all : boolean
-                Flag if all chasers are allowed to make a action (for house rules)
+                Flag if all beaters are allowed to make a action, see the all_beaters house rule
                 Default: False
 
             Returns
@@ -499,27 +1070,20 @@ class Base_game:
                 List with relative score changes ordered start team -> second team
         """
         score_change = [0,0]
-        # when all player should be used invoke function recurively
         if use_all:
-            for index in self.teams[self.start_i]["Beater"]:
-                changes = self.chaser_turns(single_roles=True)
-                score_change[0] += changes[0]
-                score_change[1] += changes[1]
-                index = (index + 1) %len(self.teams[self.start_i]["Beater"])
+            return all_beaters(self)
         else:
             # temp result variables
             result_1 = {}
             result_2 = {}
             # first team Beater
-            self.gamelogger.gamestep("{} Beater".format(self.team_1_name))
-            result_1 = self.beater_action(self.teams[self.start_i]["Beater"], self.next_beater[self.start_i], team=self.team_1_name)
+            result_1 = self.beater_action(self.teams[self.start_i].beaters, self.next_beater[self.start_i], team=self.team_1_name)
             if not single_roles:
-                self.next_beater[self.start_i] = (self.next_beater[self.start_i] + 1) % len(self.teams[self.start_i]["Beater"])
+                self.next_beater[self.start_i] = (self.next_beater[self.start_i] + 1) % len(self.teams[self.start_i].beaters)
             # second team Beater
-            self.gamelogger.gamestep("{} Beater".format(self.team_2_name))
-            result_2 = self.beater_action(self.teams[self.last_i]["Beater"], self.next_beater[self.last_i], team=self.team_2_name) 
+            result_2 = self.beater_action(self.teams[self.last_i].beaters, self.next_beater[self.last_i], team=self.team_2_name) 
             if not single_roles:
-                self.next_beater[self.last_i] = (self.next_beater[self.last_i] + 1) % len(self.teams[self.last_i]["Beater"])
+                self.next_beater[self.last_i] = (self.next_beater[self.last_i] + 1) % len(self.teams[self.last_i].beaters)
             score_change = [result_1["own"] + result_2["other"], result_1["other"] + result_2["own"]]
             self.score[self.start_i] += score_change[0]
             self.score[self.last_i	] += score_change[1]
@@ -547,11 +1111,9 @@ class Base_game:
         score_change = [0,0]
         result_1 = {}
         result_2 = {}
-        self.gamelogger.gamestep("{} Keeper".format(self.team_1_name))
-        result_1 = self.keeper_action(self.teams[self.start_i]["Keeper"], team=self.team_1_name)
+        result_1 = self.keeper_action(self.teams[self.start_i].keeper, team=self.team_1_name)
         # second team Keeper
-        self.gamelogger.gamestep("{} Keeper".format(self.team_2_name))
-        result_2 = self.keeper_action(self.teams[self.last_i]["Keeper"], team=self.team_2_name)
+        result_2 = self.keeper_action(self.teams[self.last_i].keeper, team=self.team_2_name)
         score_change = [result_1["own"] + result_2["other"], result_1["other"] + result_2["own"]]
         self.score[self.start_i] += score_change[0]
         self.score[self.last_i] += score_change[1]
@@ -580,42 +1142,39 @@ class Base_game:
         result_1 = {}
         result_2 = {}
         # first team Seeker
-        self.gamelogger.gamestep("{} Seeker".format(self.team_1_name))
-        result_1 = self.seeker_action(self.teams[self.start_i]["Seeker"], team=self.team_1_name)
-        self.teams[self.start_i]["Seeker"]["temp"]
+        result_1 = self.seeker_action(self.teams[self.start_i].seeker, team=self.team_1_name)
         if result_1["snitch"]:
             # check if snitch was cought
             self.snitch = True
             self.score[self.start_i] += 150
             turn_change[0] = 150
             turn_change[2] = True
-            self.ending_team = self.teams[self.start_i]["Name"]
+            self.ending_team = self.teams[self.start_i].name
         elif result_1["streak"] < 0:
-            self.teams[self.start_i]["Seeker"]["temp"] = result_1["streak"]
-            self.teams[self.start_i]["Seeker"]["streak"] = 0
+            self.teams[self.start_i].seeker.temp = result_1["streak"]
+            self.teams[self.start_i].seeker.streak = 0
         else: 
-            self.teams[self.start_i]["Seeker"]["streak"] = result_1["streak"]
+            self.teams[self.start_i].seeker.streak = result_1["streak"]
         # second team Seeker
         if not self.snitch:
-            self.gamelogger.gamestep("{} Seeker".format(self.team_2_name))
-            result_2 = self.seeker_action(self.teams[self.last_i]["Seeker"], team=self.team_2_name)
-            self.teams[self.last_i]["Seeker"]["temp"] = 0
+            result_2 = self.seeker_action(self.teams[self.last_i].seeker, team=self.team_2_name)
+            self.teams[self.last_i].seeker.temp = 0
             if result_2["snitch"]:
                 self.snitch = True
                 self.score[self.last_i] += 150
-                self.ending_team = self.teams[self.last_i]["Name"]
+                self.ending_team = self.teams[self.last_i].name
                 turn_change[1] = 150
                 turn_change[3] = True
             elif result_2["streak"] < 0:
-                self.teams[self.last_i]["Seeker"]["temp"] = result_2["streak"]
-                self.teams[self.last_i]["Seeker"]["streak"] = 0
+                self.teams[self.last_i].seeker.temp = result_2["streak"]
+                self.teams[self.last_i].seeker.streak = 0
             else:
-                self.teams[self.last_i]["Seeker"]["streak"] = result_2["streak"]
+                self.teams[self.last_i].seeker.streak = result_2["streak"]
         # tally up changes:
         return turn_change
 
 
-    def run_game(self, single_roles=False, use_weather=False):
+    def run_game(self, single_roles=False, use_weather=False, seed=None):
         """
             Performs quidditch player actions until the snitch is cought
 
@@ -630,6 +1189,9 @@ class Base_game:
             use_weather : boolean
                 Flag if weather modifyer should aplly to the game.
                 Default: False
+            seed : int
+                Seed to replay a game. leave empty for a new game
+                Default: None
 
             Returns
             ----------
@@ -647,37 +1209,78 @@ class Base_game:
                     Name of Team starting the match
                 weather : int
                     Weather modifyer for the game
+                seed : int
+                    Seed to replay the game
+        """
+        self.start_game(single_roles, use_weather, seed)
+        # run game simulation
+        while not self.snitch:
+            self.play_round()
+        return self.finish_game()
+
+
+    def start_game(self, single_roles=False, use_weather=False, seed=None):
+        """
+            Resets the match and performs the pre game rolls, the rounds are then played with play_round
+
+            Parameters
+            ----------
+            single_roles : boolean
+                Flag if only one beater and chaser of a team should roll
+            use_weather : boolean
+                Flag if weather modifyer should aplly to the game.
+            seed : int
+                Seed to replay a game. leave empty for a new game
         """
         self.single_roles = single_roles
         self.use_weather = use_weather
 
         # set up game variables
-        self.snitch = False
+        self.reset()
+        self.round_steps = compile_round(self, self.house_rules)
+        # player track records are built from the game events
+        if self.get_metadata:
+            self.subscribe(self.record_event)
 
         # Pre game loop rolls
-        self.pre_game(use_weather)
-        
-        # run game simulation
-        while not self.snitch:
-            self.game_turns += 1
-            # Chaser Actions
-            self.chaser_turns()
-            # Beater Actions
-            self.beater_turns()
-            # Keeper Actions
-            self.keeper_turns()
-            # Seeker Actions
-            self.Seeker_turns()
-            # ensure no team is below 0 points
-            self.score = [max(i,0) for i in self.score]
-            # end of round logs
-            self.gamelogger.gamestep("\nRound {} Score Summary".format(self.game_turns))
-            self.gamelogger.gamestep("{}: {} - {}: {}\n".format(self.teams[0]["Name"], self.score[0], self.teams[1]["Name"], self.score[1]))
+        self.pre_game(use_weather, seed)
+
+
+    def play_round(self):
+        """
+            Plays one round of the match
+
+            Returns
+            ----------
+            boolean
+                Flag if the snitch was cought and the game is over
+        """
+        self.game_turns += 1
+        # chaser, beater, keeper and seeker actions and the house rules hooking them
+        for step in self.round_steps:
+            step()
+        # ensure no team is below 0 points
+        self.score = [max(i,0) for i in self.score]
+        # end of round logs
+        if self.listeners:
+            self.emit(Game_event("round", value=(self.game_turns, self.score[0], self.score[1])))
+        return self.snitch
+
+
+    def finish_game(self):
+        """
+            Builds the result of a game whose snitch was cought
+
+            Returns
+            ----------
+            Dict
+                Collection of finished game statistics, see run_game
+        """
         # Post Game 
         # verbose Scores
         scores = {
-            self.teams[0]["Name"]: self.score[0],
-            self.teams[1]["Name"]: self.score[1]
+            self.teams[0].name: self.score[0],
+            self.teams[1].name: self.score[1]
         }
         # build Result object
         self.game_results = {
@@ -685,111 +1288,223 @@ class Base_game:
             "game_turns": self.game_turns,
             "score": scores,
             "start_team": self.team_1_name,
-            "weather": self.weather
+            "weather": self.weather,
+            "seed": self.seed
         }
-        if self.player_results:
+        if self.records is not None and self.records.players:
+            self.game_results["player_results"] = self.records.to_dict()
+        elif self.player_results:
             self.game_results["player_results"] = self.player_results
         
         # send basic info to default logger
-        logger.info("\nMatch Finished after {} turns".format(self.game_turns))
-        logger.info("Final Score: {} - {}".format(self.score[0],self.score[1]))
+        if self.verbose:
+            logger.info("\nMatch Finished after {} turns".format(self.game_turns))
+            logger.info("Final Score: {} - {}".format(self.score[0],self.score[1]))
 
-        # send in depth info to game logger
-        self.gamelogger.gamestep("\n{} ended the Game!".format(self.ending_team))
-        self.gamelogger.gamestep("Final Score:")
-        self.gamelogger.gamestep("{} {} - {} {}".format(self.teams[0]["Name"], self.score[0], self.teams[1]["Name"], self.score[1]))
+        # send in depth info to the game listeners
+        if self.listeners:
+            self.emit(Game_event("end", self.ending_team, value=(self.score[0], self.score[1])))
         self.score = scores
         return self.game_results
 
 
-class Modified_Game(Base_game):
+    def iter_game(self, single_roles=False, use_weather=False, seed=None):
+        """
+            Plays a game and yields its events while it is played
 
-    seeker_target = [0,0]
+            The events of a round (the player actions followed by the round
+            score summary) are yielded as soon as the round is played, the
+            game only goes on when the next event is asked for. A seed
+            replays the same game as run_game.
 
-    def __init__(self, name, team_file=None):
-        super(Modified_Game,self).__init__(name,team_file)
+            Parameters
+            ----------
+            single_roles : boolean
+                Flag if only one beater and chaser of a team should roll
+            use_weather : boolean
+                Flag if weather modifyer should aplly to the game.
+            seed : int
+                Seed to replay a game. leave empty for a new game
 
+            Yields
+            ----------
+            Game_event
+                weather and start, the actions and round summary of every round and the end of the game
 
-    def sum_modifyer(self, player, weather=None):
+            Returns
+            ----------
+            Dict
+                Collection of finished game statistics, see run_game (the value of the StopIteration)
         """
-            Sums up all modifyer aplying to a player
+        events = []
+        listener = events.append
+        self.subscribe(listener)
+        try:
+            self.start_game(single_roles, use_weather, seed)
+            yield from events
+            events.clear()
+            while not self.snitch:
+                self.play_round()
+                yield from events
+                events.clear()
+            result = self.finish_game()
+            yield from events
+        finally:
+            self.unsubscribe(listener)
+        return result
+
+
+    def resume(self):
+        """
+            Plays the remaining rounds of a started or restored game
 
-            Parameters
+            Returns
             ----------
-            player : dict
-                Player modifyer collection
-            weather : int
-                Weather modifyer. leave empty to use default game weather modifyer
+            Dict
+                Collection of finished game statistics, see run_game
+        """
+        while not self.snitch:
+            self.play_round()
+        return self.finish_game()
+
+
+    def snapshot(self):
+        """
+            Captures the match state between two rounds, including the random number generator
+
+            Listeners are not part of the state. A game restored from the
+            snapshot continues with exactly the same rolls.
 
             Returns
-            ---------- 
-            int
-                sum of all modifyer
+            ----------
+            Dict
+                json serializable match state, see restore
         """
-        mods = player["base"] + player["mod"] + player["temp"]
-        if weather:
-            mods += weather
-        if player.get("streak", None):
-            mods += player["streak"]
-        else:
-            mods += self.weather
-        return  mods
+        state = {
+            "version": SNAPSHOT_VERSION,
+            "game": type(self).__name__,
+            "house_rules": list(self.house_rules),
+            "teams": [team.name for team in self.teams],
+            "seed": self.seed,
+            # tuples turn into lists when the snapshot is stored as json
+            "rng": self.rng.getstate(),
+            "sampler": self.sampler,
+            "random_buffer": list(self.random_buffer),
+            "buffer_bytes": self.buffer_bytes,
+            "single_roles": self.single_roles,
+            "use_weather": self.use_weather,
+            "weather": self.weather,
+            "start_i": self.start_i,
+            "game_turns": self.game_turns,
+            "score": list(self.score),
+            "next_chaser": list(self.next_chaser),
+            "next_beater": list(self.next_beater),
+            "seekers": [[team.seeker.streak, team.seeker.temp] for team in self.teams],
+            "snitch": self.snitch,
+            "ending_team": self.ending_team,
+            "get_metadata": bool(self.get_metadata),
+            "track_records": self.track_records
+        }
+        # state of the house rules, e.g. the seeker target penalties
+        for key in rule_state(self.house_rules):
+            state[key] = copy.deepcopy(getattr(self, key))
+        if self.get_metadata:
+            if self.records is not None:
+                state["player_results"] = self.records.to_dict()
+            else:
+                state["player_results"] = {team: {name: list(record) for name, record in players.items()} for team, players in self.player_results.items()}
+        return state
 
 
-    def beater_target_seeker(self, beaters, active=0, team=None):
+    def restore(self, state):
         """
-            Performs the Beater House Rule action target Seeker
-            
+            Continues a match from a snapshot, the same teams have to be loaded
+
             Parameters
             ----------
-            beaters : list
-                List of Beater Modifyer collection (dict)
-            active : int
-                index of Beater taking the turn. leave empty when you only use one
-            team : str
-                Name of team for player stat tracking
+            state : dict
+                snapshot result
+        """
+        if state.get("version") != SNAPSHOT_VERSION:
+            raise ValueError("unsupported snapshot version {}".format(state.get("version")))
+        if state["game"] != type(self).__name__ or state["teams"] != [team.name for team in self.teams]:
+            raise ValueError("snapshot of a {} {} does not fit this game".format(state["game"], " vs ".join(state["teams"])))
+        if tuple(state.get("house_rules", self.house_rules)) != tuple(self.house_rules):
+            raise ValueError("snapshot with the house rules {} does not fit this game".format(", ".join(state["house_rules"]) or "none"))
+        self.reset()
+        self.round_steps = compile_round(self, self.house_rules)
+        for key in rule_state(self.house_rules):
+            setattr(self, key, copy.deepcopy(state[key]))
+        self.set_sampler(state["sampler"])
+        rng_version, rng_state, gauss = state["rng"]
+        self.rng.setstate((rng_version, tuple(rng_state), gauss))
+        self.seed = state["seed"]
+        self.random_buffer = list(state["random_buffer"])
+        self.buffer_bytes = state["buffer_bytes"]
+        self.single_roles = state["single_roles"]
+        self.use_weather = state["use_weather"]
+        self.weather = state["weather"]
+        for team in self.teams:
+            team.set_weather(self.weather)
+        self.start_i = state["start_i"]
+        self.last_i = (self.start_i + 1) % 2
+        self.team_1_name = self.teams[self.start_i].name
+        self.team_2_name = self.teams[self.last_i].name
+        self.game_turns = state["game_turns"]
+        self.score = list(state["score"])
+        self.next_chaser = list(state["next_chaser"])
+        self.next_beater = list(state["next_beater"])
+        for team, (streak, temp) in zip(self.teams, state["seekers"]):
+            team.seeker.streak = streak
+            team.seeker.temp = temp
+        self.snitch = state["snitch"]
+        self.ending_team = state["ending_team"]
+        self.get_metadata = state["get_metadata"]
+        self.track_records = state["track_records"]
+        if self.get_metadata:
+            if self.track_records != "list":
+                self.records = Track_records.from_dict(state["player_results"])
+                self.records.sequences = self.track_records == "sequence"
+            else:
+                self.records = None
+                self.player_results = {team: {name: list(record) for name, record in players.items()} for team, players in state["player_results"].items()}
+            self.subscribe(self.record_event)
+
+
+    def play(self, seed=None):
+        """
+            Plays the match again with the options of the last run_game
+
+            Parameters
+            ----------
+            seed : int
+                Seed to replay a game. leave empty for a new game
 
             Returns
             ----------
-            dict
-                Collection of temporary seeker modifyer.
-                Dict Parameter: 
-                own : int
-                    temp modifyer for own seeker player
-                other : int
-                    temp modifyer for other seeker player
-                other_points : relative change of other points
+            Dict
+                Collection of finished game statistics, see run_game
         """
-        # chooses the modifyer of the active player alternating between beaters
-        stats = beaters[active]
-        # roll with player stats + long term modifyers and one time temporary ones and weather if applied
-        roll = self.dice_roll(stats["base"] + stats["mod"] + stats["temp"] + self.weather) 
-        # get player name
-        name = beaters[active].get("Name", "Beater" + str(active))
-        # relative score changes
-        game = {"own": 0, "other": 0, "other_points": 10}
-        status = None
-        self.gamelogger.gamestep("{} targets enemy Seeker".format(name))
-        self.gamelogger.gamestep("A enemy chaser slip through and scores!")
-        if roll >= 10:
-            game["other"] = -2
-            status = 2
-            self.gamelogger.gamestep("{}: Success.")
-            self.gamelogger.gamestep("A Nasty Hit")
-        elif roll >= 7:
-            game["other"] = -1
-            status = 1
-        else:
-            game["own"] = -1
-            status = 1
-        if self.get_metadata:
-            self.add_track_record(name, status, team)
-        return game
+        return self.run_game(single_roles=bool(self.single_roles), use_weather=bool(self.use_weather), seed=seed)
+
+
+class Modified_Game(Base_game):
+    """
+        Base_game with the target seeker house rule
+
+        Kept for code using the class, match_game builds a Base_game with
+        the enabled house_rules instead. See house_rules.target_seeker.
+    """
+
+    house_rules = DEFAULT_RULES
+
+    def __init__(self, name, team_file=None, sampler="dice"):
+        super(Modified_Game,self).__init__(name,team_file,sampler)
 
 
     def beater_turns(self, single_roles=False, use_all=False):
         """
-            Performes all Beater actions for one turn
+            Performes all Beater actions for one turn with the target seeker house rule
 
             Parameters
             ----------
@@ -797,7 +1512,7 @@ class Modified_Game(Base_game):
                 Flag if only one beater and chaser of a team should roll
                 Default: False
             use_all : boolean
-                Flag if all chasers are allowed to make a action (for house rules)
+                Flag if all beaters are allowed to make a action, see the all_beaters house rule
                 Default: False
 
             Returns
@@ -805,87 +1520,475 @@ class Modified_Game(Base_game):
             list
                 List with relative score changes ordered start team -> second team
         """
-        score_change = [0,0]
-        target_mod = 3
-        # when all player should be used invoke function recurively
         if use_all:
-            for index in self.teams[self.start_i]["Beater"]:
-                changes = self.chaser_turns(single_roles=True)
-                score_change[0] += changes[0]
-                score_change[1] += changes[1]
-                index = (index + 1) %len(self.teams[self.start_i]["Beater"])
-        else:
-            # temp result variables
-            result_1 = {}
-            result_2 = {}
-            # first team Beater
-            self.gamelogger.gamestep("{} Beater".format(self.team_1_name))
-            # check if beater targets seeker instead of normal action
-            if self.sum_modifyer(self.teams[self.last_i]["Seeker"]) >= target_mod and self.dice_roll(stats=-self.seeker_target[self.last_i]) > 6:
-                result_1 = self.beater_target_seeker(self.teams[self.start_i]["Beater"], self.next_beater[self.start_i], team=self.team_1_name)
-                self.teams[self.start_i]["Seeker"]["temp"] += result_1["own"]
-                self.teams[self.last_i]["Seeker"]["temp"] += result_1["other"]
-                result_1["own"] = 0
-                result_1["other"] = result_1["other_points"]
-                # reduce chance to target seeker again
-                self.seeker_target[self.last_i] += 2
-            else:
-                result_1 = self.beater_action(self.teams[self.start_i]["Beater"], self.next_beater[self.start_i], team=self.team_1_name)
-                # increase chance to target seeker toward base value
-                if self.seeker_target[self.last_i] > 0:
-                    self.seeker_target[self.last_i] -= 1
-            if not single_roles:
-                self.next_beater[self.start_i] = (self.next_beater[self.start_i] + 1) % len(self.teams[self.start_i]["Beater"])
-            # second team Beater
-            self.gamelogger.gamestep("{} Beater".format(self.team_2_name))
-            # check if beater targets seeker instead of normal action
-            if self.sum_modifyer(self.teams[self.start_i]["Seeker"]) >= target_mod and self.dice_roll(stats=-self.seeker_target[self.start_i]) > 6:
-                result_2 = self.beater_target_seeker(self.teams[self.start_i]["Beater"], self.next_beater[self.start_i], team=self.team_1_name)
-                self.teams[self.last_i]["Seeker"]["temp"] += result_2["own"]
-                self.teams[self.start_i]["Seeker"]["temp"] += result_2["other"]
-                result_2["own"] = 0
-                result_2["other"] = result_2["other_points"]
-                # reduce chance to target seeker again
-                self.seeker_target[self.start_i] += 2
-            else:
-                result_2 = self.beater_action(self.teams[self.last_i]["Beater"], self.next_beater[self.last_i], team=self.team_2_name) 
-                # increase chance to target seeker toward base value
-                if self.seeker_target[self.start_i] > 0:
-                    self.seeker_target[self.start_i] -= 1
-            if not single_roles:
-                self.next_beater[self.last_i] = (self.next_beater[self.last_i] + 1) % len(self.teams[self.last_i]["Beater"])
-            score_change = [result_1["own"] + result_2["other"], result_1["other"] + result_2["own"]]
-            self.score[self.start_i] += score_change[0]
-            self.score[self.last_i	] += score_change[1]
-            return[score_change]
+            return all_beaters(self)
+        return target_seeker(self, single_roles)
 
 
 
 
-if __name__ == "__main__":
-    args = parser.parse_args()
+def match_seed(seed, index):
+    """
+        Derives the seed of a single game from the seed of a run
+
+        Parameters
+        ----------
+        seed : int
+            Seed of the whole run
+        index : int
+            Index of the game in the run
+
+        Returns
+        ----------
+        int
+            64 bit seed of the game
+    """
+    digest = hashlib.blake2b("{}:{}".format(seed, index).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def match_game(match, house_rules=False, sampler="dice", profile=None, engine="game"):
+    """
+        Builds a quiet game with the compiled teams of a match to play it many times
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects, first team is the home team
+        house_rules : boolean or list
+            Flag if the game uses the default house rules or the names of the rules, see house_rules.rule_names
+        sampler : str
+            roll sampler, see Base_game.set_sampler
+        profile : Game_profile
+            profile to add the game timings to. leave empty to not profile the game
+        engine : str
+            game : plays every action with Base_game or Modified_Game
+            fast_forward : draws the game length first and skips through the rounds, see fast_forward.Fast_game
+
+        Returns
+        ----------
+        Base_game
+            game ready for run_game, every run starts from the loaded teams
+    """
+    if engine == "fast_forward":
+        if house_rules or profile is not None:
+            raise ValueError("the fast_forward engine only plays Base_game rules without profiling")
+        # numpy is only needed for the fast forward engine
+        from fast_forward import Fast_game
+        return Fast_game(match)
+    game = Base_game(match[0]["Name"] + "_vs_" + match[1]["Name"], sampler=sampler)
+    game.house_rules = rule_names(house_rules)
+    game.verbose = False
+    game.set_teams(match)
+    if profile is not None:
+        profile.attach(game)
+    return game
+
+
+def play_match(match, seed, single_roles=False, use_weather=False, house_rules=False, sampler="dice", profile=None):
+    """
+        Plays a single quiet game of a match without touching the match data
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects, first team is the home team
+        seed : int
+            Seed of the game
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the game
+        house_rules : boolean or list
+            Flag if the game uses the default house rules or the names of the rules
+        sampler : str
+            roll sampler, see Base_game.set_sampler
+        profile : Game_profile
+            profile to add the game timings to. leave empty to not profile the game
+
+        Returns
+        ----------
+        Dict
+            Collection of finished game statistics, see Base_game.run_game
+    """
+    game = match_game(match, house_rules, sampler, profile)
+    return game.run_game(single_roles=single_roles, use_weather=use_weather, seed=seed)
+
+
+def replay(match, seed, single_roles=False, use_weather=False, house_rules=False, sampler="dice", track_records="list", log_file=None):
+    """
+        Plays a single game of a match again with the full game log and player results
+
+        Games of run_many, estimate or a league are replayed with the seed of
+        their result record and the options of the run, the fast forward
+        engine draws its games differently and can not be replayed.
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects, first team is the home team
+        seed : int
+            Seed of the game, the seed field of its result
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the game
+        house_rules : boolean or list
+            Flag if the game uses the default house rules or the names of the rules
+        sampler : str
+            roll sampler, see Base_game.set_sampler
+        track_records : str
+            kind of player track records (list, counters or sequence)
+            Default: list
+        log_file : str
+            text file to append the gamesteps to. leave empty to only send them to the GameLogger
+
+        Returns
+        ----------
+        Dict
+            Collection of finished game statistics including player_results, see Base_game.run_game
+    """
+    game = match_game(match, house_rules, sampler)
+    game.get_metadata = True
+    game.track_records = track_records
+    game.subscribe(game.log_event)
+    log = open(log_file, mode="a") if log_file else None
+    if log:
+        # written by the game itself, the shared GameLogger is not touched
+        names = [team.name for team in game.teams]
+        game.subscribe(lambda event: log.writelines(line + "\n" for line in render_event(event, names)))
+    try:
+        return game.run_game(single_roles=single_roles, use_weather=use_weather, seed=seed)
+    finally:
+        if log:
+            log.close()
+
+
+def run_match_range(match, start, stop, seed, single_roles=False, use_weather=False, house_rules=False, keep_results=False, sampler="dice", profile=False, engine="game", track_records=None, aggregate=None):
+    """
+        Runs the games start to stop of a run and sums up their results
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects, first team is the home team
+        start : int
+            Index of the first game
+        stop : int
+            Index after the last game
+        seed : int
+            Seed of the whole run
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+        house_rules : boolean or list
+            Flag if the games use the default house rules or the names of the rules
+        keep_results : boolean
+            Flag if the result of every game should be returned
+        sampler : str
+            roll sampler, see Base_game.set_sampler
+        profile : boolean
+            Flag if the games should be profiled
+        engine : str
+            game engine, see match_game
+        track_records : str
+            kind of player track records to merge over the games (counters or sequence). leave empty to collect none,
+            the per roll list of a single game is rebuilt by replaying it with its seed, see replay
+        aggregate : tuple
+            blowout thresholds and relative accuracy of a Game_aggregate of the games. leave empty to not aggregate them
+
+        Returns
+        ----------
+        Dict
+            Summed up game statistics
+            Dict Parameter:
+            games : int
+                number of games
+            wins : list
+                games of home and guest team ending with the higher score
+            draws : int
+                games ending with the same score
+            snitches : list
+                snitch catches of home and guest team
+            score : list
+                summed up scores of home and guest team
+            game_turns : int
+                summed up game turns
+            results : list
+                game results without player_results, only when keep_results is set
+            profile : Game_profile
+                timings of the games, only when profile is set
+            player_results : Track_records
+                merged track records of the games, only with counters or sequence track records
+            aggregate : Game_aggregate
+                distributions of the games, only when aggregate is set
+    """
+    summary = {"games": 0, "wins": [0,0], "draws": 0, "snitches": [0,0], "score": [0,0], "game_turns": 0, "results": []}
+    if profile:
+        summary["profile"] = Game_profile()
+    if aggregate:
+        summary["aggregate"] = Game_aggregate(*aggregate)
+    # the teams are compiled once, run_game resets the match state before every game
+    game = match_game(match, house_rules, sampler, summary.get("profile"), engine)
+    if track_records:
+        if engine != "game":
+            raise ValueError("track records are only collected by the game engine")
+        if track_records == "list":
+            raise ValueError("per roll track records are not kept for runs, replay single games by their seed instead")
+        game.get_metadata = True
+        game.track_records = track_records
+        if track_records != "list":
+            summary["player_results"] = Track_records(track_records == "sequence", games=0)
+    for index in range(start, stop):
+        result = game.run_game(single_roles=single_roles, use_weather=use_weather, seed=match_seed(seed, index))
+        if "player_results" in summary:
+            summary["player_results"].merge(game.records)
+        summary["games"] += 1
+        home, guest = result["score"][match[0]["Name"]], result["score"][match[1]["Name"]]
+        # the higher score wins the game, catching the snitch is counted on its own
+        if home == guest:
+            summary["draws"] += 1
+        else:
+            summary["wins"][0 if home > guest else 1] += 1
+        summary["snitches"][0 if result["ending_team"] == match[0]["Name"] else 1] += 1
+        summary["score"][0] += home
+        summary["score"][1] += guest
+        summary["game_turns"] += result["game_turns"]
+        if aggregate:
+            summary["aggregate"].add(result)
+        if keep_results:
+            # runs keep the seed and summary of a game, replay rebuilds the rest
+            result.pop("player_results", None)
+            summary["results"].append(result)
+    return summary
+
+
+def run_many(match, n, workers=1, seed=None, single_roles=False, use_weather=False, house_rules=False, keep_results=False, sink=None, sampler="dice", profile=False, engine="game", track_records=None, aggregate=False):
+    """
+        Runs n games of a match spread over a pool of worker processes
+
+        Every game is seeded from the run seed and its index, so the
+        results do not depend on the number of workers and every single
+        game can be replayed with run_game(seed=...).
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects, first team is the home team
+        n : int
+            number of games
+        workers : int
+            number of worker processes. None uses all cpu cores
+            Default: 1
+        seed : int
+            Seed of the whole run. leave empty to draw a new one
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+        house_rules : boolean or list
+            Flag if the games use the default house rules or the names of the rules
+        keep_results : boolean
+            Flag if the result of every game should be returned
+        sink : Result_sink
+            streams every game result in order to the sink instead of keeping it
+        sampler : str
+            roll sampler, see Base_game.set_sampler
+        profile : boolean
+            Flag if the games should be profiled, the worker profiles are merged
+        engine : str
+            game engine, see match_game. the fast_forward engine replays its own seeds only
+        track_records : str
+            kind of player track records to merge over the games (counters or sequence). leave empty to collect none,
+            the per roll list of a single game is rebuilt by replaying it with its seed, see replay
+        aggregate : boolean or Game_aggregate
+            Flag if the distributions of the games should be aggregated, or the aggregate to add the games to
+            (e.g. to save it as shard, its blowout thresholds and accuracy are used)
+
+        Returns
+        ----------
+        Dict
+            Aggregated game statistics
+            Dict Parameter:
+            games : int
+                number of games
+            seed : int
+                Seed of the run
+            wins : dict
+                games of team_1 and team_2 ending with the higher score
+            draws : int
+                games ending with the same score
+            snitches : dict
+                snitch catches of team_1 and team_2
+            score : dict
+                mean score of team_1 and team_2
+            game_turns : float
+                mean number of game turns
+            results : list
+                game results in order without player_results, only when keep_results is set.
+                the seed of a result replays the game with the full game log, see replay
+            profile : dict
+                merged profile of all games, see Game_profile.to_dict. only when profile is set
+            player_results : dict
+                merged track records of all games, see Track_records.to_dict. only with counters or sequence track records
+            aggregate : dict
+                median, p95 and p99 game length, score quantiles, blowout rates and team counters, see Game_aggregate.summary.
+                only when aggregate is set
+    """
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    workers = workers or os.cpu_count()
+    # a few chunks per worker to even out long games, small ones when streaming results
+    chunks = min(n, max(workers * 4, n // 1000 if sink else 0)) or 1
+    bounds = [n * i // chunks for i in range(chunks + 1)]
+    if aggregate is True:
+        aggregate = Game_aggregate()
+    # the workers build empty aggregates with the same options
+    options = (tuple(aggregate.blowouts), aggregate.score_difference.relative_accuracy) if aggregate else None
+    tasks = [(match, bounds[i], bounds[i + 1], seed, single_roles, use_weather, house_rules, keep_results or sink is not None, sampler, profile, engine, track_records, options) for i in range(chunks)]
+    if workers > 1:
+        # imported on use, most users of the module never start a pool
+        from concurrent.futures import ProcessPoolExecutor
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    parts = pool.map(run_match_range, *zip(*tasks)) if pool else (run_match_range(*task) for task in tasks)
+    total = {"games": 0, "wins": [0,0], "draws": 0, "snitches": [0,0], "score": [0,0], "game_turns": 0, "results": []}
+    merged = Game_profile() if profile else None
+    records = Track_records(track_records == "sequence", games=0) if track_records in ("counters", "sequence") else None
+    try:
+        for part in parts:
+            total["games"] += part["games"]
+            total["draws"] += part["draws"]
+            total["wins"] = [total["wins"][i] + part["wins"][i] for i in (0, 1)]
+            total["snitches"] = [total["snitches"][i] + part["snitches"][i] for i in (0, 1)]
+            total["score"] = [total["score"][i] + part["score"][i] for i in (0, 1)]
+            total["game_turns"] += part["game_turns"]
+            if merged is not None:
+                merged.merge(part["profile"])
+            if records is not None:
+                records.merge(part["player_results"])
+            if aggregate:
+                aggregate.merge(part["aggregate"])
+            if sink is not None:
+                for result in part["results"]:
+                    sink.write(result)
+            if keep_results:
+                total["results"].extend(part["results"])
+    finally:
+        if pool:
+            pool.shutdown()
+    games = max(total["games"], 1)
+    summary = {
+        "games": total["games"],
+        "seed": seed,
+        "wins": {match[0]["Name"]: total["wins"][0], match[1]["Name"]: total["wins"][1]},
+        "draws": total["draws"],
+        "snitches": {match[0]["Name"]: total["snitches"][0], match[1]["Name"]: total["snitches"][1]},
+        "score": {match[0]["Name"]: total["score"][0] / games, match[1]["Name"]: total["score"][1] / games},
+        "game_turns": total["game_turns"] / games
+    }
+    if keep_results:
+        summary["results"] = total["results"]
+    if merged is not None:
+        summary["profile"] = merged.to_dict()
+    if records is not None:
+        summary["player_results"] = records.to_dict()
+    if aggregate:
+        summary["aggregate"] = aggregate.summary()
+    return summary
+
+
+def build_parser():
+    """
+        Builds the command line argument parser
+
+        Returns
+        ----------
+        ArgumentParser
+            parser of the quidditch.py arguments
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Run a game of quidditch,")
+    parser.add_argument('--team-file', required=True, type=str, help="File location and name containing a 2 element list of team collections")
+    parser.add_argument("--single-roles", action="store_true", help="set only use 1 player per roll of the teams.")
+    parser.add_argument("--use-weather", action="store_true", help="set to include Weather modifyer for the game")
+    parser.add_argument("--collect-metadata", action="store_true", help="set to collect Game Metadata")
+    parser.add_argument("--house-rules", nargs="*", default=None, choices=tuple(HOUSE_RULES), help="set to use house rules, optionally followed by the names of the rules (Default: {})".format(" ".join(DEFAULT_RULES)))
+    parser.add_argument("--games", default=1, type=int, help="number of games to simulate, more than one writes the aggregated results")
+    parser.add_argument("--workers", default=1, type=int, help="number of worker processes for multiple games")
+    parser.add_argument("--seed", default=None, type=int, help="seed to reproduce the game or all games of a run")
+    parser.add_argument("--output", default=None, type=str, help="NDJSON or CSV file (optionally .gz) to stream one record per game of a run to")
+    parser.add_argument("--profile", action="store_true", help="set to time the game phases and actions and add the profile to the result")
+    parser.add_argument("--registry", default=None, type=str, help="team registry directory, the team file may then reference teams by their ID")
+    parser.add_argument("--engine", default="game", choices=("game", "fast_forward"), help="engine for runs of many games, fast_forward skips through the rounds of long Base_game games")
+    parser.add_argument("--track-records", default="list", choices=("list", "counters", "sequence"), help="player track records of --collect-metadata: every roll status, per player counters or counters with packed rolls")
+    parser.add_argument("--aggregate", action="store_true", help="set to add the game length and score distributions, blowout rates and team counters to the results of many games")
+    parser.add_argument("--replay", default=None, type=int, help="seed of a single game of a run to replay with the full game log and player results")
+    parser.add_argument("--sampler", default="dice", choices=("dice", "table", "buffer"), help="how rolls are drawn, table and buffer need less random numbers but replay different games for a seed")
+    return parser
+
+
+def main(argv=None):
+    """
+        Command line entry point, the only place the loggers are configured
+
+        Parameters
+        ----------
+        argv : list
+            command line arguments. leave empty to use sys.argv
+    """
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.engine != "game" and (args.games <= 1 or args.replay is not None):
+        # single games and replays are played with the full game log of the game engine
+        parser.error("--engine {} only plays runs of more than one game, not single games or --replay".format(args.engine))
     # load team file
     try:
         # create game with file name as game name
         name = str(args.team_file).rsplit(sep='/', maxsplit=1)[-1].rsplit(sep='.',maxsplit=1)[0]
-        game = None
-        if args.house_rules:
-            game = Modified_Game(name)
+        # --house-rules without names enables the default rules
+        house_rules = args.house_rules or args.house_rules is not None
+        game = Base_game(name, sampler=args.sampler)
+        game.house_rules = rule_names(house_rules)
+        registry = None
+        if args.registry:
+            from team_registry import Team_registry
+            registry = Team_registry(args.registry)
+        teams = game.load_teams(args.team_file, registry)
+        if args.replay is not None:
+            # replay one game of a run by the seed of its result record
+            result = replay([team.to_dict() for team in teams], args.replay, single_roles=args.single_roles, use_weather=args.use_weather, house_rules=house_rules, sampler=args.sampler, track_records=args.track_records, log_file="{}.txt".format(game.name))
+        elif args.games > 1:
+            # run many games and only keep the aggregated results
+            sink = Result_sink(args.output) if args.output else None
+            try:
+                result = run_many([team.to_dict() for team in teams], args.games, workers=args.workers, seed=args.seed, single_roles=args.single_roles, use_weather=args.use_weather, house_rules=house_rules, sink=sink, sampler=args.sampler, profile=args.profile, engine=args.engine, track_records=args.track_records if args.collect_metadata and args.track_records != "list" else None, aggregate=args.aggregate)
+            finally:
+                if sink:
+                    sink.close()
         else:
-            game = Base_game(name)
-        teams = game.load_teams(args.team_file)
-
-        # setup logging parameter
-        add_game_logging()
-        game.gamelogger = logging.getLogger("GameLogger")
-        game.gamelogger.setLevel(15)
-        if args.collect_metadata:
-            # setup log file handler
-            game.get_metadata = args.collect_metadata
-            gamehandler = logging.FileHandler("{}.txt".format(game.name))
-            game.gamelogger.addHandler(gamehandler)
-        # run game
-        result = game.run_game(single_roles=args.single_roles, use_weather=args.use_weather)
+            # setup logging parameter
+            add_game_logging()
+            game.gamelogger.setLevel(GAMESTEP)
+            if args.profile:
+                # attach before subscribing so the game log is timed too
+                Game_profile().attach(game)
+            if args.collect_metadata:
+                # setup log file handler, the game events are only rendered to text here
+                game.get_metadata = args.collect_metadata
+                game.track_records = args.track_records
+                gamehandler = logging.FileHandler("{}.txt".format(game.name))
+                game.gamelogger.addHandler(gamehandler)
+                game.subscribe(game.log_event)
+            # run game
+            result = game.run_game(single_roles=args.single_roles, use_weather=args.use_weather, seed=args.seed)
+            if game.profile:
+                result["profile"] = game.profile.to_dict()
+        if "profile" in result:
+            for line in Game_profile.from_dict(result["profile"]).report():
+                logger.info(line)
         # dump result into file
         with open("{}_result.json".format(game.name),mode="w") as result_file:
             json.dump(result, result_file, sort_keys=True, indent=4)
@@ -897,4 +2000,8 @@ if __name__ == "__main__":
         logger.error("\tCheck if your team file contains 2 teams")
         logger.error("\tif so please open a issue containing following error message at:")
         logger.error("\thttps://github.com/darkmeadow/quidditch_simulator/issues")
-        logger.error(e2,stack_info=True)
\ No newline at end of file
+        logger.error(e2,stack_info=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import csv
+import gzip
+import io
+import json
+
+# fields of a compact game record, home is the first team of the match
+FIELDS = ("home", "guest", "home_score", "guest_score", "ending_team", "start_team", "game_turns", "weather", "seed")
+INT_FIELDS = ("home_score", "guest_score", "game_turns", "weather", "seed")
+
+
+def compact_record(result):
+    """
+        Flattens a run_game result into a compact game record
+
+        Parameters
+        ----------
+        result : dict
+            Collection of finished game statistics, see Base_game.run_game
+
+        Returns
+        ----------
+        dict
+            game record with the FIELDS keys, player_results are dropped
+    """
+    # teams with the same name share one score entry
+    names = list(result["score"])
+    return {
+        "home": names[0],
+        "guest": names[-1],
+        "home_score": result["score"][names[0]],
+        "guest_score": result["score"][names[-1]],
+        "ending_team": result["ending_team"],
+        "start_team": result["start_team"],
+        "game_turns": result["game_turns"],
+        "weather": result["weather"],
+        "seed": result.get("seed")
+    }
+
+
+def sink_format(path):
+    """
+        Detects format and compression of a result file from its name
+
+        Parameters
+        ----------
+        path : str
+            file name ending in .ndjson, .jsonl or .csv, optionally followed by .gz
+
+        Returns
+        ----------
+        tuple
+            format (ndjson or csv) and gzip flag
+    """
+    compressed = path.endswith(".gz")
+    name = path[:-3] if compressed else path
+    return ("csv" if name.endswith(".csv") else "ndjson"), compressed
+
+
+def open_text(path, mode):
+    """
+        Opens a plain or gzip compressed text file
+
+        Parameters
+        ----------
+        path : str
+            file name, .gz files are compressed
+        mode : str
+            r, w or a
+
+        Returns
+        ----------
+        file
+            text file object
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", newline="")
+    return open(path, mode, newline="")
+
+
+class Result_sink:
+    """
+        Appends one compact record per game to a NDJSON or CSV file
+
+        Records are collected in a small buffer and written in chunks, the
+        file is flushed every flush_every records. Memory stays constant no
+        matter how many games are written.
+    """
+
+    def __init__(self, path, chunk_size=1000, flush_every=100000):
+        """
+            Opens the result file for appending
+
+            Parameters
+            ----------
+            path : str
+                file name ending in .ndjson, .jsonl or .csv, optionally followed by .gz
+            chunk_size : int
+                number of records written at once
+                Default: 1000
+            flush_every : int
+                number of records after which the file is flushed
+                Default: 100000
+        """
+        self.path = path
+        self.format, self.compressed = sink_format(path)
+        self.chunk_size = chunk_size
+        self.flush_every = flush_every
+        self.buffer = []
+        self.written = 0
+        self.unflushed = 0
+        new_file = True
+        try:
+            with open_text(path, "r") as existing:
+                new_file = not existing.read(1)
+        except FileNotFoundError:
+            pass
+        self.file = open_text(path, "a")
+        if self.format == "csv" and new_file:
+            self.file.write(",".join(FIELDS) + "\n")
+
+
+    def write(self, result):
+        """
+            Adds a game to the sink
+
+            Parameters
+            ----------
+            result : dict
+                run_game result or compact game record
+        """
+        if "home" not in result:
+            result = compact_record(result)
+        self.buffer.append(result)
+        if len(self.buffer) >= self.chunk_size:
+            self.write_chunk()
+
+
+    def write_chunk(self):
+        """
+            Writes the buffered records and flushes the file when due
+        """
+        if not self.buffer:
+            return
+        if self.format == "csv":
+            text = io.StringIO()
+            csv.writer(text, lineterminator="\n").writerows([record[field] for field in FIELDS] for record in self.buffer)
+            self.file.write(text.getvalue())
+        else:
+            self.file.write("".join(json.dumps(record, separators=(",", ":")) + "\n" for record in self.buffer))
+        self.written += len(self.buffer)
+        self.unflushed += len(self.buffer)
+        self.buffer = []
+        if self.unflushed >= self.flush_every:
+            self.file.flush()
+            self.unflushed = 0
+
+
+    def close(self):
+        """
+            Writes the remaining records and closes the file
+        """
+        self.write_chunk()
+        self.file.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_results(path, where=None):
+    """
+        Lazily reads the game records of a result file
+
+        Parameters
+        ----------
+        path : str
+            file written by Result_sink
+        where : callable
+            filter called with each record, only records returning True are yielded
+
+        Yields
+        ----------
+        dict
+            game record, see FIELDS
+    """
+    format, _ = sink_format(path)
+    with open_text(path, "r") as rfile:
+        if format == "csv":
+            for record in csv.DictReader(rfile):
+                for field in INT_FIELDS:
+                    record[field] = int(record[field]) if record[field] else None
+                if where is None or where(record):
+                    yield record
+        else:
+            for line in rfile:
+                if line.strip():
+                    record = json.loads(line)
+                    if where is None or where(record):
+                        yield record
+
+
+def aggregate_results(path, where=None, group_by=None):
+    """
+        Aggregates a result file in one pass without loading it
+
+        Parameters
+        ----------
+        path : str
+            file written by Result_sink
+        where : callable
+            filter called with each record
+        group_by : str or callable
+            record field or function giving the group of a record. leave empty for one group
+
+        Returns
+        ----------
+        Dict
+            one Dict per group
+            Dict Parameter:
+            games : int
+                number of games
+            wins : dict
+                games per team ending with the higher score
+            draws : int
+                games ending with the same score
+            snitches : dict
+                snitch catches per team
+            home_score : float
+                mean score of the home team
+            guest_score : float
+                mean score of the guest team
+            game_turns : float
+                mean number of game turns
+            max_game_turns : int
+                longest game
+    """
+    if isinstance(group_by, str):
+        field = group_by
+        group_by = lambda record: record[field]
+    groups = {}
+    for record in read_results(path, where):
+        key = group_by(record) if group_by else None
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"games": 0, "wins": {}, "draws": 0, "snitches": {}, "home_score": 0, "guest_score": 0, "game_turns": 0, "max_game_turns": 0}
+        group["games"] += 1
+        if record["home_score"] == record["guest_score"]:
+            group["draws"] += 1
+        else:
+            winner = record["home"] if record["home_score"] > record["guest_score"] else record["guest"]
+            group["wins"][winner] = group["wins"].get(winner, 0) + 1
+        group["snitches"][record["ending_team"]] = group["snitches"].get(record["ending_team"], 0) + 1
+        group["home_score"] += record["home_score"]
+        group["guest_score"] += record["guest_score"]
+        group["game_turns"] += record["game_turns"]
+        group["max_game_turns"] = max(group["max_game_turns"], record["game_turns"])
+    for group in groups.values():
+        for field in ("home_score", "guest_score", "game_turns"):
+            group[field] /= group["games"]
+    return groups
@@ -0,0 +1,159 @@
+import copy
+import random
+
+from exact_solver import Exact_game
+from paired import crn_results, paired_difference
+
+ROLES = ("Chaser", "Beater", "Keeper", "Seeker")
+
+
+def match_players(match):
+    """
+        Lists every player of a match
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects
+
+        Yields
+        ----------
+        tuple
+            team index, role, position in the role list (None for Keeper and Seeker) and the player Name as in Player
+    """
+    for index, team in enumerate(match):
+        for role in ROLES:
+            if isinstance(team[role], list):
+                for position, player in enumerate(team[role]):
+                    yield index, role, position, player.get("Name", role + str(position))
+            else:
+                yield index, role, None, team[role].get("Name", role)
+
+
+def changed_match(match, team, role, position, change):
+    """
+        Copies a match with one player modifyer changed
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects
+        team : int
+            index of the players team
+        role : str
+            role of the player
+        position : int
+            position in the role list, None for Keeper and Seeker
+        change : int
+            added to the mod of the player
+
+        Returns
+        ----------
+        list
+            the changed match
+    """
+    changed = copy.deepcopy(match)
+    player = changed[team][role] if position is None else changed[team][role][position]
+    player["mod"] += change
+    return changed
+
+
+def team_results(results, team):
+    # crn_results from the view of a team: own win by final score and own - other score difference
+    if team == 0:
+        return results
+    return [(-difference > 0, -difference) for _, difference in results]
+
+
+def sensitivity(match, changes=(1, -1), house_rules=False, use_weather=False, games=2000, seed=None, confidence=0.99):
+    """
+        Change of the win probability and score difference of each team by a modifyer change of each of its players
+
+        A team wins with the higher final score, so every player changes
+        the win probability. Base_game matches are solved exactly with
+        Exact_game. House rule matches are played with common random
+        numbers: the baseline is played once and every changed match replays
+        its slot streams, so games can stay low.
+
+        Parameters
+        ----------
+        match : list
+            List of two Team data objects or compiled Teams, first team is the home team
+        changes : tuple
+            modifyer changes to report
+            Default: (1, -1)
+        house_rules : boolean or list
+            Flag if the games use the default house rules or the names of the rules
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+        games : int
+            number of games per changed match, only with house rules
+            Default: 2000
+        seed : int
+            Seed of the common random numbers. leave empty to draw a new one
+        confidence : float
+            confidence level of the intervals, only with house rules
+            Default: 0.99
+
+        Returns
+        ----------
+        Dict
+            Dict Parameter:
+            method : str
+                exact or crn
+            seed : int
+                Seed of the common random numbers, None for exact
+            win_probability : float
+                probability of the home team ending with the higher score
+            score_difference : float
+                mean home - guest score of the match
+            players : list
+                one dict per player with team, role, player and per change
+                ("+1", "-1") the change of the probability of the players team ending with
+                the higher score and of the own - other score difference, with intervals for crn
+    """
+    match = [team.to_dict() if hasattr(team, "to_dict") else team for team in match]
+    home, guest = match[0]["Name"], match[1]["Name"]
+    if house_rules:
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        baseline = crn_results(match, games, seed, use_weather=use_weather, house_rules=house_rules)
+        win = sum(result[0] for result in baseline) / games
+        difference = sum(result[1] for result in baseline) / games
+    else:
+        solved = Exact_game(match).solve(use_weather)
+        win = float(solved["win_probability"][home])
+        difference = float(solved["expected_score"][home] - solved["expected_score"][guest])
+    players = []
+    # the exact win probability of both teams, without house rules
+    wins = [win, float(solved["win_probability"][guest])] if not house_rules else None
+    for team, role, position, name in match_players(match):
+        # changes are reported for the team of the player, draws are no win for either team
+        sign = 1 if team == 0 else -1
+        report = {"team": match[team]["Name"], "role": role, "player": name}
+        for change in changes:
+            changed = changed_match(match, team, role, position, change)
+            if house_rules:
+                own, scores, _ = paired_difference(team_results(baseline, team),
+                                                   team_results(crn_results(changed, games, seed, use_weather=use_weather, house_rules=house_rules), team),
+                                                   confidence=confidence)
+                report["{:+d}".format(change)] = {
+                    "win_probability": own["difference"],
+                    "win_interval": own["interval"],
+                    "score_difference": scores["difference"],
+                    "score_interval": scores["interval"]
+                }
+            else:
+                solved = Exact_game(changed).solve(use_weather)
+                report["{:+d}".format(change)] = {
+                    "win_probability": float(solved["win_probability"][match[team]["Name"]]) - wins[team],
+                    "score_difference": sign * (float(solved["expected_score"][home] - solved["expected_score"][guest]) - difference)
+                }
+        players.append(report)
+    return {
+        "method": "crn" if house_rules else "exact",
+        "seed": seed if house_rules else None,
+        "win_probability": win,
+        "score_difference": difference,
+        "players": players
+    }
@@ -0,0 +1,471 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from estimation import estimate
+from quidditch import run_match_range
+from team_registry import team_id
+
+logger = logging.getLogger(__name__)
+
+# options of a match request and their defaults, requests with equal options and teams are batched
+MATCH_OPTIONS = {"single_roles": False, "use_weather": False, "house_rules": False, "sampler": "dice", "engine": "game"}
+# options of an estimate request and their defaults, see estimation.estimate
+ESTIMATE_OPTIONS = {"target_halfwidth": 0.005, "confidence": 0.99, "max_games": 1000000, "score_halfwidth": 5.0, "turns_halfwidth": 0.1,
+                    "batch_size": 1000, "seed": None, "use_weather": False, "house_rules": False, "sampler": "dice", "engine": "game"}
+# largest accepted request body in bytes
+MAX_BODY = 1 << 20
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class Request_error(Exception):
+    """
+        Invalid request, answered with its status and message
+    """
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def percentile(values, share):
+    # nearest rank percentile of a sorted list
+    if not values:
+        return None
+    return values[min(len(values) - 1, max(0, int(share * len(values) + 0.5) - 1))]
+
+
+class Simulation_server:
+    """
+        Long running asyncio server for match and estimate requests
+
+        The server speaks a minimal HTTP/1.1 with json bodies on localhost or
+        a Unix socket:
+
+            POST /match     runs games of a match, see quidditch.run_many
+            POST /estimate  estimates the win probability of a match, see estimation.estimate
+            GET  /metrics   request counts and p50/p99 latencies
+
+        Match requests with the same teams and options arriving within the
+        batch delay (or while the last batch of the matchup is still
+        collecting) are played as one batch of games split over the process
+        pool. Requests without a seed get disjoint game ranges of one batch
+        seed, requests with a seed get the first games of their seed, so they
+        match run_many with that seed. Identical estimate requests in flight
+        share one estimate.
+    """
+
+    def __init__(self, workers=1, batch_delay=0.005, registry=None, history=10000):
+        """
+            Initiates the server
+
+            Parameters
+            ----------
+            workers : int
+                number of worker processes. None uses all cpu cores
+                Default: 1
+            batch_delay : float
+                seconds a new batch waits for more requests of the same matchup
+                Default: 0.005
+            registry : Team_registry
+                registry to look up teams given by their ID instead of the Team data object
+            history : int
+                number of latest requests per path the latency percentiles are taken from
+                Default: 10000
+        """
+        self.workers = workers or os.cpu_count()
+        self.batch_delay = batch_delay
+        self.registry = registry
+        self.pool = None
+        self.servers = []
+        # running batch tasks, kept until they are done
+        self.tasks = set()
+        # batch key: list of (request, future) collecting for the next batch
+        self.batches = {}
+        # estimate key: future of the running estimate
+        self.estimates = {}
+        # path: latencies in seconds of the latest requests
+        self.latencies = {}
+        self.history = history
+        self.counters = {"requests": 0, "errors": 0, "batches": 0, "batched_requests": 0, "games": 0, "shared_estimates": 0}
+
+
+    async def start(self, host="127.0.0.1", port=8765, path=None):
+        """
+            Starts the worker pool and listens for requests
+
+            Parameters
+            ----------
+            host : str
+                address to listen on
+                Default: 127.0.0.1
+            port : int
+                tcp port, 0 picks a free one. None to not listen on tcp
+                Default: 8765
+            path : str
+                Unix socket path to listen on as well. leave empty for tcp only
+
+            Returns
+            ----------
+            list
+                the asyncio servers
+        """
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        if port is not None:
+            self.servers.append(await asyncio.start_server(self.handle, host, port))
+        if path:
+            self.servers.append(await asyncio.start_unix_server(self.handle, path))
+        return self.servers
+
+
+    def address(self):
+        # (host, port) of the tcp server
+        for server in self.servers:
+            sockname = server.sockets[0].getsockname()
+            if isinstance(sockname, tuple):
+                return sockname[:2]
+        return None
+
+
+    async def close(self):
+        """
+            Stops listening and shuts the worker pool down
+        """
+        for server in self.servers:
+            server.close()
+            await server.wait_closed()
+        self.servers = []
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+
+    async def handle(self, reader, writer):
+        # one connection, requests are answered in order while the client keeps it alive
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                started = time.perf_counter()
+                path = None
+                keep_alive = True
+                try:
+                    method, path, version = line.decode("latin-1").split()
+                    headers = {}
+                    while True:
+                        header = await reader.readline()
+                        if not header.strip():
+                            break
+                        key, _, value = header.decode("latin-1").partition(":")
+                        headers[key.strip().lower()] = value.strip()
+                    keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                    length = int(headers.get("content-length", 0))
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise Request_error(413, "request body larger than {} bytes".format(MAX_BODY))
+                    body = await reader.readexactly(length) if length else b""
+                    status, result = 200, await self.dispatch(method, path, body)
+                except Request_error as e:
+                    status, result = e.status, {"error": str(e)}
+                except ValueError as e:
+                    status, result = 400, {"error": str(e)}
+                except KeyError as e:
+                    # raised by compiling a team without a role
+                    status, result = 400, {"error": "missing {} in a team".format(e)}
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    logger.exception("request failed")
+                    status, result = 500, {"error": repr(e)}
+                latency = time.perf_counter() - started
+                self.record(path if status == 200 else "error", latency)
+                if isinstance(result, dict) and path != "/metrics":
+                    result = dict(result, latency_ms=latency * 1000)
+                payload = json.dumps(result).encode()
+                writer.write("HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: {}\r\n\r\n".format(
+                    status, STATUS_TEXT[status], len(payload), "keep-alive" if keep_alive else "close").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+    async def dispatch(self, method, path, body):
+        # answer of a request or Request_error
+        if path == "/metrics":
+            if method != "GET":
+                raise Request_error(405, "use GET for {}".format(path))
+            return self.metrics()
+        if path not in ("/match", "/estimate"):
+            raise Request_error(404, "unknown path {}".format(path))
+        if method != "POST":
+            raise Request_error(405, "use POST for {}".format(path))
+        try:
+            request = json.loads(body or b"{}")
+        except json.JSONDecodeError as e:
+            raise Request_error(400, "invalid json: {}".format(e))
+        if not isinstance(request, dict) or "match" not in request:
+            raise Request_error(400, "the request needs a match of two teams")
+        match = self.resolve(request["match"])
+        if path == "/match":
+            return await self.play(match, request)
+        return await self.estimate(match, request)
+
+
+    def resolve(self, match):
+        # Team data objects of a match given by objects or registry IDs
+        if not isinstance(match, list) or len(match) != 2:
+            raise Request_error(400, "the match has to be a list of two teams")
+        if not all(isinstance(team, str) or isinstance(team, dict) and "Name" in team for team in match):
+            raise Request_error(400, "teams have to be Team data objects with a Name or team IDs")
+        if any(isinstance(team, str) for team in match):
+            if self.registry is None:
+                raise Request_error(400, "team IDs need a server started with a registry")
+            try:
+                match = self.registry.resolve(match)
+            except KeyError as e:
+                raise Request_error(400, "unknown team ID {}".format(e))
+        return [team.to_dict() if hasattr(team, "to_dict") else team for team in match]
+
+
+    async def play(self, match, request):
+        """
+            Adds a match request to the batch of its matchup and waits for its games
+
+            Parameters
+            ----------
+            match : list
+                List of two Team data objects, first team is the home team
+            request : dict
+                games (Default: 1), seed and the MATCH_OPTIONS
+
+            Returns
+            ----------
+            Dict
+                Aggregated game statistics, see quidditch.run_many.
+                first_game is the index of the first game of the seed, batch the number of requests and games of the batch
+        """
+        games = request.get("games", 1)
+        if not isinstance(games, int) or games < 1:
+            raise Request_error(400, "games has to be a positive int")
+        options = tuple(request.get(key, default) for key, default in MATCH_OPTIONS.items())
+        seed = request.get("seed")
+        key = json.dumps([team_id(match[0]), team_id(match[1]), options, seed])
+        future = asyncio.get_running_loop().create_future()
+        waiting = self.batches.get(key)
+        if waiting is None:
+            waiting = self.batches[key] = []
+            asyncio.get_running_loop().call_later(self.batch_delay, self.run_batch, key, match, options, seed)
+        waiting.append((games, future))
+        return await future
+
+
+    def run_batch(self, key, match, options, seed):
+        # closes the collecting batch of a matchup and plays it
+        requests = self.batches.pop(key)
+        task = asyncio.ensure_future(self.play_batch(match, options, seed, requests))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+
+    async def play_batch(self, match, options, seed, requests):
+        # games of a batch split at the request ranges and spread over the pool
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+            starts = [0]
+            for games, _ in requests:
+                starts.append(starts[-1] + games)
+            ranges = [(starts[i], starts[i + 1]) for i in range(len(requests))]
+        else:
+            # the same seed plays the same games, every request gets the first games
+            ranges = [(0, games) for games, _ in requests]
+        bounds = sorted({bound for span in ranges for bound in span})
+        total = bounds[-1] - bounds[0]
+        size = max(1, -(-total // (self.workers * 4)))
+        chunks = []
+        for low, high in zip(bounds, bounds[1:]):
+            chunks.extend((start, min(start + size, high)) for start in range(low, high, size))
+        self.counters["batches"] += 1
+        self.counters["batched_requests"] += len(requests)
+        self.counters["games"] += total
+        loop = asyncio.get_running_loop()
+        single_roles, use_weather, house_rules, sampler, engine = options
+        try:
+            parts = await asyncio.gather(*(loop.run_in_executor(self.pool, partial(
+                run_match_range, match, start, stop, seed, single_roles, use_weather, house_rules, sampler=sampler, engine=engine))
+                for start, stop in chunks))
+        except Exception as e:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (games, future), (start, stop) in zip(requests, ranges):
+            if future.done():
+                continue
+            summed = {"games": 0, "wins": [0, 0], "draws": 0, "snitches": [0, 0], "score": [0, 0], "game_turns": 0}
+            for (low, high), part in zip(chunks, parts):
+                if start <= low and high <= stop:
+                    for field in ("games", "draws", "game_turns"):
+                        summed[field] += part[field]
+                    for field in ("wins", "snitches", "score"):
+                        summed[field] = [summed[field][i] + part[field][i] for i in (0, 1)]
+            names = [match[0]["Name"], match[1]["Name"]]
+            future.set_result({
+                "games": summed["games"],
+                "seed": seed,
+                "first_game": start,
+                "wins": dict(zip(names, summed["wins"])),
+                "draws": summed["draws"],
+                "snitches": dict(zip(names, summed["snitches"])),
+                "score": {name: score / summed["games"] for name, score in zip(names, summed["score"])},
+                "game_turns": summed["game_turns"] / summed["games"],
+                "batch": {"requests": len(requests), "games": total}
+            })
+
+
+    async def estimate(self, match, request):
+        """
+            Runs an estimate in the pool, identical estimate requests in flight share it
+
+            Parameters
+            ----------
+            match : list
+                List of two Team data objects, first team is the home team
+            request : dict
+                the ESTIMATE_OPTIONS
+
+            Returns
+            ----------
+            Dict
+                see estimation.estimate
+        """
+        options = {key: request.get(key, default) for key, default in ESTIMATE_OPTIONS.items()}
+        key = json.dumps([team_id(match[0]), team_id(match[1]), options], sort_keys=True)
+        future = self.estimates.get(key)
+        if future is None:
+            future = self.estimates[key] = asyncio.get_running_loop().run_in_executor(self.pool, partial(estimate, match, workers=1, **options))
+            future.add_done_callback(lambda done: self.estimates.pop(key, None))
+        else:
+            self.counters["shared_estimates"] += 1
+        # shielded, a client hanging up does not cancel the estimate of the others
+        return dict(await asyncio.shield(future))
+
+
+    def record(self, path, latency):
+        self.counters["requests"] += 1
+        if path == "error":
+            self.counters["errors"] += 1
+        self.latencies.setdefault(path, deque(maxlen=self.history)).append(latency)
+
+
+    def metrics(self):
+        """
+            Request counters and latency percentiles
+
+            Returns
+            ----------
+            Dict
+                Dict Parameter:
+                counters : dict
+                    requests, errors, batches, batched_requests, games and shared_estimates since the start
+                latency : dict
+                    path : dict
+                        count, p50_ms and p99_ms of the latest requests of the path
+        """
+        latency = {}
+        for path, values in self.latencies.items():
+            values = sorted(values)
+            latency[path] = {"count": len(values), "p50_ms": percentile(values, 0.5) * 1000, "p99_ms": percentile(values, 0.99) * 1000}
+        return {"counters": dict(self.counters), "latency": latency}
+
+
+async def query(path, body=None, host="127.0.0.1", port=8765, unix_path=None):
+    """
+        Sends one request to a running server, e.g. from tests or scripts
+
+        Parameters
+        ----------
+        path : str
+            /match, /estimate or /metrics
+        body : dict
+            json request, leave empty for a GET request
+        host : str
+            server address
+            Default: 127.0.0.1
+        port : int
+            server port
+            Default: 8765
+        unix_path : str
+            Unix socket path of the server, used instead of host and port
+
+        Returns
+        ----------
+        tuple
+            http status and the decoded json answer
+    """
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        payload = json.dumps(body).encode() if body is not None else b""
+        writer.write("{} {} HTTP/1.1\r\nHost: {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\nConnection: close\r\n\r\n".format(
+            "POST" if body is not None else "GET", path, host, len(payload)).encode("latin-1") + payload)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            header = await reader.readline()
+            if not header.strip():
+                break
+            key, _, value = header.decode("latin-1").partition(":")
+            if key.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await reader.readexactly(length))
+    finally:
+        writer.close()
+
+
+async def serve(host, port, path, workers, batch_delay, registry):
+    server = Simulation_server(workers=workers, batch_delay=batch_delay, registry=registry)
+    servers = await server.start(host, port, path)
+    for listening in servers:
+        logger.info("listening on {}".format(listening.sockets[0].getsockname()))
+    try:
+        await asyncio.gather(*(listening.serve_forever() for listening in servers))
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+    parser = argparse.ArgumentParser(description="Serve match and estimate requests,")
+    parser.add_argument("--host", default="127.0.0.1", type=str, help="address to listen on")
+    parser.add_argument("--port", default=8765, type=int, help="tcp port to listen on")
+    parser.add_argument("--unix", default=None, type=str, help="Unix socket path to listen on instead of tcp")
+    parser.add_argument("--workers", default=None, type=int, help="number of worker processes (Default: all cpu cores)")
+    parser.add_argument("--batch-delay", default=0.005, type=float, help="seconds a batch waits for more requests of the same matchup")
+    parser.add_argument("--registry", default=None, type=str, help="team registry directory, requests may then reference teams by their ID")
+    args = parser.parse_args()
+    registry = None
+    if args.registry:
+        from team_registry import Team_registry
+        registry = Team_registry(args.registry)
+    try:
+        asyncio.run(serve(args.host, None if args.unix else args.port, args.unix, args.workers, args.batch_delay, registry))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,349 @@
+import json
+import os
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, util
+
+from quidditch import Team, run_match_range
+
+# format version of the shared team table
+TABLE_VERSION = 1
+# header ints: version, number of teams, byte offset and length of the names
+HEADER = 4
+# ints per team in the index: first player row, number of chasers, number of beaters
+INDEX = 3
+# ints per player: base, mod, temp, streak
+PLAYER = 4
+# streak of players without one
+NO_STREAK = -2 ** 31
+
+# tables attached by this process: shared memory name: (SharedMemory, int view, names)
+attached = {}
+# Team data objects read by this process: (shared memory name, team index): Team data object
+team_cache = {}
+
+
+def compile_table(teams):
+    """
+        Packs teams into one fixed width int table and their names
+
+        Parameters
+        ----------
+        teams : list
+            Team data objects or compiled Teams
+
+        Returns
+        ----------
+        tuple
+            array of int32 with header, team index and player rows and the utf-8 json of the Names
+    """
+    ints = array("i", [0] * (HEADER + INDEX * len(teams)))
+    names = []
+    for index, team in enumerate(teams):
+        # compiling first checks the team and normalizes missing fields
+        team = team if isinstance(team, Team) else Team(team)
+        players = team.chasers + team.beaters + [team.keeper, team.seeker]
+        ints[HEADER + INDEX * index:HEADER + INDEX * (index + 1)] = array("i", [len(ints), len(team.chasers), len(team.beaters)])
+        for player in players:
+            ints.extend((player.base, player.mod, player.start_temp, NO_STREAK if player.start_streak is None else player.start_streak))
+        names.append([team.name, [player.label for player in players]])
+    blob = json.dumps(names, separators=(",", ":")).encode()
+    ints[0:HEADER] = array("i", [TABLE_VERSION, len(teams), len(ints) * ints.itemsize, len(blob)])
+    return ints, blob
+
+
+class Shared_teams:
+    """
+        Read only compiled team tables in shared memory for process pool workers
+
+        The teams are published once as a fixed width int table (base, mod,
+        temp and streak of every player) followed by their names. Workers
+        attach the block by its name without copying it and only build the
+        Team data objects of the teams they play, so tasks carry nothing but
+        the block name, two team indices and the game range and seed.
+    """
+
+    def __init__(self, teams):
+        """
+            Publishes the teams
+
+            Parameters
+            ----------
+            teams : list
+                Team data objects or compiled Teams, played by their index
+        """
+        ints, blob = compile_table(teams)
+        size = len(ints) * ints.itemsize
+        self.memory = shared_memory.SharedMemory(create=True, size=size + len(blob))
+        self.memory.buf[:size] = ints.tobytes()
+        self.memory.buf[size:size + len(blob)] = blob
+        self.name = self.memory.name
+        self.names = [name for name, _ in json.loads(blob)]
+        # the publishing process reads its own teams without attaching again
+        attached[self.name] = (self.memory,) + open_table(self.memory)
+
+
+    def index(self, name):
+        """
+            Index of a team by its Name
+
+            Parameters
+            ----------
+            name : str
+                Name of the team
+
+            Returns
+            ----------
+            int
+                team index
+        """
+        return self.names.index(name)
+
+
+    def team(self, index):
+        """
+            Team data object of a published team
+
+            Parameters
+            ----------
+            index : int
+                team index
+
+            Returns
+            ----------
+            dict
+                Team data object
+        """
+        return read_team(self.name, index)
+
+
+    def run_many(self, home, guest, n, workers=1, seed=None, single_roles=False, use_weather=False, house_rules=False, sampler="dice"):
+        """
+            Runs n games of two published teams spread over a pool of worker processes
+
+            Games are seeded like quidditch.run_many, so both give the same results for a seed.
+
+            Parameters
+            ----------
+            home : int
+                index of the home team
+            guest : int
+                index of the guest team
+            n : int
+                number of games
+            workers : int
+                number of worker processes. None uses all cpu cores
+                Default: 1
+            seed : int
+                Seed of the run. leave empty to draw a new one
+            single_roles : boolean
+                Flag if only one beater and chaser of a team should roll
+            use_weather : boolean
+                Flag if weather modifyer should aplly to the games
+            house_rules : boolean or list
+                Flag if the games use the default house rules or the names of the rules
+            sampler : str
+                roll sampler, see Base_game.set_sampler
+
+            Returns
+            ----------
+            Dict
+                Aggregated game statistics, see quidditch.run_many
+        """
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        workers = workers or os.cpu_count()
+        chunks = min(n, workers * 4) or 1
+        bounds = [n * i // chunks for i in range(chunks + 1)]
+        tasks = [(self.name, home, guest, bounds[i], bounds[i + 1], seed, single_roles, use_weather, house_rules, sampler) for i in range(chunks)]
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            parts = list(pool.map(run_shared_range, *zip(*tasks)) if pool else (run_shared_range(*task) for task in tasks))
+        finally:
+            if pool:
+                pool.shutdown()
+        total = {"games": 0, "wins": [0, 0], "draws": 0, "snitches": [0, 0], "score": [0, 0], "game_turns": 0}
+        for part in parts:
+            for field in ("games", "draws", "game_turns"):
+                total[field] += part[field]
+            for field in ("wins", "snitches", "score"):
+                total[field] = [total[field][i] + part[field][i] for i in (0, 1)]
+        games = max(total["games"], 1)
+        names = [self.names[home], self.names[guest]]
+        return {
+            "games": total["games"],
+            "seed": seed,
+            "wins": dict(zip(names, total["wins"])),
+            "draws": total["draws"],
+            "snitches": dict(zip(names, total["snitches"])),
+            "score": {name: score / games for name, score in zip(names, total["score"])},
+            "game_turns": total["game_turns"] / games
+        }
+
+
+    def close(self):
+        """
+            Frees the shared memory, workers must not start new tasks afterwards
+        """
+        detach(self.name)
+        self.memory.unlink()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_table(memory):
+    """
+        Reads the header of a team table
+
+        Parameters
+        ----------
+        memory : SharedMemory
+            block of a team table
+
+        Returns
+        ----------
+        tuple
+            int view of the table and the team and player names
+    """
+    header = memory.buf[:HEADER * 4].cast("i")
+    version, _, names_offset, names_length = header
+    header.release()
+    if version != TABLE_VERSION:
+        raise ValueError("unsupported team table version {}".format(version))
+    ints = memory.buf[:names_offset].cast("i")
+    names = json.loads(bytes(memory.buf[names_offset:names_offset + names_length]))
+    return ints, names
+
+
+def attach(name):
+    """
+        Attaches a published team table once per process
+
+        Parameters
+        ----------
+        name : str
+            shared memory name, see Shared_teams.name
+
+        Returns
+        ----------
+        tuple
+            int view of the table and the team and player names
+    """
+    table = attached.get(name)
+    if table is None:
+        # the publishing process owns the block, pool workers share its resource tracker
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # python before 3.13 always tracks the block
+            memory = shared_memory.SharedMemory(name=name)
+        try:
+            table = attached[name] = (memory,) + open_table(memory)
+        except ValueError:
+            memory.close()
+            raise
+        # the int view has to be released before the block is closed when the worker exits
+        util.Finalize(None, detach, args=(name,), exitpriority=0)
+    return table[1], table[2]
+
+
+def detach(name):
+    """
+        Closes a team table attached by this process
+
+        Parameters
+        ----------
+        name : str
+            shared memory name
+    """
+    table = attached.pop(name, None)
+    if table is not None:
+        table[1].release()
+        table[0].close()
+    for key in [key for key in team_cache if key[0] == name]:
+        del team_cache[key]
+
+
+def read_team(name, index):
+    """
+        Builds the Team data object of a published team once per process
+
+        Parameters
+        ----------
+        name : str
+            shared memory name
+        index : int
+            team index
+
+        Returns
+        ----------
+        dict
+            Team data object
+    """
+    team = team_cache.get((name, index))
+    if team is None:
+        ints, names = attach(name)
+        if not 0 <= index < ints[1]:
+            raise IndexError("team index {} out of range".format(index))
+        row, chasers, beaters = ints[HEADER + INDEX * index:HEADER + INDEX * (index + 1)]
+        team_name, labels = names[index]
+        players = []
+        for i, label in enumerate(labels):
+            base, mod, temp, streak = ints[row + PLAYER * i:row + PLAYER * (i + 1)]
+            player = {"base": base, "mod": mod, "temp": temp}
+            if label is not None:
+                player["Name"] = label
+            if streak != NO_STREAK:
+                player["streak"] = streak
+            players.append(player)
+        team = team_cache[(name, index)] = {
+            "Name": team_name,
+            "Beater": players[chasers:chasers + beaters],
+            "Chaser": players[:chasers],
+            "Keeper": players[-2],
+            "Seeker": players[-1]
+        }
+    return team
+
+
+def run_shared_range(name, home, guest, start, stop, seed, single_roles=False, use_weather=False, house_rules=False, sampler="dice"):
+    """
+        Runs the games start to stop of a run of two published teams, see quidditch.run_match_range
+
+        Parameters
+        ----------
+        name : str
+            shared memory name
+        home : int
+            index of the home team
+        guest : int
+            index of the guest team
+        start : int
+            Index of the first game
+        stop : int
+            Index after the last game
+        seed : int
+            Seed of the whole run
+        single_roles : boolean
+            Flag if only one beater and chaser of a team should roll
+        use_weather : boolean
+            Flag if weather modifyer should aplly to the games
+        house_rules : boolean or list
+            Flag if the games use the default house rules or the names of the rules
+        sampler : str
+            roll sampler, see Base_game.set_sampler
+
+        Returns
+        ----------
+        Dict
+            Summed up game statistics, see quidditch.run_match_range
+    """
+    match = [read_team(name, home), read_team(name, guest)]
+    return run_match_range(match, start, stop, seed, single_roles, use_weather, house_rules, sampler=sampler)
@@ -0,0 +1,303 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from quidditch import Team
+
+# file names inside a registry directory
+PACK_FILE = "teams.ndjson"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 2
+
+
+def canonical_json(team):
+    """
+        Serializes a team so equal teams always give the same text
+
+        Team data objects are compiled first, so only the fields a compiled
+        Team keeps count and extra keys do not change the text.
+
+        Parameters
+        ----------
+        team : dict or Team
+            Team data object or compiled Team
+
+        Returns
+        ----------
+        str
+            json without whitespace and with sorted keys
+    """
+    if not hasattr(team, "to_dict"):
+        team = Team(team)
+    return json.dumps(team.to_dict(), sort_keys=True, separators=(",", ":"))
+
+
+def team_id(team):
+    """
+        Content hash of a team
+
+        Parameters
+        ----------
+        team : dict or Team
+            Team data object or compiled Team
+
+        Returns
+        ----------
+        str
+            sha256 hex digest of the canonical json
+    """
+    return hashlib.sha256(canonical_json(team).encode()).hexdigest()
+
+
+class Team_registry:
+    """
+        Stores every team once, keyed by the hash of its content
+
+        The teams are appended as canonical json lines to one pack file, the
+        index maps every team ID to the byte range of its line. A new process
+        only loads the index and reads single teams from the pack file when
+        they are needed, compiled teams are kept in a LRU cache. Only one
+        process should add teams at a time, any number can read.
+    """
+
+    def __init__(self, directory, cache_size=1024):
+        """
+            Opens or creates a registry
+
+            Parameters
+            ----------
+            directory : str
+                registry directory, created when missing
+            cache_size : int
+                number of compiled teams kept in memory
+                Default: 1024
+        """
+        self.directory = directory
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        # games of several threads may share one registry
+        self.cache_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.pack_path = os.path.join(directory, PACK_FILE)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+        # team ID: [offset, length, Name]
+        self.index = {}
+        self.size = 0
+        try:
+            with open(self.index_path, mode="r") as ifile:
+                index = json.load(ifile)
+            if index.get("version") == INDEX_VERSION:
+                self.index = index["teams"]
+                self.size = index["size"]
+        except FileNotFoundError:
+            pass
+        # index teams appended after the index was last written
+        if os.path.exists(self.pack_path) and os.path.getsize(self.pack_path) > self.size:
+            self.scan()
+
+
+    def scan(self):
+        """
+            Adds the pack file lines behind the indexed size to the index
+        """
+        with open(self.pack_path, mode="rb") as pfile:
+            pfile.seek(self.size)
+            for line in pfile:
+                if not line.endswith(b"\n"):
+                    # unfinished write, it is overwritten by the next add
+                    break
+                data = json.loads(line)
+                self.index[team_id(data)] = [self.size, len(line), data["Name"]]
+                self.size += len(line)
+        self.write_index()
+
+
+    def write_index(self):
+        """
+            Replaces the index file with the current index
+        """
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, mode="w") as ifile:
+            json.dump({"version": INDEX_VERSION, "size": self.size, "teams": self.index}, ifile, separators=(",", ":"))
+        os.replace(temp_path, self.index_path)
+
+
+    def add(self, team):
+        """
+            Stores a team unless the same content is already stored
+
+            Parameters
+            ----------
+            team : dict or Team
+                Team data object or compiled Team
+
+            Returns
+            ----------
+            str
+                team ID
+        """
+        return self.add_many([team])[0]
+
+
+    def add_many(self, teams):
+        """
+            Stores many teams and writes the index once
+
+            Parameters
+            ----------
+            teams : list
+                Team data objects or compiled Teams
+
+            Returns
+            ----------
+            list
+                team ID of each team
+        """
+        ids = []
+        lines = []
+        size = self.size
+        for team in teams:
+            text = canonical_json(team)
+            tid = hashlib.sha256(text.encode()).hexdigest()
+            ids.append(tid)
+            if tid in self.index:
+                continue
+            line = (text + "\n").encode()
+            self.index[tid] = [size, len(line), json.loads(text)["Name"]]
+            lines.append(line)
+            size += len(line)
+        if lines:
+            with open(self.pack_path, mode="r+b" if os.path.exists(self.pack_path) else "wb") as pfile:
+                # drop an unfinished line of an interrupted write
+                pfile.seek(self.size)
+                pfile.truncate()
+                pfile.write(b"".join(lines))
+            self.size = size
+            self.write_index()
+        return ids
+
+
+    def __contains__(self, tid):
+        return tid in self.index
+
+
+    def __len__(self):
+        return len(self.index)
+
+
+    def ids(self, name=None):
+        """
+            Lists the stored team IDs
+
+            Parameters
+            ----------
+            name : str
+                only list teams with this Name. leave empty for all teams
+
+            Returns
+            ----------
+            list
+                team IDs
+        """
+        return [tid for tid, entry in self.index.items() if name is None or entry[2] == name]
+
+
+    def data(self, tid):
+        """
+            Reads a Team data object from the pack file
+
+            Parameters
+            ----------
+            tid : str
+                team ID
+
+            Returns
+            ----------
+            dict
+                Team data object
+        """
+        try:
+            offset, length, _ = self.index[tid]
+        except KeyError:
+            raise KeyError("unknown team ID {}".format(tid)) from None
+        if hasattr(os, "pread"):
+            # positional reads do not share a file position with forked workers
+            fd = os.open(self.pack_path, os.O_RDONLY)
+            try:
+                line = os.pread(fd, length, offset)
+            finally:
+                os.close(fd)
+        else:
+            with open(self.pack_path, mode="rb") as pfile:
+                pfile.seek(offset)
+                line = pfile.read(length)
+        return json.loads(line)
+
+
+    def get(self, tid):
+        """
+            Hands out the compiled team of an ID
+
+            The Team is shared by all callers of the cache, games copy it in
+            Base_game.set_teams before playing with it.
+
+            Parameters
+            ----------
+            tid : str
+                team ID
+
+            Returns
+            ----------
+            Team
+                compiled team
+        """
+        with self.cache_lock:
+            team = self.cache.get(tid)
+            if team is not None:
+                self.cache.move_to_end(tid)
+                return team
+        team = Team(self.data(tid))
+        with self.cache_lock:
+            self.cache[tid] = team
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return team
+
+
+    def resolve(self, match):
+        """
+            Replaces team IDs in a match with the compiled teams
+
+            Parameters
+            ----------
+            match : list
+                two team IDs, Team data objects or compiled Teams, first team is the home team
+
+            Returns
+            ----------
+            list
+                match with compiled Teams for all IDs
+        """
+        return [self.get(team) if isinstance(team, str) else team for team in match]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add teams to a team registry and print their IDs,")
+    parser.add_argument("--registry", required=True, type=str, help="registry directory")
+    parser.add_argument("files", nargs="*", type=str, help="team or match json files to add, leave empty to list the registry")
+    args = parser.parse_args()
+    registry = Team_registry(args.registry)
+    if args.files:
+        teams = []
+        for filename in args.files:
+            with open(filename, mode="r") as tfile:
+                data = json.load(tfile)
+            teams.extend(data if isinstance(data, list) else [data])
+        for tid, team in zip(registry.add_many(teams), teams):
+            print(tid, team["Name"])
+    else:
+        for tid in registry.ids():
+            print(tid, registry.index[tid][2])
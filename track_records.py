@@ -0,0 +1,194 @@
+# counters kept per player, tiers as in Game_event (0 = Fail, 1 = Partial Success, 2 = Success, 3 = Cought Snitch)
+COUNTERS = ("fail", "partial", "success", "snitch", "own_score", "other_score")
+
+
+class Track_records:
+    """
+        Fixed size per player counters of many rolls, games or workers
+
+        Every player gets one list of COUNTERS, so the memory does not grow
+        with the number of rolls. The roll by roll tiers are only kept when
+        sequences is set, packed into one byte per roll. For every game a
+        player rolled in, the game index and the offset of its first roll are
+        kept too, so streaks can be split by game. Sequences grow with the
+        number of rolls and games, about one byte per roll and two ints per
+        player and game.
+    """
+
+    def __init__(self, sequences=False, games=1):
+        """
+            Initiates empty track records
+
+            Parameters
+            ----------
+            sequences : boolean
+                Flag if the tier of every roll should be kept
+                Default: False
+            games : int
+                number of games covered, 1 for the records of a game and 0 to merge games into
+                Default: 1
+        """
+        self.sequences = sequences
+        self.games = games
+        # team: {player: counters}
+        self.players = {}
+        # team: {player: bytearray of tier digits}
+        self.rolls = {}
+        # team: {player: [[game index, offset of the first roll in the game], ...]}
+        self.offsets = {}
+
+
+    def add(self, team, name, tier, own=0, other=0):
+        """
+            Counts one roll of a player
+
+            Parameters
+            ----------
+            team : str
+                Name of the players team
+            name : str
+                Name of the player
+            tier : int
+                recorded status of the action
+            own : int
+                score change of the players team
+            other : int
+                score change of the other team
+        """
+        team_players = self.players.get(team)
+        if team_players is None:
+            team_players = self.players[team] = {}
+        counters = team_players.get(name)
+        if counters is None:
+            counters = team_players[name] = [0] * len(COUNTERS)
+        counters[tier] += 1
+        counters[4] += own
+        counters[5] += other
+        if self.sequences:
+            # digits keep the packed rolls readable in the result json
+            rolls = self.rolls.setdefault(team, {}).setdefault(name, bytearray())
+            offsets = self.offsets.setdefault(team, {}).setdefault(name, [])
+            if not offsets or offsets[-1][0] != self.games - 1:
+                offsets.append([self.games - 1, len(rolls)])
+            rolls.append(48 + tier)
+
+
+    def record(self, event):
+        """
+            Listener counting the player actions of the game event stream
+
+            Parameters
+            ----------
+            event : Game_event
+                event to record
+        """
+        if event.player is not None:
+            self.add(event.team, event.player, event.tier, event.own, event.other)
+
+
+    def merge(self, other):
+        """
+            Adds the counters of other track records, e.g. of another game or pool worker
+
+            The games of other are numbered after the own games.
+
+            Parameters
+            ----------
+            other : Track_records or dict
+                track records or their to_dict result
+
+            Returns
+            ----------
+            Track_records
+                self
+        """
+        if isinstance(other, dict):
+            other = Track_records.from_dict(other)
+        for team, team_players in other.players.items():
+            own_players = self.players.setdefault(team, {})
+            for name, counters in team_players.items():
+                own = own_players.get(name)
+                if own is None:
+                    own_players[name] = list(counters)
+                else:
+                    for i, value in enumerate(counters):
+                        own[i] += value
+        if self.sequences:
+            for team, team_rolls in other.rolls.items():
+                own_rolls = self.rolls.setdefault(team, {})
+                own_offsets = self.offsets.setdefault(team, {})
+                for name, rolls in team_rolls.items():
+                    packed = own_rolls.setdefault(name, bytearray())
+                    # the games of other follow the own games
+                    own_offsets.setdefault(name, []).extend([self.games + game, len(packed) + offset] for game, offset in other.offsets.get(team, {}).get(name, []))
+                    packed.extend(rolls)
+        self.games += other.games
+        return self
+
+
+    def to_dict(self):
+        """
+            Converts the track records into json serializable player results
+
+            Returns
+            ----------
+            Dict
+                team: {player: record}
+                record Parameter:
+                fail, partial, success, snitch : int
+                    number of rolls per tier
+                actions : int
+                    number of rolls
+                successes : int
+                    rolls with success or a cought snitch
+                own_score : int
+                    score the player gained (or cost) its team
+                other_score : int
+                    score change of the other team through the player
+                rolls : str
+                    tier of every roll as digits, only with sequences
+                games : list
+                    [game index, offset in rolls] of the first roll of every game the player rolled in, only with sequences
+        """
+        results = {}
+        for team, team_players in self.players.items():
+            results[team] = {}
+            for name, counters in team_players.items():
+                record = dict(zip(COUNTERS, counters))
+                record["actions"] = sum(counters[:4])
+                record["successes"] = counters[2] + counters[3]
+                if self.sequences:
+                    record["rolls"] = self.rolls.get(team, {}).get(name, bytearray()).decode()
+                    record["games"] = [list(entry) for entry in self.offsets.get(team, {}).get(name, [])]
+                results[team][name] = record
+        return results
+
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+            Rebuilds track records from their to_dict result
+
+            Parameters
+            ----------
+            data : dict
+                to_dict result
+
+            Returns
+            ----------
+            Track_records
+                the track records
+        """
+        records = cls(sequences=any("rolls" in record for team in data.values() for record in team.values()))
+        games = 0
+        for team, team_players in data.items():
+            for name, record in team_players.items():
+                records.players.setdefault(team, {})[name] = [record[counter] for counter in COUNTERS]
+                if "rolls" in record:
+                    records.rolls.setdefault(team, {})[name] = bytearray(record["rolls"].encode())
+                    records.offsets.setdefault(team, {})[name] = [list(entry) for entry in record.get("games", [])]
+                    games = max([games] + [game + 1 for game, _ in record.get("games", [])])
+        # every game has rolls, so the last game index tells the number of games
+        if records.sequences:
+            records.games = games
+        return records